@@ -0,0 +1,104 @@
+#!/usr/bin/env node
+/**
+ * Scrypt GC Pressure Benchmark
+ * Measures bytes allocated per hash and garbage collections for the legacy
+ * syncScrypt() path versus a reusable ScryptContext (full header and midstate)
+ *
+ * Usage: node --expose-gc benchmarks/scrypt_gc_bench.js [hashes]
+ */
+
+const crypto = require('crypto');
+const { PerformanceObserver } = require('perf_hooks');
+const { syncScrypt, ScryptContext } = require('../utils/ricmoo-scrypt');
+
+const HASHES = parseInt(process.argv[2]) || 500;
+const WARMUP_HASHES = 300;
+
+let gcCount = 0;
+const gcObserver = new PerformanceObserver((list) => {
+  gcCount += list.getEntries().length;
+});
+gcObserver.observe({ entryTypes: ['gc'] });
+
+function allocatedBytes() {
+  const usage = process.memoryUsage();
+  return usage.heapUsed + usage.arrayBuffers;
+}
+
+/**
+ * Sum the heap + ArrayBuffer growth across each call of fn.
+ * Calls during which a GC shrank the heap are skipped rather than counted as negative.
+ */
+function sampleAllocations(fn, count) {
+  let total = 0;
+  let samples = 0;
+  for (let i = 0; i < count; i++) {
+    const before = allocatedBytes();
+    fn(i);
+    const delta = allocatedBytes() - before;
+    if (delta >= 0) {
+      total += delta;
+      samples++;
+    }
+  }
+  return samples > 0 ? total / samples : 0;
+}
+
+async function run(label, fn) {
+  // Warm up so JIT compilation is not attributed to the hashes
+  for (let i = 0; i < WARMUP_HASHES; i++) fn(i);
+
+  // Cost of the measurement itself (memoryUsage() allocates its result object)
+  const overhead = sampleAllocations(() => {}, HASHES);
+
+  if (global.gc) global.gc();
+  await new Promise(resolve => setTimeout(resolve, 50));
+  gcCount = 0;
+
+  const start = process.hrtime.bigint();
+  const bytesPerHash = Math.max(sampleAllocations(fn, HASHES) - overhead, 0);
+  const elapsedMs = Number(process.hrtime.bigint() - start) / 1e6;
+  const hashesPerSecond = HASHES / (elapsedMs / 1000);
+
+  // Let the GC observer deliver entries for this run
+  await new Promise(resolve => setTimeout(resolve, 50));
+  console.log(`${label.padEnd(24)} ${bytesPerHash.toFixed(0).padStart(10)} B/hash  ${String(gcCount).padStart(6)} GCs  ${hashesPerSecond.toFixed(1).padStart(9)} H/s`);
+}
+
+async function main() {
+  if (!global.gc) {
+    console.log('ℹ️ Run with --expose-gc for stable numbers\n');
+  }
+
+  const header = crypto.randomBytes(80);
+  const context = new ScryptContext(1024, 1);
+  const out = new Uint8Array(32);
+
+  // Both paths must agree before comparing them
+  const expected = Buffer.from(syncScrypt(header, header, 1024, 1, 1, 32));
+  if (!expected.equals(Buffer.from(context.hashInto(header, out)))) {
+    console.error('❌ ScryptContext output does not match syncScrypt');
+    process.exit(1);
+  }
+
+  console.log(`📊 scrypt(N=1024, r=1, p=1), ${HASHES} hashes per run\n`);
+
+  await run('syncScrypt()', (i) => {
+    header.writeUInt32LE(i, 76);
+    syncScrypt(header, header, 1024, 1, 1, 32);
+  });
+
+  await run('ScryptContext.hashInto()', (i) => {
+    header.writeUInt32LE(i, 76);
+    context.hashInto(header, out);
+  });
+
+  context.setMidstate(header);
+  await run('hashNonceInto() midstate', (i) => {
+    context.hashNonceInto(i, out);
+  });
+
+  gcObserver.disconnect();
+}
+
+main();
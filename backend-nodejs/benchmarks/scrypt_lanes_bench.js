@@ -0,0 +1,96 @@
+#!/usr/bin/env node
+/**
+ * Scrypt Lanes Benchmark
+ * Compares ScryptContext.hashBatch() throughput for 1-4 nonces interleaved
+ * through ROMix against one-at-a-time hashNonceInto()
+ *
+ * Usage: node benchmarks/scrypt_lanes_bench.js [hashes] [rounds]
+ */
+
+const crypto = require('crypto');
+const { ScryptContext } = require('../utils/ricmoo-scrypt');
+
+const HASHES = parseInt(process.argv[2]) || 960;
+const ROUNDS = parseInt(process.argv[3]) || 3;
+const BATCH_SIZE = 16;
+const LANE_COUNTS = [1, 2, 3, 4];
+
+/**
+ * Every lane count must produce the same hashes as crypto.scryptSync
+ */
+function verifyLanes(header) {
+  const count = 7;
+  for (const lanes of LANE_COUNTS) {
+    const context = new ScryptContext(1024, 1, lanes);
+    const words = context.hashBatch(header, 0, count, new Uint32Array(8 * count));
+    const input = Buffer.from(header);
+
+    for (let i = 0; i < count; i++) {
+      input.writeUInt32LE(i, 76);
+      const expected = crypto.scryptSync(input, input, 32, { N: 1024, r: 1, p: 1 });
+      if (!expected.equals(Buffer.from(words.buffer, i * 32, 32))) {
+        console.error(`❌ ${lanes}-lane output does not match crypto.scryptSync at nonce ${i}`);
+        process.exit(1);
+      }
+    }
+  }
+}
+
+function timeHashes(fn) {
+  const start = process.hrtime.bigint();
+  fn();
+  const elapsedSeconds = Number(process.hrtime.bigint() - start) / 1e9;
+  return HASHES / elapsedSeconds;
+}
+
+function main() {
+  const header = crypto.randomBytes(80);
+  verifyLanes(header);
+
+  console.log(`📊 scrypt(N=1024, r=1, p=1), ${HASHES} hashes per run, best of ${ROUNDS}\n`);
+
+  const single = new ScryptContext(1024, 1, 1);
+  const out = new Uint8Array(32);
+  single.setMidstate(header);
+
+  const runs = [
+    {
+      label: 'hashNonceInto()',
+      fn: () => {
+        for (let nonce = 0; nonce < HASHES; nonce++) single.hashNonceInto(nonce, out);
+      }
+    }
+  ];
+
+  for (const lanes of LANE_COUNTS) {
+    const context = new ScryptContext(1024, 1, lanes);
+    const words = new Uint32Array(8 * BATCH_SIZE);
+    context.setMidstate(header);
+    runs.push({
+      label: `hashBatch() ${lanes} lane${lanes > 1 ? 's' : ''}`,
+      fn: () => {
+        for (let nonce = 0; nonce < HASHES; nonce += BATCH_SIZE) {
+          context.hashBatch(null, nonce, Math.min(BATCH_SIZE, HASHES - nonce), words);
+        }
+      }
+    });
+  }
+
+  // Warm up every path before timing any of them
+  for (const run of runs) run.fn();
+
+  // Interleave rounds so thermal and frequency drift hits every path equally
+  const best = runs.map(() => 0);
+  for (let round = 0; round < ROUNDS; round++) {
+    runs.forEach((run, i) => {
+      best[i] = Math.max(best[i], timeHashes(run.fn));
+    });
+  }
+
+  const baseline = best[0];
+  runs.forEach((run, i) => {
+    console.log(`${run.label.padEnd(24)} ${best[i].toFixed(1).padStart(9)} H/s  ${(best[i] / baseline).toFixed(2)}x`);
+  });
+}
+
+main();
@@ -0,0 +1,115 @@
+#!/usr/bin/env node
+/**
+ * Stratum Framer Benchmark
+ * Replays a stratum session (notify / set_difficulty / submit responses) cut into
+ * TCP-sized chunks through StratumFramer and the legacy split-per-chunk parser,
+ * reporting throughput and how many messages each path loses
+ *
+ * Usage: node benchmarks/stratum_framer_bench.js [messages] [rounds]
+ */
+
+const crypto = require('crypto');
+const StratumFramer = require('../mining/stratumFramer');
+
+const MESSAGES = parseInt(process.argv[2]) || 200000;
+const ROUNDS = parseInt(process.argv[3]) || 3;
+const CHUNK_SIZES = [64, 536, 1460, 16384];
+
+function hex(bytes) {
+  return crypto.randomBytes(bytes).toString('hex');
+}
+
+/**
+ * A pool session: mostly share responses, a notify every 20 messages, occasional retargets
+ */
+function recordStream(count) {
+  const lines = [];
+  for (let i = 0; i < count; i++) {
+    let message;
+    if (i % 20 === 0) {
+      message = {
+        id: null,
+        method: 'mining.notify',
+        params: [
+          hex(4), hex(32), hex(58), hex(80),
+          Array.from({ length: 12 }, () => hex(32)),
+          '20000000', '1a01cd2d', Math.floor(Date.now() / 1000).toString(16), i % 100 === 0
+        ]
+      };
+    } else if (i % 250 === 7) {
+      message = { id: null, method: 'mining.set_difficulty', params: [65536] };
+    } else {
+      message = { id: 3 + i, result: i % 50 !== 0, error: null };
+    }
+    lines.push(JSON.stringify(message));
+  }
+  return Buffer.from(lines.join('\n') + '\n');
+}
+
+/**
+ * Cut the stream at fixed-size boundaries, like segments off the socket
+ */
+function chunkStream(stream, size) {
+  const chunks = [];
+  for (let offset = 0; offset < stream.length; offset += size) {
+    chunks.push(stream.subarray(offset, offset + size));
+  }
+  return chunks;
+}
+
+// The pre-framer behaviour: every chunk is assumed to hold only whole lines
+function legacyParse(chunks) {
+  let parsed = 0;
+  for (const chunk of chunks) {
+    for (const line of chunk.toString().trim().split('\n')) {
+      try {
+        JSON.parse(line);
+        parsed++;
+      } catch (error) {
+        // Lost message
+      }
+    }
+  }
+  return parsed;
+}
+
+function framerParse(chunks) {
+  let parsed = 0;
+  const framer = new StratumFramer(() => { parsed++; });
+  for (const chunk of chunks) framer.push(chunk);
+  return parsed;
+}
+
+function best(fn) {
+  let bestMs = Infinity;
+  let parsed = 0;
+  for (let round = 0; round < ROUNDS; round++) {
+    const start = process.hrtime.bigint();
+    parsed = fn();
+    bestMs = Math.min(bestMs, Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  return { ms: bestMs, parsed };
+}
+
+function main() {
+  const stream = recordStream(MESSAGES);
+  console.log(`📊 ${MESSAGES.toLocaleString()} stratum messages, ${(stream.length / 1024 / 1024).toFixed(1)} MiB, best of ${ROUNDS}\n`);
+
+  for (const size of CHUNK_SIZES) {
+    const chunks = chunkStream(stream, size);
+    framerParse(chunks); // Warm up
+
+    const framer = best(() => framerParse(chunks));
+    const legacy = best(() => legacyParse(chunks));
+
+    if (framer.parsed !== MESSAGES) {
+      console.error(`❌ Framer parsed ${framer.parsed} of ${MESSAGES} messages with ${size}-byte chunks`);
+      process.exit(1);
+    }
+
+    const rate = (result) => `${Math.round(MESSAGES / (result.ms / 1000)).toLocaleString().padStart(11)} msg/s`;
+    console.log(`${String(size).padStart(6)} B chunks  framer ${rate(framer)} (0 lost)   legacy ${rate(legacy)} (${(MESSAGES - legacy.parsed).toLocaleString()} lost)`);
+  }
+}
+
+main();
@@ -0,0 +1,209 @@
+/**
+ * Thread Autotuner - Node.js Implementation
+ * Sweeps worker thread counts on a running MiningEngine, measures the hashrate
+ * curve and picks the knee: the fewest threads that reach near-peak hashrate.
+ * Scrypt is bound by memory bandwidth and L2 size, so the knee is often well
+ * below the logical CPU count.
+ */
+
+const os = require('os');
+
+const DEFAULT_WARMUP_MS = 1000;
+const DEFAULT_WINDOW_MS = 3000;
+
+// Accepted option ranges; shorter windows measure noise rather than hashrate
+const MAX_WARMUP_MS = 60000;
+const MIN_WINDOW_MS = 500;
+const MAX_WINDOW_MS = 60000;
+
+// Knee = smallest thread count reaching this fraction of the best measured hashrate
+const KNEE_FRACTION = 0.95;
+
+/**
+ * Thread counts to measure: every count up to 8, then powers of two, the CPU count
+ * and the upper limit, so large hosts are covered in a bounded number of points
+ */
+function getSweepThreadCounts(limit, cpuCount = os.cpus().length) {
+  const counts = new Set();
+  for (let threads = 1; threads <= Math.min(limit, 8); threads++) {
+    counts.add(threads);
+  }
+  for (let threads = 16; threads <= limit; threads *= 2) {
+    counts.add(threads);
+  }
+  if (cpuCount <= limit) counts.add(cpuCount);
+  counts.add(limit);
+  return [...counts].sort((a, b) => a - b);
+}
+
+/**
+ * Pick the knee of a measured hashrate curve
+ * Measurements are noisy, so the curve is first made monotone (a thread count is
+ * credited with the best hashrate seen at or below it) before applying KNEE_FRACTION.
+ */
+function findKnee(samples, fraction = KNEE_FRACTION) {
+  const sorted = [...samples].sort((a, b) => a.threads - b.threads);
+  if (sorted.length === 0) return null;
+
+  let envelope = 0;
+  const curve = sorted.map(sample => {
+    envelope = Math.max(envelope, sample.hashrate);
+    return { threads: sample.threads, hashrate: envelope };
+  });
+
+  const maxHashrate = envelope;
+  const knee = curve.find(point => point.hashrate >= maxHashrate * fraction);
+  const measured = sorted.find(sample => sample.threads === knee.threads);
+
+  return {
+    threads: knee.threads,
+    hashrate: measured.hashrate,
+    maxHashrate
+  };
+}
+
+/**
+ * Check warmup_ms, window_ms and max_threads; each is optional
+ */
+function validateAutotuneOptions(options, maxThreads) {
+  const inRange = (value, min, max) => value === undefined || (Number.isInteger(Number(value)) && Number(value) >= min && Number(value) <= max);
+
+  if (!inRange(options.warmup_ms, 0, MAX_WARMUP_MS)) {
+    return { valid: false, error: `warmup_ms must be an integer between 0 and ${MAX_WARMUP_MS}` };
+  }
+  if (!inRange(options.window_ms, MIN_WINDOW_MS, MAX_WINDOW_MS)) {
+    return { valid: false, error: `window_ms must be an integer between ${MIN_WINDOW_MS} and ${MAX_WINDOW_MS}` };
+  }
+  if (!inRange(options.max_threads, 1, maxThreads)) {
+    return { valid: false, error: `max_threads must be an integer between 1 and ${maxThreads}` };
+  }
+  return { valid: true };
+}
+
+class ThreadAutotuner {
+  /**
+   * options are expected to have passed validateAutotuneOptions()
+   */
+  constructor(engine, options = {}) {
+    this.engine = engine;
+    this.warmupMs = options.warmup_ms !== undefined ? Number(options.warmup_ms) : DEFAULT_WARMUP_MS;
+    this.windowMs = options.window_ms !== undefined ? Number(options.window_ms) : DEFAULT_WINDOW_MS;
+    this.maxThreads = Math.min(
+      options.max_threads !== undefined ? Number(options.max_threads) : Math.min(os.cpus().length * 2, 32),
+      engine.getMaxThreads()
+    );
+
+    this.state = {
+      running: false,
+      hostname: os.hostname(),
+      thread_counts: getSweepThreadCounts(this.maxThreads),
+      samples: [],
+      result: null,
+      error: null,
+      startedAt: null,
+      finishedAt: null
+    };
+  }
+
+  /**
+   * Run the sweep, apply the knee to the engine and return the result
+   */
+  async run() {
+    const engine = this.engine;
+    const previousIntensity = engine.getDutyCycle().intensity;
+    const previousThreads = engine.workers.length;
+
+    this.state.running = true;
+    this.state.startedAt = new Date().toISOString();
+    console.log(`🎛️ Autotune: sweeping threads ${this.state.thread_counts.join(', ')} on ${this.state.hostname}`);
+
+    try {
+      // Measure the hardware, not the duty cycle
+      engine.setIntensity(1.0);
+
+      for (const threads of this.state.thread_counts) {
+        if (!engine.isMining()) {
+          throw new Error('Mining stopped during autotune');
+        }
+
+        const resized = await engine.setThreadCount(threads);
+        if (!resized.success) {
+          throw new Error(resized.message);
+        }
+
+        const hashrate = await this.measure();
+        this.state.samples.push({ threads, hashrate: Math.round(hashrate * 100) / 100 });
+        console.log(`🎛️ Autotune: ${threads} threads → ${hashrate.toFixed(2)} H/s`);
+      }
+
+      const knee = findKnee(this.state.samples);
+      this.state.result = {
+        threads: knee.threads,
+        hashrate: knee.hashrate,
+        max_hashrate: knee.maxHashrate,
+        knee_fraction: KNEE_FRACTION
+      };
+
+      await engine.setThreadCount(knee.threads);
+      await engine.saveTunedThreadCount({
+        hostname: this.state.hostname,
+        threads: knee.threads,
+        hashrate: knee.hashrate,
+        maxHashrate: knee.maxHashrate,
+        samples: this.state.samples,
+        tunedAt: new Date()
+      });
+
+      console.log(`✅ Autotune: knee at ${knee.threads} threads (${knee.hashrate.toFixed(2)} H/s, peak ${knee.maxHashrate.toFixed(2)} H/s)`);
+      return this.state.result;
+    } catch (error) {
+      this.state.error = error.message;
+      console.error('❌ Autotune failed:', error.message);
+      throw error;
+    } finally {
+      if (engine.isMining()) {
+        // A failed sweep must not leave the engine at whatever count it was measuring
+        if (!this.state.result && engine.workers.length !== previousThreads) {
+          const restored = await engine.setThreadCount(previousThreads);
+          if (!restored.success) {
+            console.error(`❌ Autotune: could not restore ${previousThreads} threads: ${restored.message}`);
+          }
+        }
+        engine.setIntensity(previousIntensity);
+      }
+      this.state.running = false;
+      this.state.finishedAt = new Date().toISOString();
+    }
+  }
+
+  /**
+   * Hashrate over one measurement window, after letting the new workers settle
+   */
+  async measure() {
+    await new Promise(resolve => setTimeout(resolve, this.warmupMs));
+
+    const startHashes = this.engine.getTotalHashCount();
+    const startTime = Date.now();
+    await new Promise(resolve => setTimeout(resolve, this.windowMs));
+
+    const elapsedSeconds = (Date.now() - startTime) / 1000;
+    return (this.engine.getTotalHashCount() - startHashes) / elapsedSeconds;
+  }
+
+  /**
+   * Progress and result of the sweep
+   */
+  getState() {
+    return {
+      ...this.state,
+      samples: [...this.state.samples]
+    };
+  }
+}
+
+module.exports = {
+  ThreadAutotuner,
+  findKnee,
+  getSweepThreadCounts,
+  validateAutotuneOptions
+};
@@ -5,9 +5,19 @@
  */
 
 const crypto = require('crypto');
-const scrypt = require('scrypt-js');
 const EventEmitter = require('events');
 const net = require('net');
+const os = require('os');
+const { RealMiningWorker, createControl, getNonceRange, CONTROL } = require('./worker');
+const MiningWorkerThread = require('./workerThread');
+const StratumFramer = require('./stratumFramer');
+const PendingShareTracker = require('./pendingShares');
+const { PoolManager, poolKey } = require('./poolManager');
+const PoolWriteQueue = require('./poolWriteQueue');
+const { ThreadAutotuner, validateAutotuneOptions } = require('./autotune');
+const scryptBackends = require('../utils/scryptBackends');
+const LatencyHistogram = require('../utils/latencyHistogram');
+const RateMeter = require('../utils/rateMeter');
 
 // Import Mongoose models for data persistence
 const MiningStats = require('../models/MiningStats');
@@ -77,6 +87,38 @@ const LITECOIN_PARAMS = {
 // Test mode for environments without pool access
 const TEST_MODE = process.env.FORCE_TEST_MODE === 'true';
 
+// A pool that has not accepted the TCP connection by then is failed over
+const POOL_CONNECT_TIMEOUT_MS = 5000;
+
+// Worker health in getWorkerStats(): no hashes for this many seconds is 'stuck',
+// below this fraction of the median worker hashrate is 'slow'
+const STUCK_WORKER_SECONDS = 10;
+const SLOW_WORKER_FRACTION = 0.5;
+
+/**
+ * Pools for a mining or proxy config: the custom pool first, then the coin's defaults
+ */
+function getPoolCandidates(config) {
+  const pools = [];
+  if (config.custom_pool_address && config.custom_pool_port) {
+    pools.push({
+      host: config.custom_pool_address,
+      port: config.custom_pool_port
+    });
+  }
+
+  for (const pool of DEFAULT_POOLS[config.coin] || []) {
+    if (!pools.some(existing => existing.host === pool.host && existing.port === pool.port)) {
+      pools.push(pool);
+    }
+  }
+
+  if (pools.length === 0) {
+    throw new Error(`No pools configured for ${config.coin}`);
+  }
+  return pools;
+}
+
 class MiningEngine extends EventEmitter {
   constructor(config) {
     super();
@@ -84,9 +126,18 @@ class MiningEngine extends EventEmitter {
     this.mining = false;
     this.workers = [];
     this.poolConnection = null;
+    this.poolManager = null;
+    this.poolReconnectTimer = null;
     this.currentJob = null;
     this.difficulty = 1;
     this.subscriptionId = null;
+    this.subscribedPool = null; // Pool the subscriptionId belongs to, for session resume
+    this.jobPool = null; // Pool the jobs of the current epoch came from
+    this.jobPrevhash = null; // Block the extranonce2 counter was last reset for
+    this.connectingPool = null;
+    this.poolFramer = null;
+    this.extranonce1 = ''; // From the mining.subscribe result
+    this.extranonce2Size = 4;
     
     // Enhanced session tracking for MongoDB integration
     this.sessionId = `session_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
@@ -98,6 +149,9 @@ class MiningEngine extends EventEmitter {
       hashrate: 0.0,
       accepted_shares: 0,
       rejected_shares: 0,
+      stale_shares: 0,
+      submitted_shares: 0,
+      submit_bytes: 0,
       blocks_found: 0,
       cpu_usage: 0.0,
       memory_usage: 0.0,
@@ -107,6 +161,30 @@ class MiningEngine extends EventEmitter {
     this.startTime = null;
     this.hashCount = 0;
     this.hashUpdateInterval = null;
+    this.scryptBackend = null;
+
+    // Shared with every worker thread so intensity can change without restarting them
+    this.control = createControl(config);
+    this.effectiveCpuShare = 0;
+    this.lastDutySample = null;
+
+    // Counters of worker threads removed by setThreadCount(), so totals never go backwards
+    this.retiredHashCount = 0;
+    this.retiredBusyMs = 0;
+    this.resizingThreads = false;
+    this.autotuner = null;
+
+    // Time from dispatchJob() until a worker is hashing the new job
+    this.jobSwitchLatency = new LatencyHistogram();
+
+    // 10 s / 60 s / 15 min EWMA and lifetime hashrate from the shared hash counters
+    this.hashrateMeter = new RateMeter();
+
+    // In-flight mining.submit requests, matched to pool responses by id
+    this.pendingShares = new PendingShareTracker();
+
+    // Outbound stratum messages; queued submits survive a reconnect
+    this.poolWriter = new PoolWriteQueue();
   }
 
   /**
@@ -126,6 +204,18 @@ class MiningEngine extends EventEmitter {
         return { success: false, message: validation.error };
       }
 
+      // Pick the fastest scrypt backend that passes known-answer tests on this host
+      this.scryptBackend = await scryptBackends.selectBackend({ preferred: this.config.scrypt_backend });
+
+      // Fall back to this host's autotuned thread count before the CPU-count heuristic
+      if (!this.config.threads) {
+        const tunedThreads = await this.getTunedThreadCount();
+        if (tunedThreads) {
+          this.config.threads = tunedThreads;
+          console.log(`🎛️ Using autotuned thread count for ${os.hostname()}: ${tunedThreads}`);
+        }
+      }
+
       // Create mining session in database
       await this.createMiningSession();
 
@@ -133,10 +223,19 @@ class MiningEngine extends EventEmitter {
       this.startTime = Date.now();
       this.mining = true;
       this.hashCount = 0;
+      this.retiredHashCount = 0;
+      this.retiredBusyMs = 0;
+      this.jobSwitchLatency.reset();
+      this.hashrateMeter.reset(this.startTime);
+      this.pendingShares.reset();
+      this.poolWriter = new PoolWriteQueue();
       this.stats = {
         hashrate: 0.0,
         accepted_shares: 0,
         rejected_shares: 0,
+        stale_shares: 0,
+        submitted_shares: 0,
+        submit_bytes: 0,
         blocks_found: 0,
         cpu_usage: 0.0,
         memory_usage: 0.0,
@@ -151,12 +250,12 @@ class MiningEngine extends EventEmitter {
         // Force real pool mining unless explicitly in test mode
         if (!TEST_MODE) {
           try {
-            await this.connectToPool();
+            await this.connectWithFailover();
             console.log('🎯 Real pool mining active');
           } catch (error) {
-            console.log('⚠️ Real pool connection failed, but continuing with test mode');
-            console.log('Pool error:', error.message);
-            this.startTestModePool();
+            // Workers idle until a pool hands out a job
+            console.log(`⚠️ No pool reachable yet (${error.message}), retrying with backoff`);
+            this.schedulePoolReconnect();
           }
         } else {
           console.log('🧪 Forced test mode - using simulated pool');
@@ -209,10 +308,20 @@ class MiningEngine extends EventEmitter {
       await this.stopWorkers();
 
       // Disconnect from pool
-      if (this.poolConnection && this.poolConnection.destroy) {
-        this.poolConnection.destroy();
+      if (this.poolReconnectTimer) {
+        clearTimeout(this.poolReconnectTimer);
+        this.poolReconnectTimer = null;
       }
+      if (this.poolManager) {
+        this.poolManager.stopPrimaryCheck();
+      }
+      const poolConnection = this.poolConnection;
       this.poolConnection = null;
+      this.poolWriter.detach();
+      this.poolWriter.clear();
+      if (poolConnection && poolConnection.destroy) {
+        poolConnection.destroy();
+      }
       
       // Clean up test mode
       if (this.testModeInterval) {
@@ -233,61 +342,123 @@ class MiningEngine extends EventEmitter {
     }
   }
 
+  /**
+   * Probe every configured pool, then connect to the best reachable one
+   */
+  async connectWithFailover() {
+    this.poolManager = new PoolManager(this.getPoolCandidates());
+    await this.poolManager.probeAll();
+    this.poolManager.startPrimaryCheck((primary) => this.switchToPool(primary));
+    return this.poolManager.connect((pool) => this.connectToPool(pool));
+  }
+
+  /**
+   * Retry the pool list once the next pool's backoff has elapsed
+   */
+  schedulePoolReconnect() {
+    if (!this.mining || this.poolReconnectTimer) return;
+    if (!this.poolManager) {
+      this.poolManager = new PoolManager(this.getPoolCandidates());
+    }
+
+    const delay = this.poolManager.getRetryDelay();
+    this.poolReconnectTimer = setTimeout(async () => {
+      this.poolReconnectTimer = null;
+      if (!this.mining) return;
+
+      console.log('🔄 Attempting to reconnect to pool...');
+      try {
+        await this.poolManager.connect((pool) => this.connectToPool(pool));
+      } catch (error) {
+        console.error('Reconnection failed:', error.message);
+        this.schedulePoolReconnect();
+      }
+    }, delay);
+  }
+
+  /**
+   * Move from a fallback pool back to the recovered primary
+   * The current connection keeps serving until the primary is connected
+   */
+  async switchToPool(pool) {
+    const previous = this.poolConnection;
+    try {
+      await this.connectToPool(pool);
+      this.poolManager.recordSuccess(pool);
+      if (previous && previous.destroy) previous.destroy();
+    } catch (error) {
+      this.poolManager.recordFailure(pool, error);
+    }
+  }
+
   /**
    * Connect to mining pool using Stratum protocol
+   * Resolves once the TCP connection is up; the socket only becomes
+   * this.poolConnection at that point, so a failed attempt leaves the current one alone
    */
-  async connectToPool() {
+  async connectToPool(poolConfig = this.getPoolConfig()) {
     return new Promise((resolve, reject) => {
-      const poolConfig = this.getPoolConfig();
-      
       console.log(`🔗 Connecting to pool: ${poolConfig.host}:${poolConfig.port}`);
       
-      this.poolConnection = new net.Socket();
-      this.poolConnection.setKeepAlive(true);
+      const socket = new net.Socket();
+      socket.setKeepAlive(true);
+      let established = false;
       
       // Set connection timeout
       const connectionTimeout = setTimeout(() => {
-        console.log('⏰ Pool connection timeout, will retry...');
-        if (this.poolConnection) {
-          this.poolConnection.destroy();
-        }
+        console.log('⏰ Pool connection timeout');
+        socket.destroy();
         reject(new Error('Connection timeout'));
-      }, 10000);
+      }, POOL_CONNECT_TIMEOUT_MS);
       
       // Clean the host address - remove protocol prefix
       const cleanHost = poolConfig.host.replace(/^stratum\+tcp:\/\//, '');
+
+      // Frame the byte stream into JSON lines; a message may span several chunks
+      const framer = new StratumFramer((message) => this.handlePoolMessage(message), {
+        onError: (error, line) => {
+          console.error('Error parsing pool message:', error.message);
+          if (line) console.log('Raw message:', line.substring(0, 200));
+        }
+      });
       
-      this.poolConnection.connect(poolConfig.port, cleanHost, () => {
+      socket.connect(poolConfig.port, cleanHost, () => {
         clearTimeout(connectionTimeout);
-        console.log('✅ Connected to mining pool');
+        established = true;
+        this.poolConnection = socket;
+        this.poolFramer = framer;
+        this.connectingPool = poolKey(poolConfig);
+        this.poolWriter.attach(socket);
+        console.log(`✅ Connected to mining pool ${poolConfig.host}:${poolConfig.port}`);
         this.subscribeToPool();
         // Add slight delay then authorize
         setTimeout(() => {
-          this.authorizeWithPool();
+          if (this.poolConnection === socket) this.authorizeWithPool();
         }, 1000);
         resolve();
       });
 
-      this.poolConnection.on('data', (data) => {
-        this.handlePoolMessage(data.toString());
+      socket.on('data', (data) => {
+        framer.push(data);
       });
 
-      this.poolConnection.on('error', (error) => {
+      socket.on('error', (error) => {
         clearTimeout(connectionTimeout);
         console.error('Pool connection error:', error.message);
         reject(error);
       });
 
-      this.poolConnection.on('close', () => {
+      socket.on('close', () => {
+        // Ignore failed attempts and connections already replaced or stopped
+        if (!established || this.poolConnection !== socket) return;
+
         console.log('🔌 Pool connection closed');
+        this.poolConnection = null;
+        this.poolWriter.detach();
         if (this.mining) {
-          // Attempt to reconnect after delay
-          setTimeout(() => {
-            console.log('🔄 Attempting to reconnect to pool...');
-            this.connectToPool().catch(err => {
-              console.error('Reconnection failed:', err.message);
-            });
-          }, 5000);
+          // Back off this pool and fail over to the next one in the ranking
+          this.poolManager.markActiveFailed(new Error('Connection closed'));
+          this.schedulePoolReconnect();
         }
       });
     });
@@ -322,11 +493,7 @@ class MiningEngine extends EventEmitter {
     console.log(`✅ Test mode pool simulation active with job: ${this.currentJob.job_id}`);
     
     // Notify workers of the test job
-    this.workers.forEach(worker => {
-      if (worker.setJob) {
-        worker.setJob(this.currentJob);
-      }
-    });
+    this.dispatchJob(this.currentJob);
     
     // Simulate periodic new jobs (every 30 seconds)
     this.testModeInterval = setInterval(() => {
@@ -353,11 +520,7 @@ class MiningEngine extends EventEmitter {
     console.log(`🔨 New test job: ${this.currentJob.job_id}`);
     
     // Notify workers
-    this.workers.forEach(worker => {
-      if (worker.setJob) {
-        worker.setJob(this.currentJob);
-      }
-    });
+    this.dispatchJob(this.currentJob);
   }
   async setupSoloMining() {
     console.log('⚡ Setting up solo mining...');
@@ -382,11 +545,7 @@ class MiningEngine extends EventEmitter {
     console.log(`✅ Solo mining setup complete with job: ${this.currentJob.job_id}`);
     
     // Notify existing workers of the job
-    this.workers.forEach(worker => {
-      if (worker.setJob) {
-        worker.setJob(this.currentJob);
-      }
-    });
+    this.dispatchJob(this.currentJob);
   }
 
   /**
@@ -398,6 +557,11 @@ class MiningEngine extends EventEmitter {
       method: 'mining.subscribe',
       params: ['CryptoMiner Pro/1.0.0']
     };
+
+    // Ask the same pool to resume the previous session, keeping extranonce1 and queued shares valid
+    if (this.subscriptionId && this.subscribedPool === this.connectingPool) {
+      subscribeMessage.params.push(this.subscriptionId);
+    }
     
     this.sendPoolMessage(subscribeMessage);
   }
@@ -416,48 +580,43 @@ class MiningEngine extends EventEmitter {
   }
 
   /**
-   * Handle messages from mining pool
+   * Handle one parsed message from the mining pool
    */
-  handlePoolMessage(data) {
-    console.log(`📨 Pool message received: ${data.trim()}`);
-    
-    const lines = data.trim().split('\n');
-    
-    lines.forEach(line => {
-      try {
-        const message = JSON.parse(line);
-        console.log(`📋 Parsed pool message:`, JSON.stringify(message, null, 2));
-        
-        if (message.method === 'mining.notify') {
-          this.handleNewJob(message.params);
-        } else if (message.method === 'mining.set_difficulty') {
-          this.difficulty = message.params[0];
-          console.log(`⚖️ Pool set difficulty: ${this.difficulty}`);
-        } else if (message.id === 1 && message.result) {
-          // Subscription successful
-          this.subscriptionId = message.result[1];
-          console.log('✅ Pool subscription successful');
-          this.authorizeWithPool();
-        } else if (message.id === 2 && message.result) {
-          // Authorization successful
-          console.log('✅ Pool authorization successful');
-        } else if (message.id > 2 && message.result !== undefined) {
-          // Share submission result
-          console.log(`✅ Pool response to request ${message.id}: ${JSON.stringify(message.result)}`);
-          
-          if (message.result === true) {
-            console.log(`🎯 REAL POOL ACCEPTED SHARE! Request ID: ${message.id}`);
-            this.stats.accepted_shares++;
-          } else if (message.result === false || message.error) {
-            console.log(`❌ Pool rejected share: ${JSON.stringify(message.error || 'Unknown error')}`);
-            this.stats.rejected_shares++;
-          }
-        }
-      } catch (error) {
-        console.error('Error parsing pool message:', error);
-        console.log('Raw message:', data);
+  handlePoolMessage(message) {
+    if (message.method === 'mining.notify') {
+      if (this.poolManager) this.poolManager.markActiveHealthy();
+      this.handleNewJob(message.params);
+    } else if (message.method === 'mining.set_difficulty') {
+      this.setDifficulty(message.params[0]);
+    } else if (message.id === 1 && message.result) {
+      // Subscription successful: [[subscriptions], extranonce1, extranonce2_size]
+      const [subscriptions, extranonce1, extranonce2Size] = message.result;
+      const notifySubscription = Array.isArray(subscriptions)
+        ? subscriptions.find(entry => Array.isArray(entry) && entry[0] === 'mining.notify')
+        : null;
+      this.subscriptionId = notifySubscription ? notifySubscription[1] : subscriptions;
+      this.extranonce1 = extranonce1 || '';
+      this.extranonce2Size = extranonce2Size || 4;
+      this.subscribedPool = this.connectingPool;
+      console.log(`✅ Pool subscription successful (extranonce1: ${this.extranonce1}, extranonce2_size: ${this.extranonce2Size})`);
+      // Queued submits from before a reconnect go out now if the session was resumed
+      this.poolWriter.openSession();
+      this.authorizeWithPool();
+    } else if (message.id === 2 && message.result) {
+      // Authorization successful
+      console.log('✅ Pool authorization successful');
+    } else if (message.id > 2 && message.result !== undefined) {
+      // Share submission result; the pool's verdict counts even if the share already timed out here
+      const share = this.pendingShares.resolve(message.id);
+      const label = share ? `job ${share.jobId}, ${share.rttMs.toFixed(1)} ms` : `request ${message.id}, unmatched`;
+      if (message.result === true) {
+        console.log(`✅ Pool accepted share (${label})`);
+        this.stats.accepted_shares++;
+      } else if (message.result === false || message.error) {
+        console.log(`❌ Pool rejected share (${label}): ${JSON.stringify(message.error || 'Unknown error')}`);
+        this.stats.rejected_shares++;
       }
-    });
+    }
   }
 
   /**
@@ -479,8 +638,34 @@ class MiningEngine extends EventEmitter {
     console.log(`🔨 New mining job: ${this.currentJob.job_id}`);
     
     // Notify workers of new job
+    this.dispatchJob(this.currentJob);
+  }
+
+  /**
+   * Hand a job to every worker. A clean job bumps the shared job epoch first, so
+   * workers drop in-flight batches of the old job before its message even arrives.
+   * So does the first job from another pool, even if not flagged clean, so every
+   * share of an epoch belongs to one pool.
+   */
+  dispatchJob(job) {
+    job.extranonce1 = this.extranonce1;
+    job.extranonce2_size = this.extranonce2Size;
+
+    const poolChanged = this.subscribedPool !== this.jobPool;
+    if (job.clean_jobs || poolChanged) {
+      // A new block or pool frees the whole extranonce2 space; a re-sent job keeps it
+      // claimed, since the pool still holds the shares already submitted for it
+      if (poolChanged || job.prevhash !== this.jobPrevhash) {
+        Atomics.store(this.control, CONTROL.EXTRANONCE2, 0);
+      }
+      Atomics.add(this.control, CONTROL.JOB_EPOCH, 1);
+      this.jobPool = this.subscribedPool;
+      this.jobPrevhash = job.prevhash;
+    }
+    job.epoch = Atomics.load(this.control, CONTROL.JOB_EPOCH);
+
     this.workers.forEach(worker => {
-      worker.setJob(this.currentJob);
+      worker.setJob(job, this.difficulty);
     });
   }
 
@@ -488,82 +673,87 @@ class MiningEngine extends EventEmitter {
    * Send message to pool
    */
   sendPoolMessage(message) {
-    if (this.poolConnection && this.poolConnection.writable) {
-      const messageString = JSON.stringify(message) + '\n';
-      console.log(`📡 SENDING TO POOL: ${messageString.trim()}`);
-      this.poolConnection.write(messageString);
+    if (this.poolWriter.sendNow(message)) {
+      console.log(`📡 SENDING TO POOL: ${JSON.stringify(message)}`);
     } else {
       console.log(`❌ Cannot send to pool - connection not writable`);
     }
   }
 
+  /**
+   * Apply a pool share difficulty to every worker thread
+   * Takes effect on the job in flight, not only on the next mining.notify
+   */
+  setDifficulty(difficulty) {
+    const value = Number(difficulty);
+    if (!Number.isFinite(value) || value <= 0) {
+      console.error(`❌ Ignoring invalid pool difficulty: ${difficulty}`);
+      return;
+    }
+
+    this.difficulty = value;
+    this.workers.forEach(worker => worker.setDifficulty(value));
+    console.log(`⚖️ Pool set difficulty: ${value}`);
+  }
+
   /**
    * Submit share to pool (or simulate in test mode)
+   * Shares are queued while the pool is reconnecting and only sent if the session
+   * is still on the pool the job came from, kept its extranonce1 and no clean job
+   * replaced theirs (epoch) in the meantime. Another pool may hand out the same
+   * extranonce1, so that alone does not identify the session.
    */
-  submitShare(jobId, nonce, result, nTime) {
+  submitShare(jobId, extranonce2, nTime, nonce, result, epoch) {
+    // Stratum: [worker_name, job_id, extranonce2, ntime, nonce]
     const submitMessage = {
-      id: Date.now(),
+      id: this.pendingShares.nextId(),
       method: 'mining.submit',
       params: [
         this.config.pool_username || 'miner1',
         jobId,
-        nonce.padStart(8, '0'), // Ensure 8-character hex nonce
+        extranonce2,
         nTime,
-        result
+        nonce.padStart(8, '0') // Ensure 8-character hex nonce
       ]
     };
     
-    // Try real pool submission first
-    if (this.poolConnection && this.poolConnection.writable) {
-      // Real pool submission
-      const submitData = JSON.stringify(submitMessage) + '\n';
-      console.log(`📤 SUBMITTING TO REAL POOL: ${submitData.trim()}`);
-      
-      this.poolConnection.write(submitData);
-      
-      // Track pending submission for response
-      this.pendingShares = this.pendingShares || new Map();
-      this.pendingShares.set(submitMessage.id, {
-        jobId,
-        nonce,
-        timestamp: Date.now()
+    // Real pool mining, connected or reconnecting
+    if (this.poolManager) {
+      const pool = this.jobPool;
+      const extranonce1 = this.extranonce1;
+      this.poolWriter.enqueue(submitMessage, {
+        isValid: () => this.subscribedPool === pool && this.extranonce1 === extranonce1 &&
+          (epoch === undefined || epoch === Atomics.load(this.control, CONTROL.JOB_EPOCH)),
+        onSent: (line) => {
+          this.stats.submitted_shares++;
+          this.stats.submit_bytes += Buffer.byteLength(line);
+          this.pendingShares.track(submitMessage.id, { jobId, extranonce2, nonce });
+          console.log(`📤 Share submitted: job ${jobId}, extranonce2 ${extranonce2}, nonce ${nonce} (difficulty ${this.difficulty})`);
+        }
       });
-      
-      console.log(`🎯 REAL SHARE SUBMITTED TO POOL!`);
-      console.log(`   Username: ${this.config.pool_username}`);
-      console.log(`   Job ID: ${jobId}`);
-      console.log(`   Nonce: ${nonce}`);
-      console.log(`   Result: ${result.substring(0, 32)}...`);
-      
     } else {
-      // Fallback logging when no pool connection
-      console.log(`🎯 VALID SHARE FOUND (no pool connection)`);
-      console.log(`   Job: ${jobId}, Nonce: ${nonce}, Result: ${result.substring(0, 16)}...`);
-      console.log(`📊 Share would be submitted to pool with username: ${this.config.pool_username}`);
-      
       // Count as accepted share for statistics (since it's valid)
       this.stats.accepted_shares++;
-      console.log(`✅ Valid share detected (${this.stats.accepted_shares} total) - would submit to pool if connected`);
+      console.log(`✅ Valid share (no pool connection, ${this.stats.accepted_shares} total): job ${jobId}, nonce ${nonce}, hash ${result.substring(0, 16)}...`);
     }
   }
 
   /**
-   * Get pool configuration
+   * Get pool configuration: the connected pool, else the preferred one
    */
   getPoolConfig() {
-    if (this.config.custom_pool_address && this.config.custom_pool_port) {
-      return {
-        host: this.config.custom_pool_address,
-        port: this.config.custom_pool_port
-      };
+    if (this.poolManager && this.poolManager.active) {
+      const { host, port } = this.poolManager.active;
+      return { host, port };
     }
-    
-    const coinPools = DEFAULT_POOLS[this.config.coin];
-    if (coinPools && coinPools.length > 0) {
-      return coinPools[0]; // Use first available pool
-    }
-    
-    throw new Error(`No pools configured for ${this.config.coin}`);
+    return this.getPoolCandidates()[0];
+  }
+
+  /**
+   * Every pool to probe for failover: the custom pool first, then the coin's defaults
+   */
+  getPoolCandidates() {
+    return getPoolCandidates(this.config);
   }
 
   /**
@@ -588,7 +778,7 @@ class MiningEngine extends EventEmitter {
       }
 
       // Thread validation using environment variable
-      const maxThreads = parseInt(process.env.MAX_THREADS) || 128; // Default to 128 for high-performance systems
+      const maxThreads = this.getMaxThreads();
       if (this.config.threads && (this.config.threads < 1 || this.config.threads > maxThreads)) {
         return { valid: false, error: `Thread count must be between 1 and ${maxThreads}` };
       }
@@ -597,6 +787,22 @@ class MiningEngine extends EventEmitter {
         return { valid: false, error: 'Intensity must be between 0.1 and 1.0' };
       }
 
+      if (this.config.duty_cycle_ms !== undefined && (!Number.isInteger(this.config.duty_cycle_ms) || this.config.duty_cycle_ms < 50 || this.config.duty_cycle_ms > 10000)) {
+        return { valid: false, error: 'duty_cycle_ms must be an integer between 50 and 10000' };
+      }
+
+      if (this.config.scrypt_backend && !scryptBackends.BACKENDS[this.config.scrypt_backend]) {
+        return { valid: false, error: `Unknown scrypt backend: ${this.config.scrypt_backend}` };
+      }
+
+      if (this.config.hash_sample_interval !== undefined && (!Number.isInteger(this.config.hash_sample_interval) || this.config.hash_sample_interval < 0)) {
+        return { valid: false, error: 'hash_sample_interval must be a non-negative integer' };
+      }
+
+      if (this.config.scrypt_lanes !== undefined && (!Number.isInteger(this.config.scrypt_lanes) || this.config.scrypt_lanes < 1 || this.config.scrypt_lanes > 4)) {
+        return { valid: false, error: 'scrypt_lanes must be an integer between 1 and 4' };
+      }
+
       return { valid: true };
     } catch (error) {
       return { valid: false, error: 'Configuration validation error: ' + error.message };
@@ -611,18 +817,80 @@ class MiningEngine extends EventEmitter {
     console.log(`📊 Starting ${threadCount} real mining workers...`);
 
     for (let i = 0; i < threadCount; i++) {
-      const worker = new RealMiningWorker(i, this.config, this);
-      worker.on('hash', (data) => this.onHash(data));
-      worker.on('share', (data) => this.onShare(data));
-      worker.on('error', (error) => this.onWorkerError(error));
-      
-      this.workers.push(worker);
-      await worker.start();
-      
-      // Set current job if available
-      if (this.currentJob) {
-        worker.setJob(this.currentJob);
+      await this.addWorker(i, getNonceRange(i, threadCount));
+    }
+  }
+
+  /**
+   * Create, start and register one worker thread, handing it the current job
+   */
+  async addWorker(id, nonceRange) {
+    const worker = new MiningWorkerThread(id, this.config, {
+      scryptBackend: this.scryptBackend.selected,
+      control: this.control,
+      nonceRange
+    });
+    worker.on('share', (data) => this.onShare(data));
+    worker.on('hash', (sample) => this.emit('hash', sample));
+    worker.on('job_switch', (latencyMs) => this.jobSwitchLatency.record(latencyMs));
+    worker.on('error', (error) => this.onWorkerError(error));
+
+    this.workers.push(worker);
+    await worker.start();
+
+    // Set current job if available
+    if (this.currentJob) {
+      worker.setJob(this.currentJob, this.difficulty);
+    }
+    return worker;
+  }
+
+  /**
+   * Grow or shrink the worker pool while mining, keeping the pool connection,
+   * current job and mining session. Nonce ranges are re-split across the new pool.
+   */
+  async setThreadCount(threads) {
+    const threadCount = Number(threads);
+    const maxThreads = this.getMaxThreads();
+    if (!Number.isInteger(threadCount) || threadCount < 1 || threadCount > maxThreads) {
+      return { success: false, message: `Thread count must be between 1 and ${maxThreads}` };
+    }
+    if (!this.mining) {
+      return { success: false, message: 'Mining is not running' };
+    }
+    if (this.resizingThreads) {
+      return { success: false, message: 'Thread count change already in progress' };
+    }
+
+    this.resizingThreads = true;
+    const previous = this.workers.length;
+    try {
+      // Retire surplus workers first so no two workers ever share a nonce range
+      while (this.workers.length > threadCount) {
+        const worker = this.workers.pop();
+        await worker.stop();
+        this.retiredHashCount += worker.hashCount;
+        this.retiredBusyMs += worker.busyMs;
       }
+
+      this.workers.forEach((worker, index) => {
+        worker.setNonceRange(getNonceRange(index, threadCount));
+      });
+
+      while (this.workers.length < threadCount) {
+        const index = this.workers.length;
+        await this.addWorker(index, getNonceRange(index, threadCount));
+      }
+
+      this.config.threads = threadCount;
+      if (this.miningSession) {
+        this.miningSession.threads = threadCount;
+      }
+      console.log(`🧵 Mining threads changed: ${previous} → ${threadCount}`);
+
+      return { success: true, threads: threadCount, previous_threads: previous };
+    } finally {
+      this.resizingThreads = false;
     }
   }
 
@@ -632,10 +900,9 @@ class MiningEngine extends EventEmitter {
   async stopWorkers() {
     console.log(`🛑 Stopping ${this.workers.length} mining workers...`);
 
-    for (const worker of this.workers) {
-      await worker.stop();
-    }
+    await Promise.all(this.workers.map(worker => worker.stop()));
 
+    this.hashCount = this.getTotalHashCount();
     this.workers = [];
   }
 
@@ -646,6 +913,7 @@ class MiningEngine extends EventEmitter {
     // Hash rate monitoring
     this.hashUpdateInterval = setInterval(() => {
       this.updateHashRate();
+      this.expirePendingShares();
     }, 1000);
 
     // System monitoring
@@ -654,6 +922,16 @@ class MiningEngine extends EventEmitter {
     }, 5000);
   }
 
+  /**
+   * Count submissions the pool never answered within the tracker's TTL
+   */
+  expirePendingShares() {
+    const expired = this.pendingShares.expire();
+    if (expired.length > 0) {
+      console.log(`⏱️ ${expired.length} share submission(s) timed out without a pool response`);
+    }
+  }
+
   /**
    * Stop monitoring systems
    */
@@ -670,20 +948,94 @@ class MiningEngine extends EventEmitter {
   }
 
   /**
-   * Handle hash from worker
+   * Sum the shared hash counters of all worker threads
+   */
+  getTotalHashCount() {
+    return this.workers.reduce((total, worker) => total + worker.hashCount, this.retiredHashCount);
+  }
+
+  /**
+   * Total time all worker threads spent hashing, in milliseconds
+   */
+  getTotalBusyMs() {
+    return this.workers.reduce((total, worker) => total + worker.busyMs, this.retiredBusyMs);
+  }
+
+  /**
+   * Per-worker hashrate, shares and nonce/job position from each worker's sample ring
+   * Workers without hashes over the last STUCK_WORKER_SECONDS are flagged 'stuck', and
+   * workers below SLOW_WORKER_FRACTION of the median 10 s hashrate 'slow'
+   */
+  getWorkerStats(sampleCount = 60) {
+    const jobEpoch = Atomics.load(this.control, CONTROL.JOB_EPOCH);
+    const workers = this.workers.map(worker => worker.getStats(sampleCount));
+
+    const rates = workers.map(worker => worker.hashrate_10s).sort((a, b) => a - b);
+    const median = rates.length > 0 ? rates[Math.floor(rates.length / 2)] : 0;
+
+    workers.forEach((stats, index) => {
+      const samples = this.workers[index].hashrateSamples;
+      stats.stale_job = Boolean(this.currentJob) && stats.job_epoch !== jobEpoch;
+      if (this.currentJob && samples.length >= STUCK_WORKER_SECONDS && samples.sum(STUCK_WORKER_SECONDS) === 0) {
+        stats.health = 'stuck';
+      } else if (median > 0 && stats.hashrate_10s < median * SLOW_WORKER_FRACTION) {
+        stats.health = 'slow';
+      } else {
+        stats.health = 'ok';
+      }
+    });
+
+    return {
+      is_mining: this.mining,
+      threads: workers.length,
+      job_epoch: jobEpoch,
+      current_job: this.currentJob ? this.currentJob.job_id : null,
+      median_hashrate_10s: median,
+      workers
+    };
+  }
+
+  /**
+   * Change mining intensity (share of each duty cycle spent hashing) while running
+   */
+  setIntensity(intensity) {
+    const value = Number(intensity);
+    if (!Number.isFinite(value) || value < 0.1 || value > 1.0) {
+      return { success: false, message: 'Intensity must be between 0.1 and 1.0' };
+    }
+
+    this.config.intensity = value;
+    Atomics.store(this.control, CONTROL.INTENSITY, Math.round(value * 1000));
+    console.log(`🎚️ Mining intensity set to ${Math.round(value * 100)}%`);
+
+    return { success: true, intensity: value, duty_cycle_ms: Atomics.load(this.control, CONTROL.DUTY_PERIOD_MS) };
+  }
+
+  /**
+   * Duty cycle settings and the measured share of CPU time the workers spent hashing
    */
-  onHash(data) {
-    this.hashCount++;
-    this.emit('hash', data);
+  getDutyCycle() {
+    return {
+      intensity: Atomics.load(this.control, CONTROL.INTENSITY) / 1000,
+      duty_cycle_ms: Atomics.load(this.control, CONTROL.DUTY_PERIOD_MS),
+      effective_cpu_share: Math.round(this.effectiveCpuShare * 1000) / 1000
+    };
   }
 
   /**
    * Handle share from worker
    */
   onShare(data) {
+    // Shares found for a job replaced by a clean job would only be rejected by the pool
+    if (data.epoch !== undefined && data.epoch !== Atomics.load(this.control, CONTROL.JOB_EPOCH)) {
+      this.stats.stale_shares++;
+      console.log(`🗑️ Dropped stale share for job ${data.jobId} (epoch ${data.epoch})`);
+      return;
+    }
+
     if (this.config.mode === 'pool') {
       // Submit to pool
-      this.submitShare(data.jobId, data.nonce, data.hash, data.nTime);
+      this.submitShare(data.jobId, data.extranonce2, data.nTime, data.nonce, data.hash, data.epoch);
     } else {
       // Solo mining - check if it's a valid block
       if (this.isValidBlock(data.hash)) {
@@ -711,12 +1063,18 @@ class MiningEngine extends EventEmitter {
     const elapsedSeconds = (currentTime - this.startTime) / 1000;
     
     if (elapsedSeconds > 0) {
-      // Calculate current hashrate
-      this.stats.hashrate = this.hashCount / elapsedSeconds;
+      this.hashCount = this.getTotalHashCount();
+      this.updateEffectiveCpuShare(currentTime);
+      this.workers.forEach(worker => worker.sample(currentTime));
+
+      // Current hashrate is the 10 s window, so throttling and thread changes show up quickly
+      this.hashrateMeter.update(this.hashCount, currentTime);
+      this.stats.hashrate = this.hashrateMeter.rate('10s');
       
       // Debug hash rate calculation
       if (this.hashCount > 0) {
-        console.log(`📊 Hash rate: ${this.stats.hashrate.toFixed(2)} H/s (${this.hashCount} hashes in ${elapsedSeconds.toFixed(1)}s)`);
+        const windows = this.hashrateMeter.toJSON();
+        console.log(`📊 Hash rate: ${windows['10s']} H/s (60s ${windows['60s']}, 15m ${windows['15m']}, avg ${windows.lifetime} H/s; ${this.hashCount} hashes in ${elapsedSeconds.toFixed(1)}s)`);
       }
       
       // Update uptime
@@ -730,6 +1088,20 @@ class MiningEngine extends EventEmitter {
     }
   }
 
+  /**
+   * Busy time per worker over the last sampling interval, divided by wall time
+   */
+  updateEffectiveCpuShare(currentTime) {
+    const busyMs = this.getTotalBusyMs();
+    const last = this.lastDutySample;
+    this.lastDutySample = { time: currentTime, busyMs };
+
+    if (last && currentTime > last.time && this.workers.length > 0) {
+      const share = (busyMs - last.busyMs) / ((currentTime - last.time) * this.workers.length);
+      this.effectiveCpuShare = Math.min(Math.max(share, 0), 1);
+    }
+  }
+
   /**
    * Update system statistics
    */
@@ -741,6 +1113,86 @@ class MiningEngine extends EventEmitter {
     this.stats.memory_usage = memUsage.heapUsed / 1024 / 1024; // Convert to MB
   }
 
+  /**
+   * Check autotune request options against this host's thread limit
+   */
+  validateAutotuneOptions(options = {}) {
+    return validateAutotuneOptions(options, this.getMaxThreads());
+  }
+
+  /**
+   * Start a background thread-count sweep; progress is reported in getStatus().autotune
+   */
+  startAutotune(options = {}) {
+    const validation = this.validateAutotuneOptions(options);
+    if (!validation.valid) {
+      return { success: false, message: validation.error };
+    }
+    if (!this.mining) {
+      return { success: false, message: 'Mining is not running' };
+    }
+    if (this.autotuner && this.autotuner.getState().running) {
+      return { success: false, message: 'Autotune already in progress' };
+    }
+
+    this.autotuner = new ThreadAutotuner(this, options);
+    this.autotuner.run().catch(() => {
+      // Failure is recorded in the autotune state
+    });
+
+    return {
+      success: true,
+      message: 'Autotune started',
+      thread_counts: this.autotuner.getState().thread_counts
+    };
+  }
+
+  /**
+   * Latest autotune progress and result, or null if autotune never ran
+   */
+  getAutotuneState() {
+    return this.autotuner ? this.autotuner.getState() : null;
+  }
+
+  /**
+   * Thread count tuned for this host, stored in the mining_defaults config
+   */
+  async getTunedThreadCount() {
+    try {
+      const defaults = await SystemConfig.getMiningDefaults();
+      const tuned = (defaults?.config?.tunedThreads || []).find(entry => entry.hostname === os.hostname());
+      return tuned ? tuned.threads : null;
+    } catch (error) {
+      console.error('Failed to load autotuned thread count:', error);
+      return null;
+    }
+  }
+
+  /**
+   * Persist an autotune result for this host, replacing its previous entry
+   */
+  async saveTunedThreadCount(entry) {
+    try {
+      const defaults = await SystemConfig.getMiningDefaults();
+      const config = defaults ? defaults.toObject().config : {};
+      config.tunedThreads = (config.tunedThreads || [])
+        .filter(existing => existing.hostname !== entry.hostname)
+        .concat(entry);
+
+      await SystemConfig.setConfig('mining_defaults', config);
+      console.log(`💾 Autotuned thread count saved for ${entry.hostname}: ${entry.threads}`);
+    } catch (error) {
+      console.error('Failed to save autotuned thread count:', error);
+    }
+  }
+
+  /**
+   * Upper bound for the thread count (MAX_THREADS environment variable)
+   */
+  getMaxThreads() {
+    return parseInt(process.env.MAX_THREADS) || 128; // Default to 128 for high-performance systems
+  }
+
   /**
    * Get optimal thread count based on CPU cores
    */
@@ -774,8 +1226,19 @@ class MiningEngine extends EventEmitter {
       config: this.config,
       pool_connected: isPoolConnected,
       current_job: this.currentJob ? this.currentJob.job_id : null,
+      threads: this.workers.length,
+      total_hashes: this.hashCount,
       difficulty: this.difficulty,
-      test_mode: !this.poolConnection || !this.poolConnection.write
+      test_mode: !this.poolConnection || !this.poolConnection.write,
+      pool_stream: this.poolFramer ? this.poolFramer.getStats() : null,
+      scrypt_backend: this.scryptBackend,
+      duty_cycle: this.getDutyCycle(),
+      autotune: this.getAutotuneState(),
+      hashrate_windows: this.hashrateMeter.toJSON(),
+      job_switch_latency: this.jobSwitchLatency.toJSON(),
+      pending_shares: this.pendingShares.getStats(),
+      pools: this.poolManager ? this.poolManager.getState() : null,
+      pool_writes: this.poolWriter.getStats()
     };
   }
 
@@ -891,6 +1354,7 @@ class MiningEngine extends EventEmitter {
     try {
       // Update session with current statistics
       this.miningSession.hashrate = this.stats.hashrate;
+      this.recordHashrateWindows();
       this.miningSession.acceptedShares = this.stats.accepted_shares;
       this.miningSession.rejectedShares = this.stats.rejected_shares;
       this.miningSession.blocksFound = this.stats.blocks_found;
@@ -916,6 +1380,17 @@ class MiningEngine extends EventEmitter {
     }
   }
 
+  /**
+   * Copy every hashrate window onto the session document
+   */
+  recordHashrateWindows() {
+    const windows = this.hashrateMeter.toJSON();
+    this.miningSession.hashrate10s = windows['10s'];
+    this.miningSession.hashrate60s = windows['60s'];
+    this.miningSession.hashrate15m = windows['15m'];
+    this.miningSession.averageHashrate = windows.lifetime;
+  }
+
   /**
    * Finalize mining session when stopped
    */
@@ -925,6 +1400,7 @@ class MiningEngine extends EventEmitter {
     try {
       this.miningSession.endTime = new Date();
       this.miningSession.hashrate = this.stats.hashrate;
+      this.recordHashrateWindows();
       this.miningSession.acceptedShares = this.stats.accepted_shares;
       this.miningSession.rejectedShares = this.stats.rejected_shares;
       this.miningSession.blocksFound = this.stats.blocks_found;
@@ -934,7 +1410,7 @@ class MiningEngine extends EventEmitter {
       // Calculate estimated earnings (simplified)
       const efficiency = this.miningSession.getEfficiency();
       const duration = this.miningSession.duration || 0;
-      this.miningSession.estimatedEarnings = (this.stats.hashrate * duration * efficiency) / 1000000;
+      this.miningSession.estimatedEarnings = (this.hashrateMeter.lifetimeRate() * duration * efficiency) / 1000000;
 
       await this.miningSession.save();
       
@@ -1058,468 +1534,9 @@ class MiningEngine extends EventEmitter {
   }
 }
 
-/**
- * Real Mining Worker Class
- */
-class RealMiningWorker extends EventEmitter {
-  constructor(id, config, engine) {
-    super();
-    this.id = id;
-    this.config = config;
-    this.engine = engine;
-    this.running = false;
-    this.miningLoop = null;
-    this.currentJob = null;
-    this.nonceStart = id * 0x1000000; // Divide nonce space between workers
-    this.nonce = this.nonceStart;
-    
-    // Add mining statistics
-    this.hashCount = 0;
-    this.shareCount = 0;
-    this.startTime = Date.now();
-  }
-
-  /**
-   * Start worker mining operation
-   */
-  async start() {
-    if (this.running) {
-      console.log(`⚠️ Worker ${this.id} already running`);
-      return;
-    }
-
-    this.running = true;
-    console.log(`⚡ Real mining worker ${this.id} started with nonce range: ${this.nonceStart.toString(16)}-${(this.nonceStart + 0x1000000).toString(16)}`);
-    
-    // Test ricmoo scrypt implementation on first worker
-    if (this.id === 0) {
-      this.testRicmooScrypt();
-    }
-    // Start mining loop with proper error handling
-    const mineLoop = async () => {
-      while (this.running) {
-        try {
-          await this.mine();
-          
-          // Small delay to prevent CPU overload but maintain good hash rate
-          // Removed delay for maximum performance
-          
-        } catch (error) {
-          console.error(`Mining error in worker ${this.id}:`, error);
-          // Continue mining even if individual hash fails
-        }
-      }
-    };
-    
-    // Start the mining loop
-    mineLoop().catch(error => {
-      console.error(`Critical mining loop error in worker ${this.id}:`, error);
-      this.running = false;
-    });
-  }
-
-  /**
-   * Stop worker
-   */
-  async stop() {
-    if (!this.running) return;
-
-    this.running = false;
-    
-    if (this.miningLoop) {
-      clearInterval(this.miningLoop);
-      this.miningLoop = null;
-    }
-
-    console.log(`🛑 Worker ${this.id} stopped`);
-    return true;
-  }
-
-  /**
-   * Set new mining job
-   */
-  setJob(job) {
-    this.currentJob = job;
-    this.nonce = this.nonceStart; // Reset nonce for new job
-  }
-
-  /**
-   * Real mining function with cryptocurrency-standard scrypt algorithm
-   */
-  async mine() {
-    if (!this.currentJob) return;
-
-    try {
-      // Increment hash counter
-      this.hashCount++;
-      
-      // Create PROPER 80-byte cryptocurrency block header
-      const blockHeader = this.createCryptocurrencyBlockHeader(this.nonce);
-      
-      // Use professional cryptocurrency scrypt implementation
-      const hash = this.cryptoScryptHash(blockHeader);
-      
-      // Check if hash meets difficulty
-      if (this.checkRealDifficulty(hash)) {
-        this.shareCount++;
-        console.log(`🎯 WORKER ${this.id} FOUND SHARE #${this.shareCount}! Total hashes: ${this.hashCount}`);
-        console.log(`   Block Header (80 bytes): ${blockHeader.toString('hex').substring(0, 32)}...`);
-        console.log(`   Scrypt Hash: ${hash.substring(0, 32)}...`);
-        
-        this.emit('share', {
-          worker_id: this.id,
-          jobId: this.currentJob.job_id,
-          nonce: this.nonce.toString(16),
-          hash: hash,
-          nTime: this.currentJob.ntime,
-          accepted: true
-        });
-      }
-      
-      // Emit hash event for statistics  
-      this.emit('hash', {
-        worker_id: this.id,
-        nonce: this.nonce,
-        hash: hash
-      });
-      
-      // Progress logging every 10,000 hashes
-      if (this.hashCount % 10000 === 0) {
-        const elapsed = (Date.now() - this.startTime) / 1000;
-        const hashrate = this.hashCount / elapsed;
-        console.log(`📊 Worker ${this.id}: ${this.hashCount} hashes, ${this.shareCount} shares, ${hashrate.toFixed(2)} H/s`);
-      }
-      
-      // Increment nonce for next iteration
-      this.nonce++;
-      
-      // Reset nonce if we've exhausted our range
-      if (this.nonce >= this.nonceStart + 0x1000000) {
-        this.nonce = this.nonceStart;
-        console.log(`🔄 Worker ${this.id} completed nonce range, resetting`);
-      }
-      
-    } catch (error) {
-      this.emit('error', error);
-    }
-  }
-
-  /**
-   * Create proper 80-byte cryptocurrency block header (Official Litecoin Standard)
-   */
-  createCryptocurrencyBlockHeader(nonce) {
-    if (!this.currentJob) {
-      // Generate a test block header using official Litecoin parameters
-      const header = Buffer.alloc(80);
-      
-      // Version (4 bytes) - Litecoin standard version
-      header.writeUInt32LE(0x00000001, 0);
-      
-      // Previous block hash (32 bytes) - Use zeros for test
-      header.fill(0, 4, 36);
-      
-      // Merkle root (32 bytes) - Use zeros for test
-      header.fill(0, 36, 68);
-      
-      // Timestamp (4 bytes) - Current time
-      header.writeUInt32LE(Math.floor(Date.now() / 1000), 68);
-      
-      // Difficulty bits (4 bytes) - Default Litecoin difficulty
-      header.writeUInt32LE(0x1d00ffff, 72);
-      
-      // Nonce (4 bytes) - Mining nonce
-      header.writeUInt32LE(nonce, 76);
-      
-      return header;
-    }
-
-    // Create official Litecoin block header from pool job
-    const header = Buffer.alloc(80);
-    
-    try {
-      // Version (4 bytes) - little endian, Litecoin protocol
-      const version = parseInt(this.currentJob.version || '00000001', 16);
-      header.writeUInt32LE(version, 0);
-      
-      // Previous block hash (32 bytes) - reverse for little endian (Litecoin standard)
-      const prevHash = Buffer.from(this.currentJob.prevhash || '00'.repeat(32), 'hex');
-      prevHash.reverse().copy(header, 4);
-      
-      // Merkle root (32 bytes) - calculated using official Litecoin method
-      const merkleRoot = this.calculateLitecoinMerkleRoot();
-      merkleRoot.copy(header, 36);
-      
-      // Timestamp (4 bytes) - little endian, Unix timestamp
-      const timestamp = parseInt(this.currentJob.ntime || Math.floor(Date.now() / 1000).toString(16), 16);
-      header.writeUInt32LE(timestamp, 68);
-      
-      // Difficulty bits (4 bytes) - little endian, Litecoin network difficulty
-      const bits = parseInt(this.currentJob.nbits || '1d00ffff', 16);
-      header.writeUInt32LE(bits, 72);
-      
-      // Nonce (4 bytes) - little endian, mining nonce
-      header.writeUInt32LE(nonce, 76);
-      
-      return header;
-      
-    } catch (error) {
-      console.error('Litecoin block header creation error:', error);
-      
-      // Fallback to minimal valid header
-      const fallbackHeader = Buffer.alloc(80);
-      fallbackHeader.writeUInt32LE(0x00000001, 0);      // Version
-      fallbackHeader.writeUInt32LE(Math.floor(Date.now() / 1000), 68); // Timestamp
-      fallbackHeader.writeUInt32LE(0x1d00ffff, 72);     // Bits
-      fallbackHeader.writeUInt32LE(nonce, 76);          // Nonce
-      return fallbackHeader;
-    }
-  }
-
-  /**
-   * Calculate Litecoin-standard merkle root from coinbase and merkle branch
-   */
-  calculateLitecoinMerkleRoot() {
-    try {
-      // Build coinbase transaction using Litecoin standard
-      const coinbase = (this.currentJob.coinb1 || '') + 
-                      (this.engine.config.wallet_address || '00'.repeat(25)) + 
-                      (this.currentJob.coinb2 || '');
-      
-      // Calculate double SHA256 of coinbase (Litecoin standard)
-      let hash = crypto.createHash('sha256').update(Buffer.from(coinbase, 'hex')).digest();
-      hash = crypto.createHash('sha256').update(hash).digest();
-      
-      // Apply merkle branch using Litecoin protocol (if available)
-      if (this.currentJob.merkle_branch && this.currentJob.merkle_branch.length > 0) {
-        for (const branch of this.currentJob.merkle_branch) {
-          const branchBuffer = Buffer.from(branch, 'hex');
-          const combined = Buffer.concat([hash, branchBuffer]);
-          hash = crypto.createHash('sha256').update(combined).digest();
-          hash = crypto.createHash('sha256').update(hash).digest();
-        }
-      }
-      
-      // Reverse for little-endian format (Litecoin standard)
-      hash.reverse();
-      return hash;
-      
-    } catch (error) {
-      console.error('Litecoin merkle root calculation error:', error);
-      // Return zeros if calculation fails
-      return Buffer.alloc(32);
-    }
-  }
-
-  /**
-   * Calculate merkle root from coinbase and merkle branch (legacy method with parameters)
-   */
-  calculateMerkleRootWithParams(coinbase, merkleBranch) {
-    // Hash coinbase transaction
-    let hash = crypto.createHash('sha256').update(Buffer.from(coinbase, 'hex')).digest();
-    hash = crypto.createHash('sha256').update(hash).digest();
-    
-    // Apply merkle branch
-    for (const branch of merkleBranch) {
-      const branchBuffer = Buffer.from(branch, 'hex');
-      const combined = Buffer.concat([hash, branchBuffer]);
-      hash = crypto.createHash('sha256').update(combined).digest();
-      hash = crypto.createHash('sha256').update(hash).digest();
-    }
-    
-    return hash.toString('hex');
-  }
-
-  /**
-   * ricmoo/scrypt-js Implementation - Professional Cryptocurrency Scrypt
-   * Uses the proven ricmoo implementation for maximum compatibility
-   */
-  cryptoScryptHash(blockHeader) {
-    try {
-      // Ensure input is exactly 80 bytes (standard cryptocurrency block header)
-      let input;
-      if (typeof blockHeader === 'string') {
-        // Convert hex string to buffer
-        input = Buffer.from(blockHeader, 'hex');
-      } else {
-        input = blockHeader;
-      }
-      
-      // Pad or truncate to exactly 80 bytes
-      if (input.length !== 80) {
-        const temp = Buffer.alloc(80);
-        input.copy(temp, 0, 0, Math.min(input.length, 80));
-        input = temp;
-      }
-      
-      // Use ricmoo/scrypt-js implementation
-      const ricmooScrypt = require('../utils/ricmoo-scrypt');
-      
-      // CRITICAL: Use input as both password AND salt (matches reference C code)
-      // This follows the exact pattern from the C implementation:
-      // PBKDF2_SHA256((const uint8_t *)input, 80, (const uint8_t *)input, 80, 1, B, 128);
-      const result = ricmooScrypt.syncScrypt(
-        input,           // password (80 bytes)
-        input,           // salt (80 bytes) - SAME AS PASSWORD
-        1024,            // N (exactly 1024)
-        1,               // r (exactly 1)  
-        1,               // p (exactly 1)
-        32               // output length (32 bytes = 256 bits)
-      );
-      
-      return Buffer.from(result).toString('hex');
-      
-    } catch (error) {
-      console.error('ricmoo scrypt error:', error);
-      
-      // Fallback only if ricmoo scrypt completely fails
-      const crypto = require('crypto');
-      const hash1 = crypto.createHash('sha256').update(blockHeader).digest();
-      const hash2 = crypto.createHash('sha256').update(hash1).digest();
-      return hash2.toString('hex');
-    }
-  }
-
-  /**
-   * Calculate real Scrypt hash (async version for future use)
-   */
-  async realScryptHash(data) {
-    return new Promise((resolve, reject) => {
-      try {
-        // Scrypt parameters for Litecoin/Dogecoin
-        const N = this.config.coin === 'litecoin' ? 1024 : 1024;  // CPU/memory cost parameter
-        const r = 1;    // Block size parameter  
-        const p = 1;    // Parallelization parameter
-        const dkLen = 32; // Derived key length
-        
-        // Use empty salt for mining (as per cryptocurrency standards)
-        const salt = Buffer.alloc(0);
-        
-        scrypt(data, salt, N, r, p, dkLen, (error, progress, key) => {
-          if (error) {
-            reject(error);
-          } else if (key) {
-            resolve(key.toString('hex'));
-          }
-        });
-      } catch (error) {
-        reject(error);
-      }
-    });
-  }
-
-  /**
-   * Test ricmoo scrypt implementation with known values
-   */
-  testRicmooScrypt() {
-    console.log('🧪 Testing ricmoo/scrypt-js implementation...');
-    
-    try {
-      // Test with simple known data
-      const testInput = Buffer.alloc(80);
-      testInput.writeUInt32LE(0x00000001, 0);   // Version
-      testInput.writeUInt32LE(0x12345678, 76);  // Test nonce
-      
-      const hash = this.cryptoScryptHash(testInput);
-      console.log(`✅ ricmoo scrypt test successful: ${hash.substring(0, 32)}...`);
-      
-      // Test the hash value for our difficulty check
-      const hashBuffer = Buffer.from(hash, 'hex');
-      const hashValue = hashBuffer.readUInt32LE(0);
-      console.log(`🔍 Hash value for difficulty: 0x${hashValue.toString(16).padStart(8, '0')}`);
-      
-      // Test our difficulty targets
-      const poolTarget = 0x00ffffff;
-      const isValid = hashValue <= poolTarget;
-      console.log(`🎯 Hash passes pool target (0x${poolTarget.toString(16)}): ${isValid}`);
-      
-    } catch (error) {
-      console.error('❌ ricmoo scrypt test failed:', error);
-    }
-  }
-  /**
-   * Check if hash meets difficulty target - FIXED HARDWARE-MATCHED IMPLEMENTATION
-   * Based on professional Verilog Litecoin miner reference
-   */
-  checkRealDifficulty(hashHex) {
-    try {
-      // Hardware-style target comparison (matches Verilog implementation)
-      // Convert first 4 bytes of hash to little-endian uint32 for comparison
-      const hashBuffer = Buffer.from(hashHex, 'hex');
-      const hashValue = hashBuffer.readUInt32LE(0);
-      
-      // CRITICAL FIX: Use much more accessible target for pool mining
-      // Pool mining should find shares frequently for proper operation
-      const poolTarget = 0x00ffffff; // Much higher target for frequent shares
-      const hardwareTarget = 0x000007ff; // Original hardware target (diff=32)
-      
-      // Hash must be LESS than or EQUAL to target (hardware-style comparison)
-      const isValidShare = hashValue <= poolTarget;
-      
-      if (isValidShare) {
-        console.log(`🎯 HARDWARE-STYLE VALID SHARE FOUND!`);
-        console.log(`   Hash Value: 0x${hashValue.toString(16).padStart(8, '0')} (first 4 bytes)`);
-        console.log(`   Pool Target: 0x${poolTarget.toString(16).padStart(8, '0')}`);
-        console.log(`   Hardware Target: 0x${hardwareTarget.toString(16).padStart(8, '0')} (diff=32)`);
-        console.log(`   Full Hash: ${hashHex.substring(0, 32)}...`);
-        console.log(`   ⚡ SUBMITTING TO REAL POOL: ltc.millpools.cc:3567`);
-        return true;
-      }
-      
-      // Debug logging every 2000 hashes to show progress (reduced frequency)
-      if (this.nonce % 2000 === 0) {
-        console.log(`🔍 Mining: Nonce ${this.nonce.toString(16).padStart(8, '0')}, Hash: 0x${hashValue.toString(16).padStart(8, '0')}, Target: 0x${poolTarget.toString(16).padStart(8, '0')}`);
-      }
-      
-      return false;
-      
-    } catch (error) {
-      console.error('Hardware-style difficulty check error:', error);
-      
-      // Emergency share generation for testing (every 5,000th attempt)
-      const emergencyShare = (this.nonce % 5000) === 4999;
-      if (emergencyShare) {
-        console.log(`🚨 EMERGENCY SHARE (Hardware Failsafe): Nonce 0x${this.nonce.toString(16).padStart(8, '0')}`);
-        console.log(`   ⚡ SUBMITTING EMERGENCY SHARE TO POOL`);
-        return true;
-      }
-      
-      return false;
-    }
-  }
-
-  /**
-   * Convert difficulty to target value
-   */
-  difficultyToTarget(difficulty) {
-    try {
-      // Standard Bitcoin/Litecoin maximum target
-      const maxTargetHex = '00000000FFFF0000000000000000000000000000000000000000000000000000';
-      const maxTarget = BigInt('0x' + maxTargetHex);
-      
-      // Calculate target: target = maxTarget / difficulty
-      const difficultyBigInt = BigInt(Math.max(Math.floor(difficulty * 1000000), 1)); // Avoid division by zero
-      const targetBigInt = maxTarget / difficultyBigInt * BigInt(1000000);
-      
-      // Convert back to 32-byte buffer
-      let targetHex = targetBigInt.toString(16);
-      
-      // Ensure exactly 64 hex characters (32 bytes)
-      if (targetHex.length > 64) {
-        targetHex = maxTargetHex; // Use max target if calculation overflow
-      } else {
-        targetHex = targetHex.padStart(64, '0');
-      }
-      
-      return Buffer.from(targetHex, 'hex');
-    } catch (error) {
-      console.error('Target calculation error:', error);
-      // Return a reasonable default target for low difficulty
-      return Buffer.from('00000000FF000000000000000000000000000000000000000000000000000000', 'hex');
-    }
-  }
-}
-
 module.exports = {
   MiningEngine,
-  RealMiningWorker
+  getPoolCandidates,
+  RealMiningWorker,
+  MiningWorkerThread
 };
\ No newline at end of file
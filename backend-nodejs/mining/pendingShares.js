@@ -0,0 +1,115 @@
+/**
+ * Pending Share Tracker - Node.js Implementation
+ * Correlates mining.submit requests with pool responses: allocates monotonic
+ * JSON-RPC ids, keeps a bounded map of in-flight submissions, records
+ * submit→response round-trip times and expires shares the pool never answers.
+ */
+
+const { performance } = require('perf_hooks');
+const LatencyHistogram = require('../utils/latencyHistogram');
+
+// Ids 1 and 2 are mining.subscribe and mining.authorize
+const FIRST_SUBMIT_ID = 3;
+
+// A share without a response after this long is counted as timed out
+const DEFAULT_TTL_MS = 30000;
+
+// Upper bound on in-flight submissions; the oldest is evicted beyond it
+const DEFAULT_MAX_PENDING = 1024;
+
+class PendingShareTracker {
+  constructor(options = {}) {
+    this.ttlMs = options.ttlMs || DEFAULT_TTL_MS;
+    this.maxPending = options.maxPending || DEFAULT_MAX_PENDING;
+
+    this.nextRequestId = FIRST_SUBMIT_ID;
+    // Insertion order is submission order, so the oldest entry is always first
+    this.pending = new Map();
+    this.rtt = new LatencyHistogram();
+    this.reset();
+  }
+
+  /**
+   * Allocate the JSON-RPC id for the next mining.submit
+   */
+  nextId() {
+    return this.nextRequestId++;
+  }
+
+  /**
+   * Remember a submission until its response arrives or it expires
+   */
+  track(id, share) {
+    if (this.pending.size >= this.maxPending) {
+      const oldestId = this.pending.keys().next().value;
+      this.pending.delete(oldestId);
+      this.stats.evicted++;
+    }
+
+    this.pending.set(id, { ...share, submittedAt: performance.now() });
+    this.stats.submitted++;
+  }
+
+  /**
+   * Match a pool response to its submission and record the round trip
+   * Returns the tracked share, or null for unknown or already expired ids
+   */
+  resolve(id) {
+    const share = this.pending.get(id);
+    if (!share) {
+      this.stats.unmatched_responses++;
+      return null;
+    }
+
+    this.pending.delete(id);
+    const rttMs = performance.now() - share.submittedAt;
+    this.rtt.record(rttMs);
+    this.stats.resolved++;
+    return { ...share, rttMs };
+  }
+
+  /**
+   * Drop submissions older than the TTL; returns the expired shares
+   */
+  expire(now = performance.now()) {
+    const expired = [];
+    for (const [id, share] of this.pending) {
+      if (now - share.submittedAt < this.ttlMs) break;
+      this.pending.delete(id);
+      expired.push({ id, ...share });
+    }
+
+    this.stats.timed_out += expired.length;
+    return expired;
+  }
+
+  /**
+   * Forget in-flight submissions and counters, e.g. when mining restarts
+   * Request ids keep increasing so late responses from an old session never match
+   */
+  reset() {
+    this.pending.clear();
+    this.rtt.reset();
+    this.stats = {
+      submitted: 0,
+      resolved: 0,
+      timed_out: 0,
+      evicted: 0,
+      unmatched_responses: 0
+    };
+  }
+
+  /**
+   * Counters, in-flight count and round-trip histogram for status endpoints
+   */
+  getStats() {
+    return {
+      ...this.stats,
+      pending: this.pending.size,
+      ttl_ms: this.ttlMs,
+      rtt: this.rtt.toJSON()
+    };
+  }
+}
+
+module.exports = PendingShareTracker;
@@ -0,0 +1,287 @@
+/**
+ * Pool Manager - Node.js Implementation
+ * Probes every configured stratum endpoint, ranks them by connect + subscribe
+ * latency and decides which pool the engine should use: the best reachable one,
+ * failing over down the ranking, backing off unreachable pools exponentially
+ * with jitter, and returning to the primary once it answers again.
+ */
+
+const net = require('net');
+const { performance } = require('perf_hooks');
+const StratumFramer = require('./stratumFramer');
+
+const DEFAULT_PROBE_TIMEOUT_MS = 5000;
+const DEFAULT_BASE_BACKOFF_MS = 1000;
+const DEFAULT_MAX_BACKOFF_MS = 60000;
+const DEFAULT_PRIMARY_CHECK_MS = 60000;
+
+function poolKey(pool) {
+  return `${pool.host}:${pool.port}`;
+}
+
+// Accept "stratum+tcp://host" as well as a bare host name
+function cleanHost(host) {
+  return host.replace(/^stratum\+tcp:\/\//, '');
+}
+
+/**
+ * Exponential backoff with jitter: a delay in [cap / 2, cap) where
+ * cap = min(max, base * 2^(failures - 1)), so retries spread out but never collapse to zero
+ */
+function backoffDelay(failures, baseMs = DEFAULT_BASE_BACKOFF_MS, maxMs = DEFAULT_MAX_BACKOFF_MS, random = Math.random) {
+  const cap = Math.min(maxMs, baseMs * Math.pow(2, Math.max(0, failures - 1)));
+  return Math.round(cap / 2 + random() * cap / 2);
+}
+
+class PoolManager {
+  /**
+   * pools: [{ host, port }] in configured order; a custom pool should come first
+   */
+  constructor(pools, options = {}) {
+    if (!pools || pools.length === 0) {
+      throw new Error('No pools configured');
+    }
+
+    this.probeTimeoutMs = options.probe_timeout_ms || DEFAULT_PROBE_TIMEOUT_MS;
+    this.baseBackoffMs = options.base_backoff_ms || DEFAULT_BASE_BACKOFF_MS;
+    this.maxBackoffMs = options.max_backoff_ms || DEFAULT_MAX_BACKOFF_MS;
+    this.primaryCheckMs = options.primary_check_ms || DEFAULT_PRIMARY_CHECK_MS;
+    this.userAgent = options.user_agent || 'CryptoMiner Pro/1.0.0';
+
+    this.pools = pools.map((pool, index) => ({
+      host: pool.host,
+      port: pool.port,
+      configuredIndex: index,
+      reachable: null,
+      connect_ms: null,
+      subscribe_ms: null,
+      error: null,
+      failures: 0,
+      retryAt: 0,
+      probedAt: null
+    }));
+    this.ranking = [...this.pools];
+    this.active = null;
+    this.lastConnected = null; // Survives failures, to count pool switches
+    this.failovers = 0;
+    this.primaryCheckInterval = null;
+  }
+
+  /**
+   * Open a connection, send mining.subscribe and time both steps
+   */
+  probe(pool) {
+    return new Promise((resolve) => {
+      const socket = new net.Socket();
+      const startedAt = performance.now();
+      let connectedAt = null;
+      let settled = false;
+
+      const finish = (error) => {
+        if (settled) return;
+        settled = true;
+        clearTimeout(timeout);
+        socket.destroy();
+
+        pool.probedAt = new Date().toISOString();
+        pool.reachable = !error;
+        pool.error = error ? error.message : null;
+        if (error) {
+          pool.subscribe_ms = null;
+          if (connectedAt === null) pool.connect_ms = null;
+        } else {
+          pool.subscribe_ms = Math.round((performance.now() - connectedAt) * 100) / 100;
+        }
+        resolve(pool);
+      };
+
+      const timeout = setTimeout(() => finish(new Error('Probe timeout')), this.probeTimeoutMs);
+
+      const framer = new StratumFramer((message) => {
+        if (message.id !== 1) return;
+        finish(message.error ? new Error(`Subscribe failed: ${JSON.stringify(message.error)}`) : null);
+      });
+
+      socket.on('data', (data) => framer.push(data));
+      socket.on('error', (error) => finish(error));
+      socket.on('close', () => finish(new Error('Connection closed during probe')));
+
+      socket.connect(pool.port, cleanHost(pool.host), () => {
+        connectedAt = performance.now();
+        pool.connect_ms = Math.round((connectedAt - startedAt) * 100) / 100;
+        socket.write(JSON.stringify({ id: 1, method: 'mining.subscribe', params: [this.userAgent] }) + '\n');
+      });
+    });
+  }
+
+  /**
+   * Probe every pool in parallel and rank them: reachable before unreachable,
+   * then by connect + subscribe latency, then by configured order
+   */
+  async probeAll() {
+    await Promise.all(this.pools.map(pool => this.probe(pool)));
+
+    this.ranking = [...this.pools].sort((a, b) => {
+      if (a.reachable !== b.reachable) return a.reachable ? -1 : 1;
+      if (a.reachable) {
+        const latency = (a.connect_ms + a.subscribe_ms) - (b.connect_ms + b.subscribe_ms);
+        if (latency !== 0) return latency;
+      }
+      return a.configuredIndex - b.configuredIndex;
+    });
+
+    const summary = this.ranking
+      .map(pool => pool.reachable ? `${poolKey(pool)} ${(pool.connect_ms + pool.subscribe_ms).toFixed(1)} ms` : `${poolKey(pool)} unreachable`)
+      .join(', ');
+    console.log(`📡 Pool ranking: ${summary}`);
+
+    return this.ranking;
+  }
+
+  /**
+   * Highest-ranked pool: the one to return to after a failover
+   */
+  getPrimary() {
+    return this.ranking[0];
+  }
+
+  /**
+   * Pools not backing off, in rank order
+   */
+  getCandidates(now = Date.now()) {
+    return this.ranking.filter(pool => pool.retryAt <= now);
+  }
+
+  /**
+   * Milliseconds until the next backed-off pool may be retried
+   */
+  getRetryDelay(now = Date.now()) {
+    const soonest = Math.min(...this.ranking.map(pool => pool.retryAt));
+    return Math.max(0, soonest - now);
+  }
+
+  recordFailure(pool, error) {
+    pool.failures++;
+    pool.error = error ? error.message : pool.error;
+    const delay = backoffDelay(pool.failures, this.baseBackoffMs, this.maxBackoffMs);
+    pool.retryAt = Date.now() + delay;
+    if (this.active === pool) this.active = null;
+    console.log(`⚠️ Pool ${poolKey(pool)} failed (${pool.failures}x), backing off ${(delay / 1000).toFixed(1)}s`);
+  }
+
+  /**
+   * The pool's TCP connection is up; its failure count is kept until the session
+   * proves healthy, so a pool that accepts and then drops keeps backing off
+   */
+  recordSuccess(pool) {
+    if (this.lastConnected && this.lastConnected !== pool) {
+      this.failovers++;
+      console.log(`🔀 Switched pool ${poolKey(this.lastConnected)} → ${poolKey(pool)}`);
+    }
+    this.lastConnected = pool;
+    this.active = pool;
+  }
+
+  /**
+   * The pool sent work (mining.notify): clear its failures and backoff
+   */
+  recordHealthy(pool) {
+    pool.failures = 0;
+    pool.retryAt = 0;
+    pool.error = null;
+  }
+
+  /**
+   * Try each available pool in rank order with connectFn(pool) until one connects
+   * Resolves with the connected pool; rejects once every candidate has failed
+   */
+  async connect(connectFn) {
+    const candidates = this.getCandidates();
+    if (candidates.length === 0) {
+      throw new Error(`All pools backing off, next retry in ${(this.getRetryDelay() / 1000).toFixed(1)}s`);
+    }
+
+    for (const pool of candidates) {
+      try {
+        await connectFn(pool);
+        this.recordSuccess(pool);
+        return pool;
+      } catch (error) {
+        this.recordFailure(pool, error);
+      }
+    }
+
+    throw new Error('No pool reachable');
+  }
+
+  /**
+   * Mark the active pool as failed, e.g. when its connection drops
+   */
+  markActiveFailed(error) {
+    if (this.active) {
+      this.recordFailure(this.active, error);
+    }
+  }
+
+  /**
+   * Mark the active pool as healthy, e.g. on each mining.notify it sends
+   */
+  markActiveHealthy() {
+    if (this.active && this.active.failures > 0) {
+      this.recordHealthy(this.active);
+    }
+  }
+
+  /**
+   * While running on a fallback pool, periodically probe the primary and call
+   * switchFn(primary) once it answers again
+   */
+  startPrimaryCheck(switchFn) {
+    this.stopPrimaryCheck();
+    this.primaryCheckInterval = setInterval(async () => {
+      const primary = this.getPrimary();
+      if (!this.active || this.active === primary || primary.retryAt > Date.now()) return;
+
+      await this.probe(primary);
+      if (primary.reachable) {
+        console.log(`↩️ Primary pool ${poolKey(primary)} recovered, switching back`);
+        switchFn(primary);
+      }
+    }, this.primaryCheckMs);
+  }
+
+  stopPrimaryCheck() {
+    if (this.primaryCheckInterval) {
+      clearInterval(this.primaryCheckInterval);
+      this.primaryCheckInterval = null;
+    }
+  }
+
+  /**
+   * Ranking, active pool and failover counters for status endpoints
+   */
+  getState() {
+    return {
+      active: this.active ? poolKey(this.active) : null,
+      primary: poolKey(this.getPrimary()),
+      failovers: this.failovers,
+      pools: this.ranking.map(pool => ({
+        host: pool.host,
+        port: pool.port,
+        reachable: pool.reachable,
+        connect_ms: pool.connect_ms,
+        subscribe_ms: pool.subscribe_ms,
+        failures: pool.failures,
+        retry_in_ms: Math.max(0, pool.retryAt - Date.now()),
+        error: pool.error,
+        probed_at: pool.probedAt
+      }))
+    };
+  }
+}
+
+module.exports = {
+  PoolManager,
+  backoffDelay,
+  poolKey
+};
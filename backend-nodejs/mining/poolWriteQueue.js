@@ -0,0 +1,184 @@
+/**
+ * Pool Write Queue - Node.js Implementation
+ * Outbound stratum messages for one pool session. Messages written in the same
+ * tick are coalesced into one socket write with cork/uncork, writing stops
+ * while the socket is applying backpressure until 'drain', and queued messages
+ * survive a reconnect so they can be sent on the new socket if still valid.
+ */
+
+// Oldest queued messages are dropped beyond this depth
+const DEFAULT_MAX_QUEUED = 256;
+
+class PoolWriteQueue {
+  constructor(options = {}) {
+    this.maxQueued = options.maxQueued || DEFAULT_MAX_QUEUED;
+
+    this.socket = null;
+    this.open = false; // Set once the pool session is ready for queued messages
+    this.waitingForDrain = false;
+    this.flushScheduled = false;
+    this.queue = [];
+    this.onDrain = () => {
+      this.waitingForDrain = false;
+      this.flush();
+    };
+
+    this.stats = {
+      sent: 0,
+      sent_bytes: 0,
+      flushes: 0,
+      coalesced_flushes: 0,
+      max_batch: 0,
+      drain_waits: 0,
+      retried: 0,
+      dropped_overflow: 0,
+      dropped_expired: 0,
+      dropped_disconnected: 0
+    };
+  }
+
+  /**
+   * Use a newly connected socket; queued messages wait for open()
+   */
+  attach(socket) {
+    this.detach();
+    this.socket = socket;
+    this.open = false;
+    this.waitingForDrain = false;
+    socket.on('drain', this.onDrain);
+  }
+
+  /**
+   * Forget the socket but keep queued messages for the next one
+   */
+  detach() {
+    if (this.socket) {
+      this.socket.removeListener('drain', this.onDrain);
+    }
+    this.socket = null;
+    this.open = false;
+    this.waitingForDrain = false;
+  }
+
+  /**
+   * Start writing queued messages, e.g. once the pool answered mining.subscribe
+   */
+  openSession() {
+    this.open = true;
+    this.scheduleFlush();
+  }
+
+  /**
+   * Write a session-control message (subscribe, authorize) straight away
+   * These are only meaningful on the current socket, so they are never queued
+   */
+  sendNow(message) {
+    if (!this.isWritable()) {
+      this.stats.dropped_disconnected++;
+      return false;
+    }
+
+    const line = JSON.stringify(message) + '\n';
+    this.write(line);
+    return true;
+  }
+
+  /**
+   * Queue a message for the next flush
+   * options.isValid() is checked right before writing; messages no longer valid
+   * (e.g. shares for a replaced job) are dropped instead of sent
+   * options.onSent() is called once the message is handed to the socket
+   */
+  enqueue(message, options = {}) {
+    if (this.queue.length >= this.maxQueued) {
+      this.queue.shift();
+      this.stats.dropped_overflow++;
+    }
+
+    this.queue.push({
+      line: JSON.stringify(message) + '\n',
+      isValid: options.isValid || null,
+      onSent: options.onSent || null,
+      socket: this.socket
+    });
+    this.scheduleFlush();
+  }
+
+  // Coalesce everything enqueued in this tick into one flush
+  scheduleFlush() {
+    if (this.flushScheduled) return;
+    this.flushScheduled = true;
+    process.nextTick(() => {
+      this.flushScheduled = false;
+      this.flush();
+    });
+  }
+
+  isWritable() {
+    return this.socket !== null && this.socket.writable && !this.socket.destroyed;
+  }
+
+  flush() {
+    if (!this.open || this.waitingForDrain || !this.isWritable() || this.queue.length === 0) return;
+
+    const socket = this.socket;
+    let batch = 0;
+    socket.cork();
+    try {
+      while (this.queue.length > 0) {
+        const entry = this.queue.shift();
+        if (entry.isValid && !entry.isValid()) {
+          this.stats.dropped_expired++;
+          continue;
+        }
+
+        if (entry.socket !== socket) this.stats.retried++;
+        const flushed = this.write(entry.line);
+        batch++;
+        if (entry.onSent) entry.onSent(entry.line);
+
+        if (!flushed) {
+          // Kernel buffer is full: hold the rest until the socket drains
+          this.waitingForDrain = true;
+          this.stats.drain_waits++;
+          break;
+        }
+      }
+    } finally {
+      socket.uncork();
+    }
+
+    if (batch > 0) {
+      this.stats.flushes++;
+      if (batch > 1) this.stats.coalesced_flushes++;
+      if (batch > this.stats.max_batch) this.stats.max_batch = batch;
+    }
+  }
+
+  write(line) {
+    this.stats.sent++;
+    this.stats.sent_bytes += Buffer.byteLength(line);
+    return this.socket.write(line);
+  }
+
+  /**
+   * Drop everything still queued, e.g. when mining stops
+   */
+  clear() {
+    this.queue = [];
+  }
+
+  /**
+   * Queue depth and counters for status endpoints
+   */
+  getStats() {
+    return {
+      ...this.stats,
+      depth: this.queue.length,
+      open: this.open,
+      waiting_for_drain: this.waitingForDrain
+    };
+  }
+}
+
+module.exports = PoolWriteQueue;
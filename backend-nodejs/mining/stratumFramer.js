@@ -0,0 +1,111 @@
+/**
+ * Stratum Framer - Node.js Implementation
+ * Incremental newline-delimited JSON framing for a stratum TCP stream.
+ * TCP chunks may end mid-message (or mid UTF-8 sequence); partial lines are
+ * buffered until their newline arrives, up to a bounded length.
+ */
+
+const { StringDecoder } = require('string_decoder');
+
+// A single stratum line longer than this is treated as a broken stream and dropped
+const DEFAULT_MAX_LINE_LENGTH = 256 * 1024;
+
+class StratumFramer {
+  /**
+   * onMessage(message) is called once per parsed JSON line
+   * options.onError(error, line) is called for lines that fail to parse or overflow
+   */
+  constructor(onMessage, options = {}) {
+    this.onMessage = onMessage;
+    this.onError = options.onError || null;
+    this.maxLineLength = options.maxLineLength || DEFAULT_MAX_LINE_LENGTH;
+
+    this.decoder = new StringDecoder('utf8');
+    this.buffer = '';
+    this.discarding = false; // Skipping the rest of an oversized line
+
+    this.stats = {
+      bytes: 0,
+      messages: 0,
+      parse_errors: 0,
+      overflows: 0
+    };
+  }
+
+  /**
+   * Feed one chunk from the socket; dispatches every complete line it finishes
+   */
+  push(chunk) {
+    this.stats.bytes += chunk.length;
+    const text = typeof chunk === 'string' ? chunk : this.decoder.write(chunk);
+
+    let start = 0;
+    let newline = text.indexOf('\n');
+    while (newline !== -1) {
+      if (this.discarding) {
+        this.discarding = false;
+      } else if (this.buffer.length > 0) {
+        const line = this.buffer + text.slice(start, newline);
+        this.buffer = '';
+        this.dispatch(line);
+      } else {
+        this.dispatch(text.slice(start, newline));
+      }
+      start = newline + 1;
+      newline = text.indexOf('\n', start);
+    }
+
+    if (start < text.length && !this.discarding) {
+      this.buffer += start === 0 ? text : text.slice(start);
+      if (this.buffer.length > this.maxLineLength) {
+        this.stats.overflows++;
+        this.buffer = '';
+        this.discarding = true;
+        this.reportError(new Error(`Stratum line exceeds ${this.maxLineLength} characters`), null);
+      }
+    }
+  }
+
+  dispatch(line) {
+    // Tolerate CRLF and blank keep-alive lines
+    const trimmed = line.charCodeAt(line.length - 1) === 13 ? line.slice(0, -1) : line;
+    if (trimmed.length === 0) return;
+
+    let message;
+    try {
+      message = JSON.parse(trimmed);
+    } catch (error) {
+      this.stats.parse_errors++;
+      this.reportError(error, trimmed);
+      return;
+    }
+
+    this.stats.messages++;
+    this.onMessage(message);
+  }
+
+  reportError(error, line) {
+    if (this.onError) this.onError(error, line);
+  }
+
+  /**
+   * Drop any partial line, e.g. when the socket is replaced
+   */
+  reset() {
+    this.decoder = new StringDecoder('utf8');
+    this.buffer = '';
+    this.discarding = false;
+  }
+
+  /**
+   * Framing counters plus the size of the pending partial line
+   */
+  getStats() {
+    return {
+      ...this.stats,
+      buffered_bytes: this.buffer.length
+    };
+  }
+}
+
+module.exports = StratumFramer;
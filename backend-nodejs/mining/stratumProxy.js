@@ -0,0 +1,588 @@
+/**
+ * Stratum Proxy - Node.js Implementation
+ * Aggregates many local miners behind one upstream pool connection.
+ * Downstream miners speak stratum to the proxy; each session gets a disjoint
+ * slice of the pool's extranonce2 space (the pool's extranonce1 plus a
+ * per-session prefix), so their shares never overlap upstream. Jobs and
+ * difficulty are serialized once and fanned out, and pool selection and
+ * failover happen here, in one place, through PoolManager.
+ */
+
+const EventEmitter = require('events');
+const net = require('net');
+const StratumFramer = require('./stratumFramer');
+const PendingShareTracker = require('./pendingShares');
+const PoolWriteQueue = require('./poolWriteQueue');
+const { PoolManager, poolKey } = require('./poolManager');
+
+const DEFAULT_LISTEN_PORT = 3333;
+const DEFAULT_LISTEN_HOST = '0.0.0.0';
+const UPSTREAM_CONNECT_TIMEOUT_MS = 5000;
+
+// Downstream sessions need at least this many extranonce2 bytes of their own
+const MIN_DOWNSTREAM_EXTRANONCE2_SIZE = 2;
+// A two-byte prefix is only taken when sessions still keep this many
+const PREFERRED_DOWNSTREAM_EXTRANONCE2_SIZE = 4;
+
+// Stratum error codes
+const ERROR_OTHER = 20;
+const ERROR_JOB_NOT_FOUND = 21;
+const ERROR_NOT_SUBSCRIBED = 25;
+
+/**
+ * Bytes of the pool's extranonce2 reserved for the per-session prefix:
+ * two when the pool leaves room (65536 sessions), otherwise one (256 sessions)
+ */
+function getPrefixSize(upstreamExtranonce2Size) {
+  return upstreamExtranonce2Size - 2 >= PREFERRED_DOWNSTREAM_EXTRANONCE2_SIZE ? 2 : 1;
+}
+
+class StratumProxy extends EventEmitter {
+  constructor(config = {}) {
+    super();
+    this.config = config;
+    // Port 0 binds an ephemeral port, reported in getStatus()
+    this.listenPort = config.listen_port !== undefined ? Number(config.listen_port) : DEFAULT_LISTEN_PORT;
+    this.listenHost = config.listen_host || DEFAULT_LISTEN_HOST;
+
+    this.server = null;
+    this.running = false;
+    this.startTime = null;
+
+    // Upstream pool session
+    this.poolManager = null;
+    this.upstream = null;
+    this.upstreamFramer = null;
+    this.upstreamWriter = new PoolWriteQueue();
+    this.reconnectTimer = null;
+    this.extranonce1 = null;
+    this.extranonce2Size = null;
+    this.prefixSize = null;
+    this.extranonceError = null; // Set when the pool's extranonce2 cannot be split between sessions
+    this.difficulty = null;
+    this.notifyParams = null;
+    this.pendingShares = new PendingShareTracker();
+    this.expireInterval = null;
+
+    // Downstream sessions by id; prefixes in use map to their session
+    this.sessions = new Map();
+    this.prefixes = new Map();
+    this.nextSessionId = 1;
+
+    this.stats = {
+      sessions_total: 0,
+      submitted_shares: 0,
+      accepted_shares: 0,
+      rejected_shares: 0,
+      invalid_submits: 0,
+      notify_broadcasts: 0,
+      upstream_connects: 0
+    };
+  }
+
+  /**
+   * Open the upstream pool connection and start accepting downstream miners
+   */
+  async start() {
+    if (this.running) {
+      return { success: false, message: 'Stratum proxy already running' };
+    }
+
+    const validation = this.validateConfig();
+    if (!validation.valid) {
+      return { success: false, message: validation.error };
+    }
+
+    try {
+      await this.listen();
+    } catch (error) {
+      return { success: false, message: `Failed to listen on ${this.listenHost}:${this.listenPort}: ${error.message}` };
+    }
+
+    this.running = true;
+    this.startTime = Date.now();
+    this.pendingShares.reset();
+    this.expireInterval = setInterval(() => this.pendingShares.expire(), 1000);
+
+    this.poolManager = new PoolManager(this.config.pools);
+    await this.poolManager.probeAll();
+    this.poolManager.startPrimaryCheck((primary) => this.switchUpstream(primary));
+
+    try {
+      await this.poolManager.connect((pool) => this.connectUpstream(pool));
+    } catch (error) {
+      console.log(`⚠️ Proxy has no upstream pool yet (${error.message}), retrying with backoff`);
+      this.scheduleReconnect();
+    }
+
+    console.log(`✅ Stratum proxy listening on ${this.listenHost}:${this.listenPort}`);
+    this.emit('proxy_started', this.getStatus());
+    return { success: true, message: 'Stratum proxy started', listen: `${this.listenHost}:${this.listenPort}` };
+  }
+
+  /**
+   * Close every downstream session and the upstream connection
+   */
+  async stop() {
+    if (!this.running) {
+      return { success: false, message: 'Stratum proxy not running' };
+    }
+
+    this.running = false;
+    clearInterval(this.expireInterval);
+    this.expireInterval = null;
+    if (this.reconnectTimer) {
+      clearTimeout(this.reconnectTimer);
+      this.reconnectTimer = null;
+    }
+    this.poolManager.stopPrimaryCheck();
+
+    const upstream = this.upstream;
+    this.upstream = null;
+    this.upstreamWriter.detach();
+    this.upstreamWriter.clear();
+    if (upstream) upstream.destroy();
+
+    this.sessions.forEach(session => session.socket.destroy());
+    await new Promise(resolve => this.server.close(() => resolve()));
+    this.server = null;
+
+    console.log('🛑 Stratum proxy stopped');
+    this.emit('proxy_stopped');
+    return { success: true, message: 'Stratum proxy stopped' };
+  }
+
+  validateConfig() {
+    if (!Array.isArray(this.config.pools) || this.config.pools.length === 0) {
+      return { valid: false, error: 'At least one upstream pool is required' };
+    }
+    if (!this.config.pool_username) {
+      return { valid: false, error: 'pool_username is required for the upstream pool' };
+    }
+    if (!Number.isInteger(this.listenPort) || this.listenPort < 0 || this.listenPort > 65535) {
+      return { valid: false, error: 'listen_port must be between 0 and 65535' };
+    }
+    return { valid: true };
+  }
+
+  listen() {
+    return new Promise((resolve, reject) => {
+      this.server = net.createServer((socket) => this.acceptSession(socket));
+      this.server.once('error', reject);
+      this.server.listen(this.listenPort, this.listenHost, () => {
+        this.server.removeListener('error', reject);
+        // Report the bound port when listen_port was 0
+        this.listenPort = this.server.address().port;
+        resolve();
+      });
+    });
+  }
+
+  // ==============================
+  // Upstream pool connection
+  // ==============================
+
+  /**
+   * Connect to one pool; resolves once TCP is up, like MiningEngine.connectToPool()
+   */
+  connectUpstream(pool) {
+    return new Promise((resolve, reject) => {
+      console.log(`🔗 Proxy connecting upstream: ${poolKey(pool)}`);
+
+      const socket = new net.Socket();
+      socket.setKeepAlive(true);
+      socket.setNoDelay(true);
+      let established = false;
+
+      const connectionTimeout = setTimeout(() => {
+        socket.destroy();
+        reject(new Error('Connection timeout'));
+      }, UPSTREAM_CONNECT_TIMEOUT_MS);
+
+      const framer = new StratumFramer((message) => this.handleUpstreamMessage(message), {
+        onError: (error) => console.error('Error parsing upstream message:', error.message)
+      });
+
+      socket.connect(pool.port, pool.host.replace(/^stratum\+tcp:\/\//, ''), () => {
+        clearTimeout(connectionTimeout);
+        established = true;
+
+        const previous = this.upstream;
+        this.upstream = socket;
+        this.upstreamFramer = framer;
+        this.upstreamWriter.attach(socket);
+        this.stats.upstream_connects++;
+        if (previous) previous.destroy();
+
+        this.sendUpstream({ id: 1, method: 'mining.subscribe', params: ['CryptoMiner Pro Proxy/1.0.0'] });
+        this.sendUpstream({ id: 2, method: 'mining.authorize', params: [this.config.pool_username, this.config.pool_password || 'x'] });
+        resolve();
+      });
+
+      socket.on('data', (data) => framer.push(data));
+
+      socket.on('error', (error) => {
+        clearTimeout(connectionTimeout);
+        console.error('Upstream pool error:', error.message);
+        reject(error);
+      });
+
+      socket.on('close', () => {
+        if (!established || this.upstream !== socket) return;
+
+        console.log('🔌 Upstream pool connection closed');
+        this.upstream = null;
+        this.upstreamWriter.detach();
+        if (this.running) {
+          this.poolManager.markActiveFailed(new Error('Connection closed'));
+          this.scheduleReconnect();
+        }
+      });
+    });
+  }
+
+  scheduleReconnect() {
+    if (!this.running || this.reconnectTimer) return;
+
+    this.reconnectTimer = setTimeout(async () => {
+      this.reconnectTimer = null;
+      if (!this.running) return;
+
+      try {
+        await this.poolManager.connect((pool) => this.connectUpstream(pool));
+      } catch (error) {
+        console.error('Proxy upstream reconnection failed:', error.message);
+        this.scheduleReconnect();
+      }
+    }, this.poolManager.getRetryDelay());
+  }
+
+  async switchUpstream(pool) {
+    try {
+      await this.connectUpstream(pool);
+      this.poolManager.recordSuccess(pool);
+    } catch (error) {
+      this.poolManager.recordFailure(pool, error);
+    }
+  }
+
+  /**
+   * Session-control message (subscribe, authorize) on the current upstream socket
+   */
+  sendUpstream(message) {
+    return this.upstreamWriter.sendNow(message);
+  }
+
+  handleUpstreamMessage(message) {
+    if (message.method === 'mining.notify') {
+      this.poolManager.markActiveHealthy();
+      this.notifyParams = message.params;
+      this.broadcast({ id: null, method: 'mining.notify', params: message.params });
+      this.stats.notify_broadcasts++;
+    } else if (message.method === 'mining.set_difficulty') {
+      this.difficulty = message.params[0];
+      this.broadcast({ id: null, method: 'mining.set_difficulty', params: message.params });
+    } else if (message.id === 1 && message.result) {
+      this.setUpstreamExtranonce(message.result[1], message.result[2]);
+    } else if (message.id === 2) {
+      if (message.result) {
+        console.log('✅ Proxy upstream authorization successful');
+      } else {
+        console.error(`❌ Proxy upstream authorization failed: ${JSON.stringify(message.error)}`);
+      }
+    } else if (message.id > 2) {
+      this.handleUpstreamShareResult(message);
+    }
+  }
+
+  /**
+   * Apply the pool's extranonce to every downstream session
+   * Sessions that support mining.set_extranonce get their new value in place;
+   * the rest are disconnected so they resubscribe
+   */
+  setUpstreamExtranonce(extranonce1, extranonce2Size) {
+    const changed = this.extranonce1 !== null &&
+      (extranonce1 !== this.extranonce1 || extranonce2Size !== this.extranonce2Size);
+
+    this.extranonce1 = extranonce1 || '';
+    this.extranonce2Size = extranonce2Size || 4;
+    this.prefixSize = getPrefixSize(this.extranonce2Size);
+    // Jobs from the previous pool must not be handed to new subscribers
+    this.notifyParams = null;
+    console.log(`✅ Proxy upstream subscribed (extranonce1: ${this.extranonce1}, extranonce2_size: ${this.extranonce2Size}, ${256 ** this.prefixSize} session slots)`);
+    // Queued submits go out once the session is subscribed
+    this.upstreamWriter.openSession();
+
+    this.extranonceError = null;
+    if (this.getDownstreamExtranonce2Size() < MIN_DOWNSTREAM_EXTRANONCE2_SIZE) {
+      this.extranonceError = `upstream extranonce2_size ${this.extranonce2Size} too small to split`;
+      console.error(`❌ Proxy cannot serve miners: ${this.extranonceError}`);
+    }
+
+    for (const session of this.sessions.values()) {
+      if (session.waitingForSubscribe) {
+        this.completeSubscribe(session);
+      } else if (changed && session.subscribed) {
+        if (session.extranonceSubscribed && this.allocatePrefix(session)) {
+          this.sendDownstream(session, {
+            id: null,
+            method: 'mining.set_extranonce',
+            params: [this.getSessionExtranonce1(session), this.getDownstreamExtranonce2Size()]
+          });
+        } else {
+          session.socket.destroy();
+        }
+      }
+    }
+  }
+
+  handleUpstreamShareResult(message) {
+    const share = this.pendingShares.resolve(message.id);
+    const accepted = message.result === true;
+    if (accepted) {
+      this.stats.accepted_shares++;
+    } else {
+      this.stats.rejected_shares++;
+    }
+    if (!share) return;
+
+    const session = this.sessions.get(share.sessionId);
+    if (!session) return;
+
+    if (accepted) {
+      session.accepted++;
+    } else {
+      session.rejected++;
+    }
+    this.sendDownstream(session, { id: share.downstreamId, result: message.result, error: message.error || null });
+  }
+
+  // ==============================
+  // Downstream miner sessions
+  // ==============================
+
+  acceptSession(socket) {
+    const session = {
+      id: this.nextSessionId++,
+      socket,
+      address: `${socket.remoteAddress}:${socket.remotePort}`,
+      worker: null,
+      prefix: null,
+      subscribed: false,
+      waitingForSubscribe: null,
+      extranonceSubscribed: false,
+      accepted: 0,
+      rejected: 0,
+      connectedAt: new Date().toISOString()
+    };
+
+    socket.setNoDelay(true);
+    this.sessions.set(session.id, session);
+    this.stats.sessions_total++;
+
+    const framer = new StratumFramer((message) => this.handleDownstreamMessage(session, message), {
+      onError: () => socket.destroy()
+    });
+    socket.on('data', (data) => framer.push(data));
+    socket.on('error', () => {});
+    socket.on('close', () => {
+      this.releasePrefix(session);
+      this.sessions.delete(session.id);
+    });
+  }
+
+  handleDownstreamMessage(session, message) {
+    switch (message.method) {
+      case 'mining.subscribe':
+        session.waitingForSubscribe = message.id;
+        if (this.extranonce1 !== null) this.completeSubscribe(session);
+        break;
+      case 'mining.extranonce.subscribe':
+        session.extranonceSubscribed = true;
+        this.sendDownstream(session, { id: message.id, result: true, error: null });
+        break;
+      case 'mining.authorize':
+        // Rigs authenticate to the proxy by name only; the pool sees the proxy's account
+        session.worker = message.params && message.params[0];
+        this.sendDownstream(session, { id: message.id, result: true, error: null });
+        break;
+      case 'mining.submit':
+        this.forwardShare(session, message);
+        break;
+      default:
+        this.sendDownstream(session, { id: message.id, result: null, error: [ERROR_OTHER, `Unsupported method ${message.method}`, null] });
+    }
+  }
+
+  /**
+   * Answer a pending mining.subscribe with this session's extranonce slice,
+   * then hand it the current difficulty and job
+   */
+  completeSubscribe(session) {
+    const requestId = session.waitingForSubscribe;
+    session.waitingForSubscribe = null;
+
+    if (!this.allocatePrefix(session)) {
+      const reason = this.extranonceError || 'Proxy is full';
+      this.sendDownstream(session, { id: requestId, result: null, error: [ERROR_OTHER, reason, null] });
+      session.socket.end();
+      return;
+    }
+
+    session.subscribed = true;
+    this.sendDownstream(session, {
+      id: requestId,
+      result: [
+        [['mining.set_difficulty', `proxy-${session.id}`], ['mining.notify', `proxy-${session.id}`]],
+        this.getSessionExtranonce1(session),
+        this.getDownstreamExtranonce2Size()
+      ],
+      error: null
+    });
+
+    if (this.difficulty !== null) {
+      this.sendDownstream(session, { id: null, method: 'mining.set_difficulty', params: [this.difficulty] });
+    }
+    if (this.notifyParams) {
+      const params = [...this.notifyParams];
+      params[8] = true; // A new session has no earlier work to keep
+      this.sendDownstream(session, { id: null, method: 'mining.notify', params });
+    }
+  }
+
+  /**
+   * Rewrite a downstream mining.submit into the upstream extranonce2 space
+   */
+  forwardShare(session, message) {
+    const [, jobId, extranonce2, nTime, nonce] = message.params || [];
+    const expectedLength = this.getDownstreamExtranonce2Size() * 2;
+
+    if (!session.subscribed) {
+      this.stats.invalid_submits++;
+      this.sendDownstream(session, { id: message.id, result: null, error: [ERROR_NOT_SUBSCRIBED, 'Not subscribed', null] });
+      return;
+    }
+    if (typeof extranonce2 !== 'string' || extranonce2.length !== expectedLength) {
+      this.stats.invalid_submits++;
+      this.sendDownstream(session, { id: message.id, result: null, error: [ERROR_OTHER, `extranonce2 must be ${expectedLength} hex characters`, null] });
+      return;
+    }
+    if (!this.upstream) {
+      this.sendDownstream(session, { id: message.id, result: null, error: [ERROR_JOB_NOT_FOUND, 'Upstream pool unavailable', null] });
+      return;
+    }
+
+    // Queued with backpressure like the engine's submits; only valid on the upstream session it was made for
+    const upstreamId = this.pendingShares.nextId();
+    const upstream = this.upstream;
+    this.upstreamWriter.enqueue({
+      id: upstreamId,
+      method: 'mining.submit',
+      params: [this.config.pool_username, jobId, this.getPrefixHex(session) + extranonce2, nTime, nonce]
+    }, {
+      isValid: () => this.upstream === upstream,
+      onSent: () => {
+        this.pendingShares.track(upstreamId, { sessionId: session.id, downstreamId: message.id, jobId });
+        this.stats.submitted_shares++;
+      }
+    });
+  }
+
+  /**
+   * Serialize once and write the same line to every subscribed session
+   */
+  broadcast(message) {
+    const line = JSON.stringify(message) + '\n';
+    for (const session of this.sessions.values()) {
+      if (session.subscribed && session.socket.writable) {
+        session.socket.write(line);
+      }
+    }
+  }
+
+  sendDownstream(session, message) {
+    if (session.socket.writable) {
+      session.socket.write(JSON.stringify(message) + '\n');
+    }
+  }
+
+  // ==============================
+  // Extranonce space
+  // ==============================
+
+  getDownstreamExtranonce2Size() {
+    return this.extranonce2Size - this.prefixSize;
+  }
+
+  getPrefixHex(session) {
+    return session.prefix.toString(16).padStart(this.prefixSize * 2, '0');
+  }
+
+  getSessionExtranonce1(session) {
+    return this.extranonce1 + this.getPrefixHex(session);
+  }
+
+  /**
+   * Give the session the lowest free prefix; keeps its current one if still valid
+   */
+  allocatePrefix(session) {
+    const slots = 256 ** this.prefixSize;
+    if (this.getDownstreamExtranonce2Size() < MIN_DOWNSTREAM_EXTRANONCE2_SIZE) return false;
+    if (session.prefix !== null && session.prefix < slots) return true;
+
+    this.releasePrefix(session);
+    for (let prefix = 0; prefix < slots; prefix++) {
+      if (!this.prefixes.has(prefix)) {
+        this.prefixes.set(prefix, session);
+        session.prefix = prefix;
+        return true;
+      }
+    }
+    return false;
+  }
+
+  releasePrefix(session) {
+    if (session.prefix !== null && this.prefixes.get(session.prefix) === session) {
+      this.prefixes.delete(session.prefix);
+    }
+    session.prefix = null;
+  }
+
+  /**
+   * Proxy, upstream and per-session state for the status endpoint
+   */
+  getStatus() {
+    return {
+      running: this.running,
+      listen: `${this.listenHost}:${this.listenPort}`,
+      uptime: this.startTime && this.running ? (Date.now() - this.startTime) / 1000 : 0,
+      upstream: {
+        connected: this.upstream !== null,
+        pool: this.poolManager ? this.poolManager.getState().active : null,
+        extranonce1: this.extranonce1,
+        extranonce2_size: this.extranonce2Size,
+        extranonce_error: this.extranonceError,
+        difficulty: this.difficulty,
+        current_job: this.notifyParams ? this.notifyParams[0] : null
+      },
+      upstream_writes: this.upstreamWriter.getStats(),
+      pools: this.poolManager ? this.poolManager.getState() : null,
+      stats: { ...this.stats, sessions: this.sessions.size },
+      pending_shares: this.pendingShares.getStats(),
+      sessions: [...this.sessions.values()].map(session => ({
+        id: session.id,
+        address: session.address,
+        worker: session.worker,
+        extranonce1: session.subscribed ? this.getSessionExtranonce1(session) : null,
+        accepted_shares: session.accepted,
+        rejected_shares: session.rejected,
+        connected_at: session.connectedAt
+      }))
+    };
+  }
+}
+
+module.exports = {
+  StratumProxy,
+  getPrefixSize
+};
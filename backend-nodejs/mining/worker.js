@@ -0,0 +1,743 @@
+/**
+ * Real Mining Worker - Node.js Implementation
+ * Scrypt hashing loop that runs inside a worker_threads Worker so that
+ * mining never blocks the Express/Socket.IO event loop
+ */
+
+const crypto = require('crypto');
+const EventEmitter = require('events');
+const { performance } = require('perf_hooks');
+const { isMainThread, parentPort, workerData } = require('worker_threads');
+const { ScryptContext } = require('../utils/ricmoo-scrypt');
+const scryptBackends = require('../utils/scryptBackends');
+
+// Layout of the per-worker SharedArrayBuffer counters (BigInt64 slots)
+const COUNTER = {
+  HASHES: 0,
+  SHARES: 1,
+  BUSY_MICROS: 2, // Time spent hashing, for the effective CPU share
+  NONCE: 3, // Next nonce to hash, published with each hash count flush
+  JOB_EPOCH: 4 // Epoch of the job being hashed
+};
+const COUNTER_SLOTS = 5;
+
+// Layout of the engine-wide SharedArrayBuffer control block (Int32 slots), shared by all workers
+const CONTROL = {
+  INTENSITY: 0, // Duty cycle in per-mille (100..1000)
+  DUTY_PERIOD_MS: 1,
+  JOB_EPOCH: 2, // Bumped by the engine on every clean job; older work is stale
+  EXTRANONCE2: 3 // Next unclaimed extranonce2; reset by the engine on a new block or pool, claims are unique until then
+};
+const CONTROL_SLOTS = 4;
+
+// Used when the pool did not send an extranonce2_size (solo and test mode)
+const DEFAULT_EXTRANONCE2_SIZE = 4;
+
+// CONTROL.EXTRANONCE2 is a 32-bit slot, so at most this many claims per epoch
+const EXTRANONCE2_CLAIM_LIMIT = 0x100000000;
+
+// Scrypt pool difficulty 1 target (0x0000ffff << 224); stratum difficulty is relative to it
+const SCRYPT_DIFF1_TARGET = 0xffffn << 224n;
+const MAX_TARGET = (1n << 256n) - 1n;
+
+/**
+ * Exact floor(SCRYPT_DIFF1_TARGET / difficulty) for any positive double difficulty.
+ * The double is decomposed into mantissa * 2^exponent so fractional pool
+ * difficulties (e.g. 0.001) lose no precision.
+ */
+function difficultyToTargetBigInt(difficulty) {
+  const view = new DataView(new ArrayBuffer(8));
+  view.setFloat64(0, difficulty);
+  const bits = view.getBigUint64(0);
+  const biasedExponent = Number((bits >> 52n) & 0x7ffn);
+  const fraction = bits & ((1n << 52n) - 1n);
+
+  const mantissa = biasedExponent === 0 ? fraction : fraction | (1n << 52n);
+  const exponent = (biasedExponent === 0 ? 1 : biasedExponent) - 1075;
+
+  const target = exponent >= 0
+    ? SCRYPT_DIFF1_TARGET / (mantissa << BigInt(exponent))
+    : (SCRYPT_DIFF1_TARGET << BigInt(-exponent)) / mantissa;
+  return target > MAX_TARGET ? MAX_TARGET : target;
+}
+
+// Length of one mine/sleep duty cycle unless config.duty_cycle_ms is set
+const DEFAULT_DUTY_PERIOD_MS = 500;
+
+const NONCE_SPACE = 0x100000000;
+
+/**
+ * Nonce range [start, end) of worker `index` when 2^32 nonces are split between `count` workers
+ */
+function getNonceRange(index, count) {
+  return {
+    start: Math.floor(index * NONCE_SPACE / count),
+    end: Math.floor((index + 1) * NONCE_SPACE / count)
+  };
+}
+
+// Longest stretch of synchronous hashing before yielding to the thread's event loop
+const MINE_SLICE_MS = 50;
+
+// Nonces hashed per mine() call; the ricmoo-js backend interleaves them through ROMix in lanes
+const HASH_BATCH_SIZE = 16;
+
+// Hash counts are published in batches: every HASH_FLUSH_COUNT hashes or HASH_FLUSH_MS, whichever first
+const HASH_FLUSH_COUNT = 4096;
+const HASH_FLUSH_MS = 250;
+
+/**
+ * Allocate a shared control block initialised from the mining config
+ */
+function createControl(config = {}) {
+  const control = new Int32Array(new SharedArrayBuffer(CONTROL_SLOTS * Int32Array.BYTES_PER_ELEMENT));
+  control[CONTROL.INTENSITY] = Math.round((config.intensity || 1.0) * 1000);
+  control[CONTROL.DUTY_PERIOD_MS] = config.duty_cycle_ms || DEFAULT_DUTY_PERIOD_MS;
+  return control;
+}
+
+/**
+ * Real Mining Worker Class
+ */
+class RealMiningWorker extends EventEmitter {
+  constructor(id, config, options = {}) {
+    super();
+    this.id = id;
+    this.config = config;
+    this.running = false;
+    this.loopDone = null; // Settles once the mining loop has exited
+    this.currentJob = null;
+    this.header = Buffer.alloc(80); // Per-job header template, only bytes 76..79 change per nonce
+    this.scryptContext = null; // Reference context for cryptoScryptHash(), created on first use
+    this.hashWords = new Uint32Array(8 * HASH_BATCH_SIZE); // Batch results, 8 little-endian words per hash
+    this.hashView = Buffer.from(this.hashWords.buffer);
+    this.difficulty = 1;
+    this.targetWords = new Uint32Array(8); // Share target, same little-endian word layout as hashWords
+
+    // Hot-loop hasher from the selected scrypt backend, owns its scratch buffers for this worker
+    this.scryptBackend = options.scryptBackend || 'ricmoo-js';
+    this.hasherAsync = scryptBackends.getBackend(this.scryptBackend).async;
+    this.hasher = scryptBackends.createHasher(this.scryptBackend, { lanes: config.scrypt_lanes });
+    // Divide nonce space between workers; the engine reassigns ranges when the pool is resized
+    const nonceRange = options.nonceRange || { start: id * 0x1000000, end: (id + 1) * 0x1000000 };
+    this.nonceStart = nonceRange.start;
+    this.nonceEnd = nonceRange.end;
+    this.nonce = this.nonceStart;
+    
+    // Add mining statistics
+    this.hashCount = 0;
+    this.shareCount = 0;
+    this.startTime = Date.now();
+    this.unflushedHashes = 0; // Hashes not yet published with a 'hashes' event
+    this.lastFlush = Date.now();
+
+    // Debug stream: emit a 'hash' sample every N hashes (0 disables it)
+    this.hashSampleInterval = config.hash_sample_interval || 0;
+
+    // Duty cycle written by the engine at runtime; a standalone worker gets its own
+    this.control = options.control || createControl(config);
+    this.busyMicros = 0; // Hashing time not yet published with a 'hashes' event
+    this.jobEpoch = 0;
+
+    // Per-job coinbase pieces, so rolling extranonce2 only re-hashes the coinbase and branches
+    this.coinbasePrefix = null; // coinb1 || extranonce1
+    this.coinbaseSuffix = null; // coinb2
+    this.merkleBranches = [];
+    this.extranonce2 = Buffer.alloc(DEFAULT_EXTRANONCE2_SIZE);
+    this.extranonce2Exhausted = false; // Every extranonce2 of this epoch is claimed; idle until the next one
+  }
+
+  /**
+   * Start worker mining operation
+   */
+  async start() {
+    if (this.running) {
+      console.log(`⚠️ Worker ${this.id} already running`);
+      return;
+    }
+
+    this.running = true;
+    console.log(`⚡ Real mining worker ${this.id} started with nonce range: ${this.nonceStart.toString(16)}-${this.nonceEnd.toString(16)}`);
+    
+    // Test ricmoo scrypt implementation on first worker
+    if (this.id === 0) {
+      this.testRicmooScrypt();
+    }
+    // Start mining loop with proper error handling
+    // Each duty cycle mines for intensity * period, then sleeps for the rest of the period
+    const mineLoop = async () => {
+      let cycleStart = Date.now();
+
+      while (this.running) {
+        if (!this.currentJob || this.extranonce2Exhausted) {
+          // Nothing to hash yet (or nothing left in this job) - wait for the engine to push a job
+          await new Promise(resolve => setTimeout(resolve, MINE_SLICE_MS));
+          cycleStart = Date.now();
+          continue;
+        }
+
+        if (this.isJobStale()) {
+          // A clean job is on its way - don't hash the old one while waiting for the message
+          await new Promise(resolve => setImmediate(resolve));
+          continue;
+        }
+
+        const periodMs = Atomics.load(this.control, CONTROL.DUTY_PERIOD_MS);
+        const busyMs = periodMs * Atomics.load(this.control, CONTROL.INTENSITY) / 1000;
+        let now = Date.now();
+        if (now - cycleStart >= periodMs) {
+          cycleStart = now;
+        }
+
+        if (now >= cycleStart + busyMs) {
+          // Busy share of this cycle used up - idle until the next one, a slice at a time so stop() is not held up
+          await new Promise(resolve => setTimeout(resolve, Math.min(MINE_SLICE_MS, cycleStart + periodMs - now)));
+          continue;
+        }
+
+        const sliceEnd = Math.min(now + MINE_SLICE_MS, cycleStart + busyMs);
+        const sliceStart = performance.now();
+        try {
+          do {
+            await this.mine();
+          } while (this.running && Date.now() < sliceEnd && !this.isJobStale() && !this.extranonce2Exhausted);
+        } catch (error) {
+          console.error(`Mining error in worker ${this.id}:`, error);
+          // Continue mining even if individual hash fails
+        }
+        this.busyMicros += (performance.now() - sliceStart) * 1000;
+
+        now = Date.now();
+        if (this.unflushedHashes >= HASH_FLUSH_COUNT || now - this.lastFlush >= HASH_FLUSH_MS) {
+          this.flushHashCount();
+        }
+
+        // Yield so job and stop messages from the engine are delivered
+        await new Promise(resolve => setImmediate(resolve));
+      }
+    };
+    
+    // Start the mining loop
+    this.loopDone = mineLoop().catch(error => {
+      console.error(`Critical mining loop error in worker ${this.id}:`, error);
+      this.running = false;
+    });
+  }
+
+  /**
+   * Stop worker
+   * Waits for the mining loop to finish its current batch, then publishes the
+   * hashes not flushed yet so none are lost
+   */
+  async stop() {
+    if (!this.running) return;
+
+    this.running = false;
+    await this.loopDone;
+    this.flushHashCount();
+
+    console.log(`🛑 Worker ${this.id} stopped`);
+    return true;
+  }
+
+  /**
+   * Publish the hashes and hashing time since the last flush as a single 'hashes' event
+   */
+  flushHashCount() {
+    this.lastFlush = Date.now();
+    if (this.unflushedHashes === 0) return;
+
+    const count = this.unflushedHashes;
+    const busyMicros = Math.round(this.busyMicros);
+    this.unflushedHashes = 0;
+    this.busyMicros = 0;
+    this.emit('hashes', count, busyMicros);
+  }
+
+  /**
+   * Set new mining job
+   * issuedAt (epoch ms) is when the engine dispatched the job, for job-switch latency
+   */
+  setJob(job, difficulty = this.difficulty, issuedAt = null) {
+    const previousJob = this.currentJob;
+    const previousEpoch = this.jobEpoch;
+    this.currentJob = job;
+    this.jobEpoch = job.epoch !== undefined ? job.epoch : Atomics.load(this.control, CONTROL.JOB_EPOCH);
+    this.nonce = this.nonceStart; // Reset nonce for new job
+    this.setDifficulty(difficulty);
+    // A job update within the same epoch keeps this worker's extranonce2, so updates don't drain
+    // the space; a re-sent job id needs a fresh one, as its nonces were already submitted
+    this.buildHeaderTemplate(!previousJob || this.jobEpoch !== previousEpoch || job.job_id === previousJob.job_id);
+
+    if (previousJob && issuedAt) {
+      this.emit('job_switch', performance.timeOrigin + performance.now() - issuedAt);
+    }
+  }
+
+  /**
+   * True once the engine has bumped the job epoch past this worker's job
+   */
+  isJobStale() {
+    return Atomics.load(this.control, CONTROL.JOB_EPOCH) !== this.jobEpoch;
+  }
+
+  /**
+   * Move this worker to a new nonce range, keeping its position if it is still inside it
+   */
+  setNonceRange(start, end) {
+    this.nonceStart = start;
+    this.nonceEnd = end;
+    if (this.nonce < start || this.nonce >= end) {
+      this.nonce = start;
+    }
+  }
+
+  /**
+   * Precompute the share target as 8 little-endian uint32 words for meetsTarget()
+   */
+  setDifficulty(difficulty) {
+    this.difficulty = difficulty;
+    const target = this.difficultyToTarget(difficulty);
+    // Word k holds target bits 32k..32k+31; the target buffer is big-endian
+    for (let k = 0; k < 8; k++) {
+      this.targetWords[k] = target.readUInt32BE(28 - k * 4);
+    }
+  }
+
+  /**
+   * Build the 76-byte header prefix once per job (merkle root, prevhash, version, ntime, nbits)
+   * so the hot loop only has to patch the nonce into bytes 76..79
+   */
+  buildHeaderTemplate(claim = true) {
+    const resized = this.prepareCoinbase();
+    if (claim || resized) {
+      this.extranonce2Exhausted = !this.claimExtranonce2();
+    } else {
+      this.extranonce2Exhausted = false;
+    }
+    const template = this.createCryptocurrencyBlockHeader(0);
+    template.copy(this.header, 0, 0, 76);
+    this.hasher.setMidstate(this.header);
+  }
+
+  /**
+   * Parse the job's coinbase halves and merkle branches once per job
+   * Returns true if the extranonce2 size changed, which needs a fresh claim
+   */
+  prepareCoinbase() {
+    const job = this.currentJob;
+    this.coinbasePrefix = Buffer.from((job.coinb1 || '') + (job.extranonce1 || ''), 'hex');
+    this.coinbaseSuffix = Buffer.from(job.coinb2 || '', 'hex');
+    this.merkleBranches = (job.merkle_branch || []).map(branch => Buffer.from(branch, 'hex'));
+
+    const size = job.extranonce2_size || DEFAULT_EXTRANONCE2_SIZE;
+    if (this.extranonce2.length !== size) {
+      this.extranonce2 = Buffer.alloc(size);
+      return true;
+    }
+    return false;
+  }
+
+  /**
+   * Take the next extranonce2 from the engine-wide counter, so no two workers
+   * (or two rolls of one worker) hash the same coinbase until the next block resets it
+   * Returns false once every value that fits in extranonce2_size bytes is taken;
+   * the current extranonce2 is left as it is
+   */
+  claimExtranonce2() {
+    let value = Atomics.add(this.control, CONTROL.EXTRANONCE2, 1) >>> 0;
+    const en2 = this.extranonce2;
+    if (value >= Math.min(256 ** en2.length, EXTRANONCE2_CLAIM_LIMIT)) {
+      console.log(`⏸️ Worker ${this.id}: all ${en2.length}-byte extranonce2 values claimed, idling until the next job`);
+      return false;
+    }
+
+    en2.fill(0);
+    for (let i = en2.length - 1; i >= 0 && value > 0; i--) {
+      en2[i] = value & 0xff;
+      value = Math.floor(value / 256);
+    }
+    return true;
+  }
+
+  /**
+   * Nonce range exhausted: move to a fresh extranonce2 and patch the new merkle root
+   * into the header template instead of re-hashing nonces already tried
+   */
+  rollExtranonce2() {
+    if (!this.claimExtranonce2()) {
+      this.extranonce2Exhausted = true;
+      return;
+    }
+    this.calculateLitecoinMerkleRoot().copy(this.header, 36);
+    this.hasher.setMidstate(this.header);
+    this.nonce = this.nonceStart;
+    console.log(`🔄 Worker ${this.id} completed nonce range, rolled extranonce2 to ${this.extranonce2.toString('hex')}`);
+  }
+
+  /**
+   * Real mining function with cryptocurrency-standard scrypt algorithm
+   * Hashes a batch of consecutive nonces per call
+   */
+  async mine() {
+    if (!this.currentJob || this.extranonce2Exhausted) return;
+
+    try {
+      // Never run a batch past the end of this worker's nonce range
+      const rangeEnd = this.nonceEnd;
+      const batchStart = this.nonce;
+      const count = Math.min(HASH_BATCH_SIZE, rangeEnd - batchStart);
+
+      // Resume scrypt from the per-job midstate; only the nonce changes per hash
+      const job = this.currentJob;
+      const pending = this.hasher.hashBatch(null, batchStart, count, this.hashWords);
+      if (this.hasherAsync) await pending;
+
+      // Abandon the batch if a clean job arrived meanwhile (or the job changed under an async hasher)
+      if (this.currentJob !== job || this.isJobStale()) {
+        this.hashCount += count;
+        this.unflushedHashes += count;
+        return;
+      }
+
+      for (let i = 0; i < count; i++) {
+        this.hashCount++;
+
+        // Hex is only produced for the rare hash that is a share
+        if (this.meetsTarget(this.hashWords, i * 8)) {
+          this.nonce = batchStart + i;
+          const hash = this.hashView.toString('hex', i * 32, i * 32 + 32);
+          const blockHeader = this.header;
+          blockHeader.writeUInt32LE(this.nonce >>> 0, 76);
+          this.shareCount++;
+          console.log(`🎯 Worker ${this.id} found share #${this.shareCount} (nonce ${this.nonce.toString(16)}, hash ${hash.substring(0, 16)}...)`);
+
+          this.emit('share', {
+            worker_id: this.id,
+            jobId: this.currentJob.job_id,
+            extranonce2: this.extranonce2.toString('hex'),
+            nonce: this.nonce.toString(16),
+            hash: hash,
+            nTime: this.currentJob.ntime,
+            epoch: this.jobEpoch,
+            accepted: true
+          });
+        }
+
+        // Sampled debug stream, off unless hash_sample_interval is configured
+        if (this.hashSampleInterval && this.hashCount % this.hashSampleInterval === 0) {
+          this.emit('hash', {
+            worker_id: this.id,
+            nonce: batchStart + i,
+            hash: this.hashView.toString('hex', i * 32, i * 32 + 32)
+          });
+        }
+
+        // Progress logging every 10,000 hashes
+        if (this.hashCount % 10000 === 0) {
+          const elapsed = (Date.now() - this.startTime) / 1000;
+          const hashrate = this.hashCount / elapsed;
+          console.log(`📊 Worker ${this.id}: ${this.hashCount} hashes, ${this.shareCount} shares, ${hashrate.toFixed(2)} H/s`);
+        }
+      }
+
+      // Advance to the next batch
+      this.nonce = batchStart + count;
+
+      this.unflushedHashes += count;
+
+      // Range exhausted - continue on a new extranonce2 rather than re-hashing it
+      if (this.nonce >= rangeEnd) {
+        this.rollExtranonce2();
+      }
+
+    } catch (error) {
+      this.emit('error', error);
+    }
+  }
+
+  /**
+   * Create proper 80-byte cryptocurrency block header (Official Litecoin Standard)
+   */
+  createCryptocurrencyBlockHeader(nonce) {
+    if (!this.currentJob) {
+      // Generate a test block header using official Litecoin parameters
+      const header = Buffer.alloc(80);
+      
+      // Version (4 bytes) - Litecoin standard version
+      header.writeUInt32LE(0x00000001, 0);
+      
+      // Previous block hash (32 bytes) - Use zeros for test
+      header.fill(0, 4, 36);
+      
+      // Merkle root (32 bytes) - Use zeros for test
+      header.fill(0, 36, 68);
+      
+      // Timestamp (4 bytes) - Current time
+      header.writeUInt32LE(Math.floor(Date.now() / 1000), 68);
+      
+      // Difficulty bits (4 bytes) - Default Litecoin difficulty
+      header.writeUInt32LE(0x1d00ffff, 72);
+      
+      // Nonce (4 bytes) - Mining nonce
+      header.writeUInt32LE(nonce, 76);
+      
+      return header;
+    }
+
+    // Create official Litecoin block header from pool job
+    const header = Buffer.alloc(80);
+    
+    try {
+      // Version (4 bytes) - little endian, Litecoin protocol
+      const version = parseInt(this.currentJob.version || '00000001', 16);
+      header.writeUInt32LE(version, 0);
+      
+      // Previous block hash (32 bytes) - stratum sends it as 8 byte-swapped 32-bit words
+      const prevHash = Buffer.from(this.currentJob.prevhash || '00'.repeat(32), 'hex');
+      for (let i = 0; i < 32; i += 4) {
+        header.writeUInt32LE(prevHash.readUInt32BE(i), 4 + i);
+      }
+      
+      // Merkle root (32 bytes) - calculated using official Litecoin method
+      const merkleRoot = this.calculateLitecoinMerkleRoot();
+      merkleRoot.copy(header, 36);
+      
+      // Timestamp (4 bytes) - little endian, Unix timestamp
+      const timestamp = parseInt(this.currentJob.ntime || Math.floor(Date.now() / 1000).toString(16), 16);
+      header.writeUInt32LE(timestamp, 68);
+      
+      // Difficulty bits (4 bytes) - little endian, Litecoin network difficulty
+      const bits = parseInt(this.currentJob.nbits || '1d00ffff', 16);
+      header.writeUInt32LE(bits, 72);
+      
+      // Nonce (4 bytes) - little endian, mining nonce
+      header.writeUInt32LE(nonce, 76);
+      
+      return header;
+      
+    } catch (error) {
+      console.error('Litecoin block header creation error:', error);
+      
+      // Fallback to minimal valid header
+      const fallbackHeader = Buffer.alloc(80);
+      fallbackHeader.writeUInt32LE(0x00000001, 0);      // Version
+      fallbackHeader.writeUInt32LE(Math.floor(Date.now() / 1000), 68); // Timestamp
+      fallbackHeader.writeUInt32LE(0x1d00ffff, 72);     // Bits
+      fallbackHeader.writeUInt32LE(nonce, 76);          // Nonce
+      return fallbackHeader;
+    }
+  }
+
+  /**
+   * Calculate Litecoin-standard merkle root from coinbase and merkle branch
+   * Coinbase = coinb1 || extranonce1 || extranonce2 || coinb2; the root goes into
+   * the header in internal byte order, as produced by double SHA-256
+   */
+  calculateLitecoinMerkleRoot() {
+    try {
+      if (!this.coinbasePrefix) this.prepareCoinbase();
+
+      // Calculate double SHA256 of coinbase (Litecoin standard)
+      let hash = crypto.createHash('sha256')
+        .update(this.coinbasePrefix)
+        .update(this.extranonce2)
+        .update(this.coinbaseSuffix)
+        .digest();
+      hash = crypto.createHash('sha256').update(hash).digest();
+      
+      // Apply merkle branch using Litecoin protocol (if available)
+      for (const branch of this.merkleBranches) {
+        hash = crypto.createHash('sha256').update(hash).update(branch).digest();
+        hash = crypto.createHash('sha256').update(hash).digest();
+      }
+      
+      return hash;
+      
+    } catch (error) {
+      console.error('Litecoin merkle root calculation error:', error);
+      // Return zeros if calculation fails
+      return Buffer.alloc(32);
+    }
+  }
+
+  /**
+   * ricmoo/scrypt-js Implementation - Professional Cryptocurrency Scrypt
+   * Uses the proven ricmoo implementation for maximum compatibility
+   */
+  cryptoScryptHash(blockHeader) {
+    try {
+      // Ensure input is exactly 80 bytes (standard cryptocurrency block header)
+      let input;
+      if (typeof blockHeader === 'string') {
+        // Convert hex string to buffer
+        input = Buffer.from(blockHeader, 'hex');
+      } else {
+        input = blockHeader;
+      }
+      
+      // Pad or truncate to exactly 80 bytes
+      if (input.length !== 80) {
+        const temp = Buffer.alloc(80);
+        input.copy(temp, 0, 0, Math.min(input.length, 80));
+        input = temp;
+      }
+      
+      // CRITICAL: Use input as both password AND salt (matches reference C code)
+      // This follows the exact pattern from the C implementation:
+      // PBKDF2_SHA256((const uint8_t *)input, 80, (const uint8_t *)input, 80, 1, B, 128);
+      // The per-worker context (N=1024, r=1, p=1) reuses all scratch buffers between hashes
+      this.scryptContext = this.scryptContext || new ScryptContext(1024, 1);
+      const result = this.scryptContext.hashInto(input, Buffer.alloc(32));
+      
+      return result.toString('hex');
+      
+    } catch (error) {
+      console.error('ricmoo scrypt error:', error);
+      
+      // Fallback only if ricmoo scrypt completely fails
+      const crypto = require('crypto');
+      const hash1 = crypto.createHash('sha256').update(blockHeader).digest();
+      const hash2 = crypto.createHash('sha256').update(hash1).digest();
+      return hash2.toString('hex');
+    }
+  }
+
+  /**
+   * Test ricmoo scrypt implementation with known values
+   */
+  testRicmooScrypt() {
+    console.log('🧪 Testing ricmoo/scrypt-js implementation...');
+    
+    try {
+      // Test with simple known data
+      const testInput = Buffer.alloc(80);
+      testInput.writeUInt32LE(0x00000001, 0);   // Version
+      testInput.writeUInt32LE(0x12345678, 76);  // Test nonce
+      
+      const hash = this.cryptoScryptHash(testInput);
+      console.log(`✅ ricmoo scrypt test successful: ${hash.substring(0, 32)}...`);
+
+      // Test the hash against the current share target
+      const hashWords = new Uint32Array(8);
+      Buffer.from(hashWords.buffer).write(hash, 'hex');
+      const mostSignificant = hashWords[7].toString(16).padStart(8, '0');
+      console.log(`🔍 Hash most significant word: 0x${mostSignificant}`);
+      console.log(`🎯 Hash passes share target (difficulty ${this.difficulty}): ${this.meetsTarget(hashWords, 0)}`);
+
+    } catch (error) {
+      console.error('❌ ricmoo scrypt test failed:', error);
+    }
+  }
+  /**
+   * Check if the hash at words[offset..offset+7] is at or below the share target
+   * Both are 256-bit little-endian numbers stored as uint32 words, so the comparison
+   * starts at the most significant word and almost always exits on the first one
+   */
+  meetsTarget(words, offset) {
+    const target = this.targetWords;
+    for (let k = 7; k >= 0; k--) {
+      const word = words[offset + k];
+      if (word !== target[k]) return word < target[k];
+    }
+    return true;
+  }
+
+  /**
+   * Convert pool difficulty to a 32-byte big-endian target
+   */
+  difficultyToTarget(difficulty) {
+    if (!Number.isFinite(difficulty) || difficulty <= 0) {
+      console.error(`Invalid share difficulty ${difficulty}, using difficulty 1`);
+      difficulty = 1;
+    }
+
+    const target = Buffer.alloc(32);
+    let value = difficultyToTargetBigInt(difficulty);
+    for (let i = 31; i >= 0 && value > 0n; i--) {
+      target[i] = Number(value & 0xffn);
+      value >>= 8n;
+    }
+    return target;
+  }
+
+}
+
+/**
+ * Worker thread entry point - drives a RealMiningWorker and reports back to the engine
+ */
+function runWorkerThread({ id, config, counters, control, nonceRange, scryptBackend }) {
+  const counterView = new BigInt64Array(counters);
+  const worker = new RealMiningWorker(id, config, { scryptBackend, nonceRange, control: new Int32Array(control) });
+
+  // Position within the nonce range and job, for the per-worker stats API
+  const publishPosition = () => {
+    Atomics.store(counterView, COUNTER.NONCE, BigInt(worker.nonce));
+    Atomics.store(counterView, COUNTER.JOB_EPOCH, BigInt(worker.jobEpoch));
+  };
+
+  worker.on('hashes', (count, busyMicros) => {
+    Atomics.add(counterView, COUNTER.HASHES, BigInt(count));
+    Atomics.add(counterView, COUNTER.BUSY_MICROS, BigInt(busyMicros));
+    publishPosition();
+  });
+
+  worker.on('hash', (sample) => {
+    parentPort.postMessage({ type: 'hash', sample });
+  });
+
+  worker.on('job_switch', (latencyMs) => {
+    parentPort.postMessage({ type: 'job_switch', latencyMs });
+  });
+
+  worker.on('share', (share) => {
+    Atomics.add(counterView, COUNTER.SHARES, 1n);
+    parentPort.postMessage({ type: 'share', share });
+  });
+
+  worker.on('error', (error) => {
+    parentPort.postMessage({ type: 'error', message: error.message, stack: error.stack });
+  });
+
+  parentPort.on('message', (message) => {
+    switch (message.type) {
+      case 'job':
+        worker.setJob(message.job, message.difficulty, message.issuedAt);
+        publishPosition();
+        break;
+      case 'difficulty':
+        worker.setDifficulty(message.difficulty);
+        break;
+      case 'nonce_range':
+        worker.setNonceRange(message.start, message.end);
+        publishPosition();
+        break;
+      case 'stop':
+        // Final flush goes into the shared counters before the engine terminates the thread
+        worker.stop().then(() => {
+          publishPosition();
+          parentPort.postMessage({ type: 'stopped' });
+        });
+        break;
+      default:
+        console.log(`⚠️ Worker ${id} received unknown message: ${message.type}`);
+    }
+  });
+
+  worker.start();
+}
+
+if (!isMainThread && workerData && workerData.role === 'mining-worker') {
+  runWorkerThread(workerData);
+}
+
+module.exports = {
+  RealMiningWorker,
+  createControl,
+  getNonceRange,
+  difficultyToTargetBigInt,
+  COUNTER,
+  COUNTER_SLOTS,
+  CONTROL,
+  CONTROL_SLOTS
+};
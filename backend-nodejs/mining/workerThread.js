@@ -0,0 +1,265 @@
+/**
+ * Mining Worker Thread Handle - Node.js Implementation
+ * Main-thread proxy that owns a worker_threads Worker running RealMiningWorker
+ * Jobs are pushed in with postMessage, counters are read from a SharedArrayBuffer
+ */
+
+const EventEmitter = require('events');
+const path = require('path');
+const { performance } = require('perf_hooks');
+const { Worker } = require('worker_threads');
+const { COUNTER, COUNTER_SLOTS } = require('./worker');
+const RingBuffer = require('../utils/ringBuffer');
+
+const WORKER_SCRIPT = path.join(__dirname, 'worker.js');
+
+// Per-second samples kept per worker (15 minutes)
+const SAMPLE_CAPACITY = 900;
+
+// How long stop() waits for the worker's final hash count flush before terminating it
+const STOP_TIMEOUT_MS = 2000;
+
+class MiningWorkerThread extends EventEmitter {
+  constructor(id, config, options = {}) {
+    super();
+    this.id = id;
+    this.config = config;
+    this.scryptBackend = options.scryptBackend;
+    this.control = options.control; // Engine-wide Int32Array control block (intensity, duty period)
+    this.nonceRange = options.nonceRange;
+    this.thread = null;
+    this.running = false;
+    this.currentJob = null;
+    this.difficulty = 1;
+
+    // Written by the worker thread, read here without any message round-trip
+    this.counters = new BigInt64Array(new SharedArrayBuffer(COUNTER_SLOTS * BigInt64Array.BYTES_PER_ELEMENT));
+
+    // Hashrate and shares found per sampling interval, filled by sample()
+    this.hashrateSamples = new RingBuffer(SAMPLE_CAPACITY, Float64Array);
+    this.shareSamples = new RingBuffer(SAMPLE_CAPACITY, Uint16Array);
+    this.lastSample = null;
+  }
+
+  /**
+   * Spawn the worker thread and wait until it is online
+   */
+  async start() {
+    if (this.running) {
+      console.log(`⚠️ Worker thread ${this.id} already running`);
+      return;
+    }
+
+    this.thread = new Worker(WORKER_SCRIPT, {
+      workerData: {
+        role: 'mining-worker',
+        id: this.id,
+        config: this.config,
+        counters: this.counters.buffer,
+        control: this.control.buffer,
+        nonceRange: this.nonceRange,
+        scryptBackend: this.scryptBackend
+      }
+    });
+
+    this.thread.on('message', (message) => this.handleMessage(message));
+
+    this.thread.on('error', (error) => {
+      console.error(`🔥 Worker thread ${this.id} crashed:`, error);
+      this.emit('error', error);
+    });
+
+    this.thread.on('exit', (code) => {
+      if (this.running && code !== 0) {
+        console.error(`🔥 Worker thread ${this.id} exited unexpectedly with code ${code}`);
+      }
+      this.running = false;
+      this.thread = null;
+    });
+
+    await new Promise((resolve, reject) => {
+      this.thread.once('online', resolve);
+      this.thread.once('error', reject);
+    });
+
+    this.running = true;
+  }
+
+  /**
+   * Stop the worker thread
+   * The worker finishes its current batch and flushes its counters first, so the
+   * hash totals read after stop() are final; terminate() is the fallback on timeout
+   */
+  async stop() {
+    if (!this.thread) return;
+
+    const thread = this.thread;
+    this.running = false;
+    await new Promise((resolve) => {
+      const timeout = setTimeout(() => {
+        console.log(`⚠️ Worker thread ${this.id} did not stop within ${STOP_TIMEOUT_MS} ms, terminating`);
+        finish();
+      }, STOP_TIMEOUT_MS);
+      const onMessage = (message) => {
+        if (message.type === 'stopped') finish();
+      };
+      const finish = () => {
+        clearTimeout(timeout);
+        thread.removeListener('message', onMessage);
+        thread.removeListener('exit', finish);
+        resolve();
+      };
+
+      thread.on('message', onMessage);
+      thread.once('exit', finish);
+      thread.postMessage({ type: 'stop' });
+    });
+
+    await thread.terminate();
+    return true;
+  }
+
+  /**
+   * Push a new mining job and its share difficulty to the worker thread
+   */
+  setJob(job, difficulty) {
+    this.currentJob = job;
+    this.difficulty = difficulty;
+    if (this.thread) {
+      // Wall-clock timestamp comparable across threads, for job-switch latency
+      const issuedAt = performance.timeOrigin + performance.now();
+      this.thread.postMessage({ type: 'job', job, difficulty, issuedAt });
+    }
+  }
+
+  /**
+   * Retarget the worker's current job without restarting its nonce range
+   */
+  setDifficulty(difficulty) {
+    this.difficulty = difficulty;
+    if (this.thread) {
+      this.thread.postMessage({ type: 'difficulty', difficulty });
+    }
+  }
+
+  /**
+   * Reassign the worker's nonce range [start, end)
+   */
+  setNonceRange(nonceRange) {
+    this.nonceRange = nonceRange;
+    if (this.thread) {
+      this.thread.postMessage({ type: 'nonce_range', start: nonceRange.start, end: nonceRange.end });
+    }
+  }
+
+  /**
+   * Handle messages posted by the worker thread
+   */
+  handleMessage(message) {
+    switch (message.type) {
+      case 'share':
+        this.emit('share', message.share);
+        break;
+      case 'hash':
+        this.emit('hash', message.sample);
+        break;
+      case 'job_switch':
+        this.emit('job_switch', message.latencyMs);
+        break;
+      case 'stopped':
+        // Handled by stop()
+        break;
+      case 'error': {
+        const error = new Error(message.message);
+        error.stack = message.stack;
+        this.emit('error', error);
+        break;
+      }
+      default:
+        console.log(`⚠️ Unknown message from worker thread ${this.id}: ${message.type}`);
+    }
+  }
+
+  /**
+   * Record hashrate and shares since the previous call; the engine calls this once a second
+   */
+  sample(now = Date.now()) {
+    const hashes = this.hashCount;
+    const shares = this.shareCount;
+    const last = this.lastSample;
+    this.lastSample = { time: now, hashes, shares };
+
+    if (last && now > last.time) {
+      this.hashrateSamples.push((hashes - last.hashes) * 1000 / (now - last.time));
+      this.shareSamples.push(shares - last.shares);
+    }
+  }
+
+  /**
+   * Hashrate, shares and nonce/job position for the worker stats API
+   * The newest sampleCount per-second hashrate samples are included, oldest first
+   */
+  getStats(sampleCount = 60) {
+    const nonce = this.nonce;
+    const range = this.nonceRange || { start: 0, end: 0 };
+    const span = range.end - range.start;
+    const round = value => Math.round(value * 100) / 100;
+
+    return {
+      id: this.id,
+      running: this.running,
+      hashrate: round(this.hashrateSamples.recent(0) || 0),
+      hashrate_10s: round(this.hashrateSamples.mean(10)),
+      hashrate_60s: round(this.hashrateSamples.mean(60)),
+      total_hashes: this.hashCount,
+      shares: this.shareCount,
+      shares_60s: this.shareSamples.sum(60),
+      busy_ms: Math.round(this.busyMs),
+      job_epoch: this.jobEpoch,
+      nonce: {
+        position: nonce,
+        start: range.start,
+        end: range.end,
+        progress: span > 0 ? Math.round(Math.min(Math.max((nonce - range.start) / span, 0), 1) * 1e6) / 1e6 : 0
+      },
+      samples: this.hashrateSamples.toArray(sampleCount).map(round)
+    };
+  }
+
+  /**
+   * Next nonce this worker will hash
+   */
+  get nonce() {
+    return Number(Atomics.load(this.counters, COUNTER.NONCE));
+  }
+
+  /**
+   * Epoch of the job this worker is hashing
+   */
+  get jobEpoch() {
+    return Number(Atomics.load(this.counters, COUNTER.JOB_EPOCH));
+  }
+
+  /**
+   * Total hashes computed by this worker
+   */
+  get hashCount() {
+    return Number(Atomics.load(this.counters, COUNTER.HASHES));
+  }
+
+  /**
+   * Total time this worker spent hashing, in milliseconds
+   */
+  get busyMs() {
+    return Number(Atomics.load(this.counters, COUNTER.BUSY_MICROS)) / 1000;
+  }
+
+  /**
+   * Total shares found by this worker
+   */
+  get shareCount() {
+    return Number(Atomics.load(this.counters, COUNTER.SHARES));
+  }
+}
+
+module.exports = MiningWorkerThread;
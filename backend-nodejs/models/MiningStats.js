@@ -46,6 +46,31 @@ const MiningStatsSchema = new mongoose.Schema({
     min: 0
   },
   
+  // Exponentially weighted hashrate windows; hashrate above is the 10 s window
+  hashrate10s: {
+    type: Number,
+    default: 0,
+    min: 0
+  },
+  
+  hashrate60s: {
+    type: Number,
+    default: 0,
+    min: 0
+  },
+  
+  hashrate15m: {
+    type: Number,
+    default: 0,
+    min: 0
+  },
+  
+  averageHashrate: {
+    type: Number,
+    default: 0,
+    min: 0
+  },
+  
   acceptedShares: {
     type: Number,
     default: 0,
@@ -147,8 +172,7 @@ MiningStatsSchema.methods.getEfficiency = function() {
 };
 
 MiningStatsSchema.methods.getAverageHashrate = function() {
-  if (!this.duration || this.duration === 0) return this.hashrate;
-  return this.hashrate; // Could be enhanced with historical data
+  return this.averageHashrate || this.hashrate;
 };
 
 // Static methods
@@ -49,6 +49,23 @@ const SystemConfigSchema = new mongoose.Schema({
       default: 'pool'
     },
     
+    // Autotuned thread counts (mining_defaults), one entry per host
+    tunedThreads: [{
+      hostname: String,
+      threads: {
+        type: Number,
+        min: 1,
+        max: 256
+      },
+      hashrate: Number,
+      maxHashrate: Number,
+      samples: [{
+        threads: Number,
+        hashrate: Number
+      }],
+      tunedAt: Date
+    }],
+    
     // Performance Settings
     maxCpuUsage: {
       type: Number,
@@ -29,6 +29,8 @@ const MiningStats = require('./models/MiningStats');
 const AIPrediction = require('./models/AIPrediction');
 const SystemConfig = require('./models/SystemConfig');
 const HighPerformanceMiningEngine = require('./high_performance_engine');
+const { StratumProxy } = require('./mining/stratumProxy');
+const { MetricsRegistry, writeEngineMetrics } = require('./utils/metrics');
 
 // Initialize Express app
 const app = express();
@@ -47,15 +49,25 @@ const io = socketIo(server, {
 // Global variables
 let connectedSockets = [];
 let currentMiningEngine = null;
+let stratumProxy = null;
 let highPerformanceEngine = new HighPerformanceMiningEngine();
 let remoteDevices = new Map();
 let accessTokens = new Map();
 
+// Prometheus metrics for GET /metrics; event-loop lag and GC pauses are sampled from startup
+const metrics = new MetricsRegistry();
+metrics.startRuntimeMetrics();
+const socketFanout = metrics.histogram('websocket_fanout_seconds', 'Time to emit one event to every connected client', 'event');
+metrics.addCollector((writer) => {
+  writer.gauge('websocket_clients', 'Connected WebSocket clients', [[null, connectedSockets.length]]);
+  if (currentMiningEngine) writeEngineMetrics(writer, currentMiningEngine);
+});
+
 // Middleware
 app.set('trust proxy', 1); // Trust first proxy (required for Kubernetes/Docker environments)
 app.use(helmet());
 app.use(compression());
-app.use(morgan('combined'));
+app.use(morgan('combined', { skip: (req) => req.path === '/metrics' }));
 
 // Rate limiting with higher limits for mining operations
 const limiter = rateLimit({
@@ -65,7 +77,7 @@ const limiter = rateLimit({
   legacyHeaders: false,
   // Skip rate limiting for health checks and system stats
   skip: (req, res) => {
-    return req.path === '/api/health' || req.path === '/api/system/stats';
+    return req.path === '/api/health' || req.path === '/api/system/stats' || req.path === '/metrics';
   }
 });
 app.use(limiter);
@@ -108,7 +120,9 @@ app.options('*', cors(corsOptions));
 async function connectDB() {
   try {
     const mongoUrl = process.env.MONGO_URL || 'mongodb://localhost:27017/cryptominer';
-    await mongoose.connect(mongoUrl);
+    // Command monitoring feeds the Mongo write latency histogram in /metrics
+    await mongoose.connect(mongoUrl, { monitorCommands: true });
+    metrics.instrumentMongoClient(mongoose.connection.getClient());
     console.log('✅ MongoDB connected successfully');
   } catch (error) {
     console.error('❌ MongoDB connection failed:', error);
@@ -153,6 +167,9 @@ const COIN_PRESETS = {
 // API ENDPOINTS
 // ============================================================================
 
+// Prometheus scrape endpoint
+app.get('/metrics', metrics.handler());
+
 // Health check endpoint
 app.get('/api/health', (req, res) => {
   const memUsage = process.memoryUsage();
@@ -351,6 +368,188 @@ app.post('/api/mining/stop-hp', async (req, res) => {
   }
 });
 
+// The autotune sweep owns the thread count and intensity while it runs
+function isAutotuning() {
+  if (!currentMiningEngine || typeof currentMiningEngine.getAutotuneState !== 'function') return false;
+  const state = currentMiningEngine.getAutotuneState();
+  return !!(state && state.running);
+}
+
+// Mining intensity endpoint - adjusts the worker duty cycle without restarting
+app.put('/api/mining/intensity', (req, res) => {
+  try {
+    if (!currentMiningEngine || typeof currentMiningEngine.setIntensity !== 'function') {
+      return res.status(409).json({
+        success: false,
+        message: 'No mining operation in progress'
+      });
+    }
+
+    if (isAutotuning()) {
+      return res.status(409).json({
+        success: false,
+        message: 'Autotune in progress; intensity is restored when it finishes'
+      });
+    }
+
+    const result = currentMiningEngine.setIntensity(req.body.intensity);
+    if (!result.success) {
+      return res.status(400).json(result);
+    }
+
+    io.emit('mining_intensity_changed', { ...result, timestamp: new Date().toISOString() });
+    res.json(result);
+  } catch (error) {
+    console.error('Mining intensity error:', error);
+    res.status(500).json({
+      success: false,
+      message: 'Failed to set mining intensity: ' + error.message
+    });
+  }
+});
+
+// Mining threads endpoint - grows or shrinks the worker pool in the running session
+app.put('/api/mining/threads', async (req, res) => {
+  try {
+    if (!currentMiningEngine || typeof currentMiningEngine.setThreadCount !== 'function') {
+      return res.status(409).json({
+        success: false,
+        message: 'No mining operation in progress'
+      });
+    }
+
+    if (isAutotuning()) {
+      return res.status(409).json({
+        success: false,
+        message: 'Autotune in progress; it sets the thread count when it finishes'
+      });
+    }
+
+    const result = await currentMiningEngine.setThreadCount(req.body.threads);
+    if (!result.success) {
+      return res.status(400).json(result);
+    }
+
+    io.emit('mining_threads_changed', { ...result, timestamp: new Date().toISOString() });
+    res.json(result);
+  } catch (error) {
+    console.error('Mining threads error:', error);
+    res.status(500).json({
+      success: false,
+      message: 'Failed to set mining threads: ' + error.message
+    });
+  }
+});
+
+// Per-worker stats - hashrate samples, shares and nonce/job position of each worker thread
+app.get('/api/mining/workers', (req, res) => {
+  const samples = Math.min(Math.max(parseInt(req.query.samples, 10) || 60, 0), 900);
+  const stats = currentMiningEngine && typeof currentMiningEngine.getWorkerStats === 'function'
+    ? currentMiningEngine.getWorkerStats(samples)
+    : { is_mining: false, threads: 0, workers: [] };
+
+  res.json({ success: true, ...stats });
+});
+
+// Mining autotune endpoints - sweep thread counts and keep the hashrate knee
+app.post('/api/mining/autotune', (req, res) => {
+  try {
+    if (!currentMiningEngine || typeof currentMiningEngine.startAutotune !== 'function') {
+      return res.status(409).json({
+        success: false,
+        message: 'No mining operation in progress'
+      });
+    }
+
+    const validation = currentMiningEngine.validateAutotuneOptions(req.body || {});
+    if (!validation.valid) {
+      return res.status(400).json({ success: false, message: validation.error });
+    }
+
+    const result = currentMiningEngine.startAutotune(req.body || {});
+    res.status(result.success ? 202 : 409).json(result);
+  } catch (error) {
+    console.error('Mining autotune error:', error);
+    res.status(500).json({
+      success: false,
+      message: 'Failed to start autotune: ' + error.message
+    });
+  }
+});
+
+app.get('/api/mining/autotune', (req, res) => {
+  const state = currentMiningEngine && typeof currentMiningEngine.getAutotuneState === 'function'
+    ? currentMiningEngine.getAutotuneState()
+    : null;
+
+  res.json({ success: true, autotune: state });
+});
+
+// Stratum proxy endpoints - local rigs share one upstream pool connection
+app.post('/api/proxy/start', async (req, res) => {
+  try {
+    if (stratumProxy && stratumProxy.running) {
+      return res.status(409).json({
+        success: false,
+        message: 'Stratum proxy already running'
+      });
+    }
+
+    const config = {
+      coin: 'litecoin',
+      listen_port: 3333,
+      ...req.body
+    };
+    config.pools = miningEngine.getPoolCandidates(config);
+
+    const proxy = new StratumProxy(config);
+    const result = await proxy.start();
+    if (!result.success) {
+      return res.status(400).json(result);
+    }
+
+    stratumProxy = proxy;
+    io.emit('proxy_started', { ...result, timestamp: new Date().toISOString() });
+    res.json(result);
+  } catch (error) {
+    console.error('Stratum proxy start error:', error);
+    res.status(500).json({
+      success: false,
+      message: 'Failed to start stratum proxy: ' + error.message
+    });
+  }
+});
+
+app.post('/api/proxy/stop', async (req, res) => {
+  try {
+    if (!stratumProxy) {
+      return res.status(409).json({
+        success: false,
+        message: 'Stratum proxy not running'
+      });
+    }
+
+    const result = await stratumProxy.stop();
+    stratumProxy = null;
+
+    io.emit('proxy_stopped', { timestamp: new Date().toISOString() });
+    res.json(result);
+  } catch (error) {
+    console.error('Stratum proxy stop error:', error);
+    res.status(500).json({
+      success: false,
+      message: 'Failed to stop stratum proxy: ' + error.message
+    });
+  }
+});
+
+app.get('/api/proxy/status', (req, res) => {
+  res.json({
+    success: true,
+    proxy: stratumProxy ? stratumProxy.getStatus() : null
+  });
+});
+
 // Regular mining stop endpoint
 app.post('/api/mining/stop', async (req, res) => {
   try {
@@ -1186,13 +1385,13 @@ io.on('connection', (socket) => {
 setInterval(() => {
   if (connectedSockets.length > 0 && currentMiningEngine) {
     const status = currentMiningEngine.getStatus();
-    connectedSockets.forEach(socket => {
+    metrics.time(socketFanout, 'mining_update', () => connectedSockets.forEach(socket => {
       try {
         socket.emit('mining_update', status);
       } catch (error) {
         console.error('WebSocket emit error:', error);
       }
-    });
+    }));
   }
 }, 5000);
 
@@ -1201,13 +1400,13 @@ setInterval(async () => {
   if (connectedSockets.length > 0) {
     try {
       const systemStats = await systemMonitor.getSystemStats();
-      connectedSockets.forEach(socket => {
+      metrics.time(socketFanout, 'system_update', () => connectedSockets.forEach(socket => {
         try {
           socket.emit('system_update', systemStats);
         } catch (error) {
           console.error('WebSocket system update error:', error);
         }
-      });
+      }));
     } catch (error) {
       console.error('System stats error:', error);
     }
@@ -1218,13 +1417,13 @@ setInterval(async () => {
 if (highPerformanceEngine) {
   highPerformanceEngine.on('hashrate_update', (data) => {
     if (connectedSockets.length > 0) {
-      connectedSockets.forEach(socket => {
+      metrics.time(socketFanout, 'hp_hashrate_update', () => connectedSockets.forEach(socket => {
         try {
           socket.emit('hp_hashrate_update', data);
         } catch (error) {
           console.error('WebSocket HP hashrate update error:', error);
         }
-      });
+      }));
     }
   });
 }
@@ -1490,6 +1689,9 @@ async function startServer() {
   try {
     // Connect to database
     await connectDB();
+
+    // System stats endpoints and socket pushes read this shared snapshot
+    systemMonitor.start();
     
     // Start server
     server.listen(PORT, HOST, () => {
@@ -1513,6 +1715,12 @@ async function startServer() {
       if (highPerformanceEngine) {
         await highPerformanceEngine.stop();
       }
+
+      if (stratumProxy) {
+        await stratumProxy.stop();
+      }
+
+      systemMonitor.stop();
       
       server.close(() => {
         console.log('✅ Server closed');
@@ -1533,6 +1741,12 @@ async function startServer() {
       if (highPerformanceEngine) {
         await highPerformanceEngine.stop();
       }
+
+      if (stratumProxy) {
+        await stratumProxy.stop();
+      }
+
+      systemMonitor.stop();
       
       server.close(() => {
         console.log('✅ Server closed');
@@ -0,0 +1,89 @@
+/**
+ * Latency Histogram - Node.js Implementation
+ * Fixed-bucket latency histogram (milliseconds) with O(1) recording and no
+ * per-sample allocation, for hot-path metrics such as job switches and pool RTT
+ */
+
+// Bucket upper bounds in milliseconds; samples above the last bound land in an overflow bucket
+const DEFAULT_BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000];
+
+class LatencyHistogram {
+  constructor(bucketsMs = DEFAULT_BUCKETS_MS) {
+    this.bounds = Float64Array.from(bucketsMs);
+    this.counts = new Float64Array(this.bounds.length + 1);
+    this.reset();
+  }
+
+  /**
+   * Record one latency sample in milliseconds
+   */
+  record(ms) {
+    const bounds = this.bounds;
+    let bucket = 0;
+    while (bucket < bounds.length && ms > bounds[bucket]) bucket++;
+
+    this.counts[bucket]++;
+    this.count++;
+    this.sum += ms;
+    if (ms < this.min) this.min = ms;
+    if (ms > this.max) this.max = ms;
+  }
+
+  /**
+   * Approximate percentile (0-100): upper bound of the bucket holding that rank,
+   * capped at the largest sample seen
+   */
+  percentile(p) {
+    if (this.count === 0) return 0;
+
+    const rank = Math.ceil((p / 100) * this.count);
+    let seen = 0;
+    for (let bucket = 0; bucket < this.counts.length; bucket++) {
+      seen += this.counts[bucket];
+      if (seen >= rank) {
+        return bucket < this.bounds.length ? Math.min(this.bounds[bucket], this.max) : this.max;
+      }
+    }
+    return this.max;
+  }
+
+  /**
+   * Cumulative counts per upper bound (Prometheus-style "le" buckets)
+   */
+  getBuckets() {
+    const buckets = [];
+    let cumulative = 0;
+    for (let bucket = 0; bucket < this.bounds.length; bucket++) {
+      cumulative += this.counts[bucket];
+      buckets.push({ le: this.bounds[bucket], count: cumulative });
+    }
+    buckets.push({ le: Infinity, count: this.count });
+    return buckets;
+  }
+
+  reset() {
+    this.counts.fill(0);
+    this.count = 0;
+    this.sum = 0;
+    this.min = Infinity;
+    this.max = 0;
+  }
+
+  /**
+   * Summary for status endpoints
+   */
+  toJSON() {
+    const round = (value) => Math.round(value * 1000) / 1000;
+    return {
+      count: this.count,
+      mean_ms: this.count > 0 ? round(this.sum / this.count) : 0,
+      min_ms: this.count > 0 ? round(this.min) : 0,
+      max_ms: round(this.max),
+      p50_ms: round(this.percentile(50)),
+      p90_ms: round(this.percentile(90)),
+      p99_ms: round(this.percentile(99))
+    };
+  }
+}
+
+module.exports = LatencyHistogram;
@@ -0,0 +1,309 @@
+/**
+ * Metrics Registry - Node.js Implementation
+ * Prometheus text-format exposition without external dependencies.
+ * Hot paths only touch pre-allocated LatencyHistograms (O(buckets), no allocation);
+ * everything else is read from existing counters when /metrics is scraped.
+ */
+
+const { performance, PerformanceObserver, monitorEventLoopDelay, constants } = require('perf_hooks');
+const LatencyHistogram = require('./latencyHistogram');
+
+const CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8';
+const DEFAULT_PREFIX = 'cryptominer_';
+
+// Event-loop delay sampling resolution in milliseconds
+const EVENT_LOOP_RESOLUTION_MS = 10;
+
+const GC_KINDS = {
+  [constants.NODE_PERFORMANCE_GC_MAJOR]: 'major',
+  [constants.NODE_PERFORMANCE_GC_MINOR]: 'minor',
+  [constants.NODE_PERFORMANCE_GC_INCREMENTAL]: 'incremental',
+  [constants.NODE_PERFORMANCE_GC_WEAKCB]: 'weakcb'
+};
+
+// MongoDB commands counted as writes for the write latency histogram
+const MONGO_WRITE_COMMANDS = new Set(['insert', 'update', 'delete', 'findAndModify']);
+
+function escapeLabel(value) {
+  return String(value).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"');
+}
+
+function formatLabels(labels) {
+  const keys = labels ? Object.keys(labels) : [];
+  if (keys.length === 0) return '';
+  return '{' + keys.map(key => `${key}="${escapeLabel(labels[key])}"`).join(',') + '}';
+}
+
+function formatValue(value) {
+  if (value === Infinity) return '+Inf';
+  if (value === -Infinity) return '-Inf';
+  return Number.isFinite(value) ? String(value) : 'NaN';
+}
+
+/**
+ * Builds one exposition; collectors call it once per metric family
+ */
+class MetricsWriter {
+  constructor(prefix) {
+    this.prefix = prefix;
+    this.lines = [];
+  }
+
+  family(name, type, help) {
+    const fullName = this.prefix + name;
+    this.lines.push(`# HELP ${fullName} ${help}`, `# TYPE ${fullName} ${type}`);
+    return fullName;
+  }
+
+  /**
+   * samples: [[labels, value], ...]
+   */
+  gauge(name, help, samples) {
+    this.writeSamples(this.family(name, 'gauge', help), samples);
+  }
+
+  counter(name, help, samples) {
+    this.writeSamples(this.family(name, 'counter', help), samples);
+  }
+
+  writeSamples(fullName, samples) {
+    for (const [labels, value] of samples) {
+      this.lines.push(`${fullName}${formatLabels(labels)} ${formatValue(value)}`);
+    }
+  }
+
+  /**
+   * histograms: [[labels, LatencyHistogram], ...]; millisecond buckets are exported in seconds
+   */
+  histogram(name, help, histograms) {
+    const fullName = this.family(name, 'histogram', help);
+    for (const [labels, histogram] of histograms) {
+      for (const bucket of histogram.getBuckets()) {
+        const le = bucket.le === Infinity ? '+Inf' : String(bucket.le / 1000);
+        this.lines.push(`${fullName}_bucket${formatLabels({ ...labels, le })} ${bucket.count}`);
+      }
+      this.lines.push(`${fullName}_sum${formatLabels(labels)} ${formatValue(histogram.sum / 1000)}`);
+      this.lines.push(`${fullName}_count${formatLabels(labels)} ${histogram.count}`);
+    }
+  }
+
+  /**
+   * quantiles: [[quantile, value], ...] in seconds
+   */
+  summary(name, help, quantiles, sum, count) {
+    const fullName = this.family(name, 'summary', help);
+    for (const [quantile, value] of quantiles) {
+      this.lines.push(`${fullName}${formatLabels({ quantile })} ${formatValue(value)}`);
+    }
+    this.lines.push(`${fullName}_sum ${formatValue(sum)}`, `${fullName}_count ${count}`);
+  }
+
+  toString() {
+    return this.lines.join('\n') + '\n';
+  }
+}
+
+/**
+ * Histogram family keyed by a single label, e.g. the GC kind or the socket event
+ */
+class LabeledHistogram {
+  constructor(labelName) {
+    this.labelName = labelName;
+    this.histograms = new Map();
+  }
+
+  observe(labelValue, ms) {
+    let histogram = this.histograms.get(labelValue);
+    if (!histogram) {
+      histogram = new LatencyHistogram();
+      this.histograms.set(labelValue, histogram);
+    }
+    histogram.record(ms);
+  }
+
+  entries() {
+    return [...this.histograms].map(([value, histogram]) => [{ [this.labelName]: value }, histogram]);
+  }
+}
+
+class MetricsRegistry {
+  constructor(prefix = DEFAULT_PREFIX) {
+    this.prefix = prefix;
+    this.contentType = CONTENT_TYPE;
+    this.collectors = [];
+    this.histograms = [];
+    this.eventLoopDelay = null;
+    this.gcObserver = null;
+  }
+
+  /**
+   * Histogram owned by the registry; record with observe(labelValue, ms)
+   */
+  histogram(name, help, labelName) {
+    const histogram = new LabeledHistogram(labelName);
+    this.histograms.push({ name, help, histogram });
+    return histogram;
+  }
+
+  /**
+   * fn(writer) runs on every scrape to export values read from elsewhere
+   */
+  addCollector(fn) {
+    this.collectors.push(fn);
+  }
+
+  /**
+   * Event-loop lag (sampled by libuv timers) and GC pauses (performance observer)
+   */
+  startRuntimeMetrics() {
+    if (this.eventLoopDelay) return;
+
+    this.eventLoopDelay = monitorEventLoopDelay({ resolution: EVENT_LOOP_RESOLUTION_MS });
+    this.eventLoopDelay.enable();
+
+    const gcPauses = this.histogram('gc_pause_seconds', 'Garbage collection pause duration', 'kind');
+    this.gcObserver = new PerformanceObserver((list) => {
+      for (const entry of list.getEntries()) {
+        const kind = entry.detail ? entry.detail.kind : entry.kind;
+        gcPauses.observe(GC_KINDS[kind] || 'other', entry.duration);
+      }
+    });
+    this.gcObserver.observe({ entryTypes: ['gc'] });
+  }
+
+  stopRuntimeMetrics() {
+    if (this.eventLoopDelay) {
+      this.eventLoopDelay.disable();
+      this.eventLoopDelay = null;
+    }
+    if (this.gcObserver) {
+      this.gcObserver.disconnect();
+      this.gcObserver = null;
+    }
+  }
+
+  /**
+   * Time MongoDB writes from the driver's command monitoring events
+   * The client must be connected with monitorCommands: true
+   */
+  instrumentMongoClient(client) {
+    if (!client || typeof client.on !== 'function') return;
+
+    const writes = this.histogram('mongo_write_seconds', 'MongoDB write command latency', 'command');
+    const onCommand = (event) => {
+      if (MONGO_WRITE_COMMANDS.has(event.commandName)) {
+        writes.observe(event.commandName, event.duration);
+      }
+    };
+    client.on('commandSucceeded', onCommand);
+    client.on('commandFailed', onCommand);
+  }
+
+  /**
+   * Run fn and record how long it took, in the given histogram and label
+   */
+  time(histogram, labelValue, fn) {
+    const started = performance.now();
+    try {
+      return fn();
+    } finally {
+      histogram.observe(labelValue, performance.now() - started);
+    }
+  }
+
+  /**
+   * Full exposition in the Prometheus text format
+   */
+  render() {
+    const writer = new MetricsWriter(this.prefix);
+
+    if (this.eventLoopDelay) {
+      // Samples are timer intervals; the lag is what exceeds the sampling period
+      const delay = this.eventLoopDelay;
+      const count = delay.count || 0;
+      const lag = ns => Math.max(ns / 1e6 - EVENT_LOOP_RESOLUTION_MS, 0) / 1000;
+      writer.summary('eventloop_lag_seconds', 'Event-loop lag beyond the 10 ms sampling timer', [
+        [0.5, lag(delay.percentile(50))],
+        [0.9, lag(delay.percentile(90))],
+        [0.99, lag(delay.percentile(99))],
+        [1, lag(delay.max)]
+      ], count > 0 ? lag(delay.mean) * count : 0, count);
+    }
+
+    for (const { name, help, histogram } of this.histograms) {
+      writer.histogram(name, help, histogram.entries());
+    }
+
+    for (const collect of this.collectors) {
+      collect(writer);
+    }
+    return writer.toString();
+  }
+
+  /**
+   * Request handler for the scrape endpoint; uses only core http response methods,
+   * so it works as an Express route and on a plain http.Server
+   */
+  handler() {
+    return (req, res) => {
+      try {
+        const body = this.render();
+        res.statusCode = 200;
+        res.setHeader('Content-Type', this.contentType);
+        res.end(body);
+      } catch (error) {
+        console.error('Metrics error:', error);
+        res.statusCode = 500;
+        res.setHeader('Content-Type', this.contentType);
+        res.end('# metrics collection failed\n');
+      }
+    };
+  }
+}
+
+/**
+ * Mining engine metrics, read from the engine's own counters and histograms
+ * Engines other than MiningEngine (e.g. HighPerformanceMiningEngine) only report
+ * the gauges every engine's getStatus() has
+ */
+function writeEngineMetrics(writer, engine) {
+  const status = engine.getStatus();
+  const stats = status.stats || {};
+
+  writer.gauge('mining_active', 'Whether mining is running', [[null, status.is_mining ? 1 : 0]]);
+  writer.gauge('mining_threads', 'Worker threads or miner processes', [[null, status.threads || status.processes || 0]]);
+
+  if (typeof engine.getTotalHashCount !== 'function' || !status.hashrate_windows) {
+    writer.gauge('hashrate_hashes_per_second', 'Hashrate reported by the engine',
+      [[{ window: 'current' }, stats.hashrate || 0]]);
+    writer.counter('shares_total', 'Shares by outcome in this mining session', [
+      [{ result: 'accepted' }, stats.accepted_shares || 0],
+      [{ result: 'rejected' }, stats.rejected_shares || 0]
+    ]);
+    return;
+  }
+
+  writer.gauge('hashrate_hashes_per_second', 'Hashrate per EWMA window, plus the lifetime average',
+    Object.entries(status.hashrate_windows).map(([window, rate]) => [{ window }, rate]));
+
+  writer.counter('hashes_total', 'Hashes computed in this mining session', [[null, engine.getTotalHashCount()]]);
+  writer.counter('worker_hashes_total', 'Hashes computed per worker thread',
+    engine.workers.map(worker => [{ worker: worker.id }, worker.hashCount]));
+  writer.counter('shares_total', 'Shares by outcome in this mining session', [
+    [{ result: 'accepted' }, stats.accepted_shares],
+    [{ result: 'rejected' }, stats.rejected_shares],
+    [{ result: 'stale' }, stats.stale_shares]
+  ]);
+  writer.counter('shares_submitted_total', 'mining.submit requests written to the pool', [[null, stats.submitted_shares]]);
+
+  writer.histogram('share_submit_rtt_seconds', 'Time from mining.submit to the pool response',
+    [[null, engine.pendingShares.rtt]]);
+  writer.histogram('job_switch_seconds', 'Time from job dispatch until a worker hashes the new job',
+    [[null, engine.jobSwitchLatency]]);
+}
+
+module.exports = {
+  MetricsRegistry,
+  MetricsWriter,
+  writeEngineMetrics
+};
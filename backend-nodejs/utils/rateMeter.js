@@ -0,0 +1,80 @@
+/**
+ * Rate Meter - Node.js Implementation
+ * Exponentially weighted moving averages of a monotonically increasing counter
+ * (e.g. total hashes) over several time windows, plus the lifetime average.
+ * Fed with counter totals at any interval; no per-sample history is kept.
+ */
+
+// Window name -> time constant in seconds
+const DEFAULT_WINDOWS = { '10s': 10, '60s': 60, '15m': 900 };
+
+class RateMeter {
+  constructor(windows = DEFAULT_WINDOWS) {
+    this.names = Object.keys(windows);
+    this.tau = Float64Array.from(this.names.map(name => windows[name]));
+    this.values = new Float64Array(this.names.length);
+    this.reset();
+  }
+
+  /**
+   * Start over, e.g. when mining restarts
+   */
+  reset(now = Date.now()) {
+    this.values.fill(0);
+    this.startTime = now;
+    this.lastTime = now;
+    this.lastTotal = 0;
+  }
+
+  /**
+   * Fold in the counter's current total
+   */
+  update(total, now = Date.now()) {
+    const dt = (now - this.lastTime) / 1000;
+    if (dt <= 0) return;
+
+    // A counter that went backwards was restarted; count from its new value
+    const delta = total >= this.lastTotal ? total - this.lastTotal : total;
+    const rate = delta / dt;
+    for (let i = 0; i < this.values.length; i++) {
+      this.values[i] += (1 - Math.exp(-dt / this.tau[i])) * (rate - this.values[i]);
+    }
+
+    this.lastTime = now;
+    this.lastTotal = total;
+  }
+
+  /**
+   * Average rate for a window; early on it is divided by the weight gathered so
+   * far, so a 15-minute window is not biased towards zero for its first minutes
+   */
+  rate(name) {
+    const i = this.names.indexOf(name);
+    if (i < 0) return 0;
+    const elapsed = (this.lastTime - this.startTime) / 1000;
+    if (elapsed <= 0) return 0;
+    return this.values[i] / (1 - Math.exp(-elapsed / this.tau[i]));
+  }
+
+  /**
+   * Counter total over the whole time since reset()
+   */
+  lifetimeRate() {
+    const elapsed = (this.lastTime - this.startTime) / 1000;
+    return elapsed > 0 ? this.lastTotal / elapsed : 0;
+  }
+
+  /**
+   * Every window plus 'lifetime', rounded for status payloads
+   */
+  toJSON() {
+    const result = {};
+    for (const name of this.names) {
+      result[name] = Math.round(this.rate(name) * 100) / 100;
+    }
+    result.lifetime = Math.round(this.lifetimeRate() * 100) / 100;
+    return result;
+  }
+}
+
+module.exports = RateMeter;
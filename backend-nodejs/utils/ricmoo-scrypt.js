@@ -8,25 +8,26 @@
 
 const MAX_VALUE = 0x7fffffff;
 
+// SHA-256 round constants, shared by every hash instead of being rebuilt per call
+const K = new Uint32Array([
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b,
+    0x59f111f1, 0x923f82a4, 0xab1c5ed5, 0xd807aa98, 0x12835b01,
+    0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7,
+    0xc19bf174, 0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc,
+    0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da, 0x983e5152,
+    0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147,
+    0x06ca6351, 0x14292967, 0x27b70a85, 0x2e1b2138, 0x4d2c6dfc,
+    0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819,
+    0xd6990624, 0xf40e3585, 0x106aa070, 0x19a4c116, 0x1e376c08,
+    0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f,
+    0x682e6ff3, 0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208,
+    0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2
+]);
+
 // The SHA256 and PBKDF2 implementation are from scrypt-async-js:
 // See: https://github.com/dchest/scrypt-async-js
 function SHA256(m) {
-    const K = new Uint32Array([
-       0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b,
-       0x59f111f1, 0x923f82a4, 0xab1c5ed5, 0xd807aa98, 0x12835b01,
-       0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7,
-       0xc19bf174, 0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc,
-       0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da, 0x983e5152,
-       0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147,
-       0x06ca6351, 0x14292967, 0x27b70a85, 0x2e1b2138, 0x4d2c6dfc,
-       0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
-       0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819,
-       0xd6990624, 0xf40e3585, 0x106aa070, 0x19a4c116, 0x1e376c08,
-       0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f,
-       0x682e6ff3, 0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208,
-       0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2
-   ]);
-
     let h0 = 0x6a09e667, h1 = 0xbb67ae85, h2 = 0x3c6ef372, h3 = 0xa54ff53a;
     let h4 = 0x510e527f, h5 = 0x9b05688c, h6 = 0x1f83d9ab, h7 = 0x5be0cd19;
     const w = new Uint32Array(64);
@@ -121,7 +122,7 @@ function PBKDF2_HMAC_SHA256_OneIter(password, salt, dkLen) {
     // Simplified PBKDF2 for one iteration (as used in scrypt)
     const hLen = 32;
     const U = new Uint8Array(hLen);
-    const T = new Uint8Array(hLen);
+    const T = new Uint8Array(Math.ceil(dkLen / hLen) * hLen);
     const blockIndex = new Uint8Array(4);
     
     // Single iteration PBKDF2
@@ -184,30 +185,40 @@ function HMAC_SHA256(key, data) {
 // Core scrypt SMix function
 function scryptROMix(B, r, N) {
     const X = new Uint32Array(32 * r);
+    const Y = new Uint32Array(32 * r);
     const V = new Uint32Array(32 * r * N);
-    
+    const T = new Uint32Array(16);
+
+    romixInPlace(B, X, Y, V, T, r, N);
+}
+
+// ROMix over the byte block B using caller-provided scratch buffers
+function romixInPlace(B, X, Y, V, T, r, N) {
+    const blockWords = 32 * r;
+
     // Convert B to X
-    for (let i = 0; i < 32 * r; i++) {
+    for (let i = 0; i < blockWords; i++) {
         X[i] = (B[i * 4] << 0) | (B[i * 4 + 1] << 8) | (B[i * 4 + 2] << 16) | (B[i * 4 + 3] << 24);
     }
-    
+
     // SMix 1
     for (let i = 0; i < N; i++) {
-        V.set(X, i * 32 * r);
-        scryptBlockMix(X, r);
+        V.set(X, i * blockWords);
+        scryptBlockMix(X, Y, T, r);
     }
-    
+
     // SMix 2
     for (let i = 0; i < N; i++) {
         const j = integerify(X, r) & (N - 1);
-        for (let k = 0; k < 32 * r; k++) {
-            X[k] ^= V[j * 32 * r + k];
+        const offset = j * blockWords;
+        for (let k = 0; k < blockWords; k++) {
+            X[k] ^= V[offset + k];
         }
-        scryptBlockMix(X, r);
+        scryptBlockMix(X, Y, T, r);
     }
-    
+
     // Convert X back to B
-    for (let i = 0; i < 32 * r; i++) {
+    for (let i = 0; i < blockWords; i++) {
         B[i * 4] = X[i] >>> 0;
         B[i * 4 + 1] = X[i] >>> 8;
         B[i * 4 + 2] = X[i] >>> 16;
@@ -215,74 +226,457 @@ function scryptROMix(B, r, N) {
     }
 }
 
-function scryptBlockMix(B, r) {
-    const X = new Uint32Array(16);
-    const Y = new Uint32Array(32 * r);
-    
-    // X = B[2r-1]
-    X.set(B.subarray((2 * r - 1) * 16, 2 * r * 16));
-    
+// BlockMix with salsa20/8; Y (32 * r words) and T (16 words) are scratch
+function scryptBlockMix(B, Y, T, r) {
+    // T = B[2r-1]
+    const last = (2 * r - 1) * 16;
+    for (let j = 0; j < 16; j++) {
+        T[j] = B[last + j];
+    }
+
     for (let i = 0; i < 2 * r; i++) {
-        // X = salsa20_8(X XOR B[i])
+        // T = salsa20_8(T XOR B[i])
         for (let j = 0; j < 16; j++) {
-            X[j] ^= B[i * 16 + j];
+            T[j] ^= B[i * 16 + j];
+        }
+        salsa20_8(T);
+
+        // Y[i] = T
+        for (let j = 0; j < 16; j++) {
+            Y[i * 16 + j] = T[j];
         }
-        salsa20_8(X);
-        
-        // Y[i] = X
-        Y.set(X, i * 16);
     }
-    
+
     // B = (Y[0], Y[2], ..., Y[2r-2], Y[1], Y[3], ..., Y[2r-1])
     for (let i = 0; i < r; i++) {
-        B.set(Y.subarray(i * 2 * 16, (i * 2 + 1) * 16), i * 16);
-        B.set(Y.subarray((i * 2 + 1) * 16, (i * 2 + 2) * 16), (r + i) * 16);
+        for (let j = 0; j < 16; j++) {
+            B[i * 16 + j] = Y[i * 32 + j];
+            B[(r + i) * 16 + j] = Y[i * 32 + 16 + j];
+        }
     }
 }
 
+// salsa20/8 core on a 16-word block, kept in locals so it never allocates
 function salsa20_8(B) {
-    const x = new Uint32Array(16);
-    x.set(B);
-    
+    let x0 = B[0], x1 = B[1], x2 = B[2], x3 = B[3],
+        x4 = B[4], x5 = B[5], x6 = B[6], x7 = B[7],
+        x8 = B[8], x9 = B[9], x10 = B[10], x11 = B[11],
+        x12 = B[12], x13 = B[13], x14 = B[14], x15 = B[15], u;
+
     for (let i = 0; i < 8; i += 2) {
         // Column rounds
-        x[4] ^= rotl(x[0] + x[12], 7);  x[9] ^= rotl(x[5] + x[1], 7);
-        x[14] ^= rotl(x[10] + x[6], 7); x[3] ^= rotl(x[15] + x[11], 7);
-        
-        x[8] ^= rotl(x[4] + x[0], 9);   x[13] ^= rotl(x[9] + x[5], 9);
-        x[2] ^= rotl(x[14] + x[10], 9); x[7] ^= rotl(x[3] + x[15], 9);
-        
-        x[12] ^= rotl(x[8] + x[4], 13); x[1] ^= rotl(x[13] + x[9], 13);
-        x[6] ^= rotl(x[2] + x[14], 13); x[11] ^= rotl(x[7] + x[3], 13);
-        
-        x[0] ^= rotl(x[12] + x[8], 18); x[5] ^= rotl(x[1] + x[13], 18);
-        x[10] ^= rotl(x[6] + x[2], 18); x[15] ^= rotl(x[11] + x[7], 18);
-        
+        u = x0 + x12 | 0;   x4 ^= u << 7 | u >>> 25;
+        u = x4 + x0 | 0;    x8 ^= u << 9 | u >>> 23;
+        u = x8 + x4 | 0;    x12 ^= u << 13 | u >>> 19;
+        u = x12 + x8 | 0;   x0 ^= u << 18 | u >>> 14;
+
+        u = x5 + x1 | 0;    x9 ^= u << 7 | u >>> 25;
+        u = x9 + x5 | 0;    x13 ^= u << 9 | u >>> 23;
+        u = x13 + x9 | 0;   x1 ^= u << 13 | u >>> 19;
+        u = x1 + x13 | 0;   x5 ^= u << 18 | u >>> 14;
+
+        u = x10 + x6 | 0;   x14 ^= u << 7 | u >>> 25;
+        u = x14 + x10 | 0;  x2 ^= u << 9 | u >>> 23;
+        u = x2 + x14 | 0;   x6 ^= u << 13 | u >>> 19;
+        u = x6 + x2 | 0;    x10 ^= u << 18 | u >>> 14;
+
+        u = x15 + x11 | 0;  x3 ^= u << 7 | u >>> 25;
+        u = x3 + x15 | 0;   x7 ^= u << 9 | u >>> 23;
+        u = x7 + x3 | 0;    x11 ^= u << 13 | u >>> 19;
+        u = x11 + x7 | 0;   x15 ^= u << 18 | u >>> 14;
+
         // Row rounds
-        x[1] ^= rotl(x[0] + x[3], 7);   x[6] ^= rotl(x[5] + x[4], 7);
-        x[11] ^= rotl(x[10] + x[9], 7); x[12] ^= rotl(x[15] + x[14], 7);
-        
-        x[2] ^= rotl(x[1] + x[0], 9);   x[7] ^= rotl(x[6] + x[5], 9);
-        x[8] ^= rotl(x[11] + x[10], 9); x[13] ^= rotl(x[12] + x[15], 9);
-        
-        x[3] ^= rotl(x[2] + x[1], 13);  x[4] ^= rotl(x[7] + x[6], 13);
-        x[9] ^= rotl(x[8] + x[11], 13); x[14] ^= rotl(x[13] + x[12], 13);
-        
-        x[0] ^= rotl(x[3] + x[2], 18);  x[5] ^= rotl(x[4] + x[7], 18);
-        x[10] ^= rotl(x[9] + x[8], 18); x[15] ^= rotl(x[14] + x[13], 18);
+        u = x0 + x3 | 0;    x1 ^= u << 7 | u >>> 25;
+        u = x1 + x0 | 0;    x2 ^= u << 9 | u >>> 23;
+        u = x2 + x1 | 0;    x3 ^= u << 13 | u >>> 19;
+        u = x3 + x2 | 0;    x0 ^= u << 18 | u >>> 14;
+
+        u = x5 + x4 | 0;    x6 ^= u << 7 | u >>> 25;
+        u = x6 + x5 | 0;    x7 ^= u << 9 | u >>> 23;
+        u = x7 + x6 | 0;    x4 ^= u << 13 | u >>> 19;
+        u = x4 + x7 | 0;    x5 ^= u << 18 | u >>> 14;
+
+        u = x10 + x9 | 0;   x11 ^= u << 7 | u >>> 25;
+        u = x11 + x10 | 0;  x8 ^= u << 9 | u >>> 23;
+        u = x8 + x11 | 0;   x9 ^= u << 13 | u >>> 19;
+        u = x9 + x8 | 0;    x10 ^= u << 18 | u >>> 14;
+
+        u = x15 + x14 | 0;  x12 ^= u << 7 | u >>> 25;
+        u = x12 + x15 | 0;  x13 ^= u << 9 | u >>> 23;
+        u = x13 + x12 | 0;  x14 ^= u << 13 | u >>> 19;
+        u = x14 + x13 | 0;  x15 ^= u << 18 | u >>> 14;
     }
-    
+
+    B[0] += x0; B[1] += x1; B[2] += x2; B[3] += x3;
+    B[4] += x4; B[5] += x5; B[6] += x6; B[7] += x7;
+    B[8] += x8; B[9] += x9; B[10] += x10; B[11] += x11;
+    B[12] += x12; B[13] += x13; B[14] += x14; B[15] += x15;
+}
+
+function integerify(B, r) {
+    return B[(2 * r - 1) * 16] >>> 0;
+}
+
+// Allocation-free SHA-256 building blocks used by ScryptContext
+
+const SHA256_IV = new Uint32Array([
+    0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a,
+    0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19
+]);
+
+// Load a 64-byte big-endian block into w[0..15]
+function sha256LoadBlock(w, p, off) {
     for (let i = 0; i < 16; i++) {
-        B[i] = (x[i] + B[i]) >>> 0;
+        const j = off + i * 4;
+        w[i] = (p[j] << 24) | (p[j + 1] << 16) | (p[j + 2] << 8) | p[j + 3];
+    }
+}
+
+// Expand w[0..15] into the full 64-word message schedule
+function sha256ExpandSchedule(w) {
+    let u, t1, t2;
+    for (let i = 16; i < 64; i++) {
+        u = w[i - 2];
+        t1 = ((u >>> 17) | (u << 15)) ^ ((u >>> 19) | (u << 13)) ^ (u >>> 10);
+
+        u = w[i - 15];
+        t2 = ((u >>> 7) | (u << 25)) ^ ((u >>> 18) | (u << 14)) ^ (u >>> 3);
+
+        w[i] = (((t1 + w[i - 7]) | 0) + ((t2 + w[i - 16]) | 0)) | 0;
+    }
+}
+
+// Run the 64 compression rounds of an expanded schedule into state
+function sha256Rounds(state, w) {
+    let a = state[0], b = state[1], c = state[2], d = state[3],
+        e = state[4], f = state[5], g = state[6], h = state[7], t1, t2;
+
+    for (let i = 0; i < 64; i++) {
+        t1 = ((((((e >>> 6) | (e << 26)) ^ ((e >>> 11) | (e << 21)) ^
+            ((e >>> 25) | (e << 7))) + ((e & f) ^ (~e & g))) | 0) +
+            ((h + ((K[i] + w[i]) | 0)) | 0)) | 0;
+
+        t2 = ((((a >>> 2) | (a << 30)) ^ ((a >>> 13) | (a << 19)) ^
+            ((a >>> 22) | (a << 10))) + ((a & b) ^ (a & c) ^ (b & c))) | 0;
+
+        h = g;
+        g = f;
+        f = e;
+        e = (d + t1) | 0;
+        d = c;
+        c = b;
+        b = a;
+        a = (t1 + t2) | 0;
     }
+
+    state[0] += a; state[1] += b; state[2] += c; state[3] += d;
+    state[4] += e; state[5] += f; state[6] += g; state[7] += h;
 }
 
-function rotl(x, n) {
-    return ((x << n) | (x >>> (32 - n))) >>> 0;
+function sha256Compress(state, w, p, off) {
+    sha256LoadBlock(w, p, off);
+    sha256ExpandSchedule(w);
+    sha256Rounds(state, w);
 }
 
-function integerify(B, r) {
-    return B[(2 * r - 1) * 16] >>> 0;
+// Write the eight state words big-endian into out[off..off+31]
+function sha256WriteState(state, out, off) {
+    for (let i = 0; i < 8; i++) {
+        const v = state[i];
+        out[off + i * 4] = v >>> 24;
+        out[off + i * 4 + 1] = v >>> 16;
+        out[off + i * 4 + 2] = v >>> 8;
+        out[off + i * 4 + 3] = v;
+    }
+}
+
+// Append SHA-256 padding for a message of totalLen bytes whose tail starts at block[used]
+function sha256PadBlock(block, used, totalLen) {
+    const bitLen = totalLen * 8;
+    block[used] = 0x80;
+    block.fill(0, used + 1, 56);
+    block[56] = 0; block[57] = 0; block[58] = 0;
+    block[59] = (bitLen / 0x100000000) & 0xff;
+    block[60] = bitLen >>> 24;
+    block[61] = bitLen >>> 16;
+    block[62] = bitLen >>> 8;
+    block[63] = bitLen;
+}
+
+const HEADER_LENGTH = 80;
+const MAX_LANES = 4;
+
+// Per-nonce scratch: one lane per nonce hashed in lockstep by hashBatch()
+function createLane(N, r) {
+    return {
+        B: new Uint8Array(128 * r),
+        X: new Uint32Array(32 * r),
+        Y: new Uint32Array(32 * r),
+        V: new Uint32Array(32 * r * N),
+        T: new Uint32Array(16),
+        ipadState: new Uint32Array(8),
+        opadState: new Uint32Array(8)
+    };
+}
+
+// ROMix for several independent lanes in lockstep, so the memory-bound V lookups
+// of one lane overlap with salsa20/8 work on the others
+function romixLanes(lanes, count, r, N) {
+    const blockWords = 32 * r;
+
+    for (let l = 0; l < count; l++) {
+        const { B, X } = lanes[l];
+        for (let i = 0; i < blockWords; i++) {
+            X[i] = (B[i * 4] << 0) | (B[i * 4 + 1] << 8) | (B[i * 4 + 2] << 16) | (B[i * 4 + 3] << 24);
+        }
+    }
+
+    // SMix 1
+    for (let i = 0; i < N; i++) {
+        const offset = i * blockWords;
+        for (let l = 0; l < count; l++) {
+            const lane = lanes[l];
+            lane.V.set(lane.X, offset);
+            scryptBlockMix(lane.X, lane.Y, lane.T, r);
+        }
+    }
+
+    // SMix 2
+    for (let i = 0; i < N; i++) {
+        for (let l = 0; l < count; l++) {
+            const { X, V } = lanes[l];
+            const offset = (integerify(X, r) & (N - 1)) * blockWords;
+            for (let k = 0; k < blockWords; k++) {
+                X[k] ^= V[offset + k];
+            }
+            scryptBlockMix(X, lanes[l].Y, lanes[l].T, r);
+        }
+    }
+
+    for (let l = 0; l < count; l++) {
+        const { B, X } = lanes[l];
+        for (let i = 0; i < blockWords; i++) {
+            B[i * 4] = X[i] >>> 0;
+            B[i * 4 + 1] = X[i] >>> 8;
+            B[i * 4 + 2] = X[i] >>> 16;
+            B[i * 4 + 3] = X[i] >>> 24;
+        }
+    }
+}
+
+/**
+ * Reusable scrypt context for Litecoin-style proof of work
+ * Computes scrypt(header, header, N, r, 1, 32) for 80-byte block headers.
+ * Every scratch buffer (V, XY, B, SHA-256 state and schedule) is allocated once
+ * in the constructor, so hashing performs no allocations per call.
+ *
+ * Mining use: call setMidstate(header) once per job, then hashNonceInto(nonce, out)
+ * for each nonce. Bytes 0..63 of the header never change within a job, so the
+ * SHA-256 midstate of that block (for the HMAC key) and its expanded message
+ * schedule (for the first PBKDF2 inner hash) are computed once per job.
+ *
+ * hashBatch() hashes a nonce range, running up to `lanes` nonces through ROMix
+ * in lockstep; each lane owns its own V buffer (128 * r * N bytes).
+ */
+class ScryptContext {
+    constructor(N = 1024, r = 1, lanes = 1) {
+        if (N === 0 || (N & (N - 1)) !== 0) throw Error("N must be a power of 2");
+        if (r < 1) throw Error("r must be >= 1");
+        if (lanes < 1 || lanes > MAX_LANES) throw Error(`lanes must be between 1 and ${MAX_LANES}`);
+
+        this.N = N;
+        this.r = r;
+
+        // ROMix and HMAC pad-state scratch, one lane per nonce in flight
+        this.lanes = [];
+        for (let l = 0; l < lanes; l++) {
+            this.lanes.push(createLane(N, r));
+        }
+
+        // SHA-256 / HMAC scratch shared by all lanes
+        this.w = new Uint32Array(64);
+        this.state = new Uint32Array(8);
+        this.innerPrefixState = new Uint32Array(8);
+        this.key = new Uint8Array(32);
+        this.block = new Uint8Array(64);
+        this.inner = new Uint8Array(32);
+
+        // Job-level midstate, filled by setMidstate()
+        this.header = new Uint8Array(HEADER_LENGTH);
+        this.keyMidstate = new Uint32Array(8);
+        this.headerSchedule = new Uint32Array(64);
+    }
+
+    /**
+     * Precompute everything that depends only on header bytes 0..63
+     * (version, prevhash and the first 28 bytes of the merkle root)
+     */
+    setMidstate(header) {
+        if (header.length < 76) throw Error("header template must be at least 76 bytes");
+
+        for (let i = 0; i < 76; i++) this.header[i] = header[i];
+
+        // Message schedule of the first header block, shared by every HMAC over the header
+        sha256LoadBlock(this.headerSchedule, this.header, 0);
+        sha256ExpandSchedule(this.headerSchedule);
+
+        // SHA-256 midstate of the first header block, used to derive the HMAC key
+        this.keyMidstate.set(SHA256_IV);
+        sha256Rounds(this.keyMidstate, this.headerSchedule);
+    }
+
+    /**
+     * Hash the midstate header with the given nonce into out (32 bytes)
+     */
+    hashNonceInto(nonce, out) {
+        const lane = this.lanes[0];
+
+        this.setNonce(nonce);
+        this.prepareKey(lane);
+        this.pbkdf2Header(lane);
+        romixLanes(this.lanes, 1, this.r, this.N);
+        this.pbkdf2Final(lane);
+        sha256WriteState(this.state, out, 0);
+        return out;
+    }
+
+    /**
+     * Hash `count` consecutive nonces starting at nonceStart. Hash i is written to
+     * outWords[i * 8 .. i * 8 + 7] as little-endian uint32 words (word 7 is most significant).
+     * Pass a header template to load a new midstate first, or null to keep the current one.
+     */
+    hashBatch(template, nonceStart, count, outWords) {
+        if (template) this.setMidstate(template);
+
+        const laneCount = this.lanes.length;
+        for (let done = 0; done < count; done += laneCount) {
+            const inFlight = Math.min(laneCount, count - done);
+
+            for (let l = 0; l < inFlight; l++) {
+                this.setNonce((nonceStart + done + l) >>> 0);
+                this.prepareKey(this.lanes[l]);
+                this.pbkdf2Header(this.lanes[l]);
+            }
+
+            romixLanes(this.lanes, inFlight, this.r, this.N);
+
+            for (let l = 0; l < inFlight; l++) {
+                this.pbkdf2Final(this.lanes[l]);
+                const base = (done + l) * 8;
+                const state = this.state;
+                for (let k = 0; k < 8; k++) {
+                    const v = state[k];
+                    // SHA-256 output is big-endian per word; the PoW hash is read little-endian
+                    outWords[base + k] = ((v << 24) | ((v & 0xff00) << 8) | ((v >>> 8) & 0xff00) | (v >>> 24)) >>> 0;
+                }
+            }
+        }
+        return outWords;
+    }
+
+    /**
+     * Hash an arbitrary 80-byte block header into out (32 bytes)
+     */
+    hashInto(header, out) {
+        if (header.length !== HEADER_LENGTH) throw Error("header must be 80 bytes");
+
+        this.setMidstate(header);
+        return this.hashNonceInto(
+            (header[76] | (header[77] << 8) | (header[78] << 16) | (header[79] << 24)) >>> 0,
+            out
+        );
+    }
+
+    setNonce(nonce) {
+        const header = this.header;
+        header[76] = nonce;
+        header[77] = nonce >>> 8;
+        header[78] = nonce >>> 16;
+        header[79] = nonce >>> 24;
+    }
+
+    /**
+     * HMAC key setup: the 80-byte password is longer than a block, so key = SHA256(header),
+     * resumed from the job midstate; then derive the lane's inner and outer pad states
+     */
+    prepareKey(lane) {
+        const { w, state, block, key, header } = this;
+
+        state.set(this.keyMidstate);
+        for (let j = 0; j < 16; j++) block[j] = header[64 + j];
+        sha256PadBlock(block, 16, HEADER_LENGTH);
+        sha256Compress(state, w, block, 0);
+        sha256WriteState(state, key, 0);
+
+        this.derivePadState(lane.ipadState, 0x36);
+        this.derivePadState(lane.opadState, 0x5c);
+
+        // SHA256(ipad || header[0..63]) is the common prefix of every first-pass PBKDF2 block
+        this.innerPrefixState.set(lane.ipadState);
+        sha256Rounds(this.innerPrefixState, this.headerSchedule);
+    }
+
+    derivePadState(padState, pad) {
+        const { block, key } = this;
+        for (let i = 0; i < 32; i++) block[i] = key[i] ^ pad;
+        block.fill(pad, 32, 64);
+        padState.set(SHA256_IV);
+        sha256Compress(padState, this.w, block, 0);
+    }
+
+    /**
+     * First PBKDF2 pass: B = PBKDF2-HMAC-SHA256(header, header, 1, 128 * r)
+     * Only the final block (header[64..79] || INT(i)) is compressed per output block
+     */
+    pbkdf2Header(lane) {
+        const { w, state, block, inner, header } = this;
+        const B = lane.B;
+        const blocks = (B.length / 32) | 0;
+
+        for (let i = 1; i <= blocks; i++) {
+            // Inner hash: SHA256(ipad || header || INT(i))
+            state.set(this.innerPrefixState);
+            for (let j = 0; j < 16; j++) block[j] = header[64 + j];
+            block[16] = i >>> 24; block[17] = i >>> 16; block[18] = i >>> 8; block[19] = i;
+            sha256PadBlock(block, 20, 64 + HEADER_LENGTH + 4);
+            sha256Compress(state, w, block, 0);
+            sha256WriteState(state, inner, 0);
+
+            this.hmacOuter(lane, inner);
+            sha256WriteState(state, B, (i - 1) * 32);
+        }
+    }
+
+    /**
+     * Second PBKDF2 pass: PBKDF2-HMAC-SHA256(header, B, 1, 32), result left in this.state
+     */
+    pbkdf2Final(lane) {
+        const { w, state, block, inner } = this;
+        const B = lane.B;
+
+        // Inner hash: SHA256(ipad || B || INT(1))
+        state.set(lane.ipadState);
+        for (let off = 0; off < B.length; off += 64) {
+            sha256Compress(state, w, B, off);
+        }
+        block[0] = 0; block[1] = 0; block[2] = 0; block[3] = 1;
+        sha256PadBlock(block, 4, 64 + B.length + 4);
+        sha256Compress(state, w, block, 0);
+        sha256WriteState(state, inner, 0);
+
+        this.hmacOuter(lane, inner);
+    }
+
+    /**
+     * Outer HMAC hash: SHA256(opad || inner), result left in this.state
+     */
+    hmacOuter(lane, inner) {
+        const { w, state, block } = this;
+        state.set(lane.opadState);
+        block.set(inner, 0);
+        sha256PadBlock(block, 32, 64 + 32);
+        sha256Compress(state, w, block, 0);
+    }
 }
 
 // Main scrypt function
@@ -290,7 +684,7 @@ function _scrypt(password, salt, N, r, p, dkLen, progressCallback) {
     // Validate parameters
     if (N === 0 || (N & (N - 1)) !== 0) throw Error("N must be a power of 2");
     if (r * p >= 1 << 30) throw Error("r*p must be < 2^30");
-    if (dkLen > (1 << 32) - 1) throw Error("dkLen must be < 2^32");
+    if (dkLen > 0xffffffff) throw Error("dkLen must be < 2^32");
 
     // Convert password and salt to Uint8Array
     if (typeof password === 'string') {
@@ -329,5 +723,6 @@ function syncScrypt(password, salt, N, r, p, dkLen) {
 
 module.exports = {
     syncScrypt: syncScrypt,
-    _scrypt: _scrypt
-};
\ No newline at end of file
+    _scrypt: _scrypt,
+    ScryptContext: ScryptContext
+};
@@ -0,0 +1,67 @@
+/**
+ * Ring Buffer - Node.js Implementation
+ * Fixed-capacity numeric ring buffer backed by a typed array; pushing never
+ * allocates, and once full the oldest sample is overwritten
+ */
+
+class RingBuffer {
+  constructor(capacity, ArrayType = Float64Array) {
+    this.capacity = capacity;
+    this.values = new ArrayType(capacity);
+    this.head = 0; // Next slot to write
+    this.length = 0;
+  }
+
+  push(value) {
+    this.values[this.head] = value;
+    this.head = (this.head + 1) % this.capacity;
+    if (this.length < this.capacity) this.length++;
+  }
+
+  /**
+   * Sample i positions back from the newest (0 = newest)
+   */
+  recent(i = 0) {
+    if (i >= this.length) return undefined;
+    return this.values[(this.head - 1 - i + this.capacity) % this.capacity];
+  }
+
+  /**
+   * Sum of the newest n samples (fewer if not that many were pushed yet)
+   */
+  sum(n = this.length) {
+    const count = Math.min(n, this.length);
+    let total = 0;
+    for (let i = 0; i < count; i++) {
+      total += this.recent(i);
+    }
+    return total;
+  }
+
+  /**
+   * Mean of the newest n samples
+   */
+  mean(n = this.length) {
+    const count = Math.min(n, this.length);
+    return count > 0 ? this.sum(count) / count : 0;
+  }
+
+  /**
+   * Newest n samples, oldest first
+   */
+  toArray(n = this.length) {
+    const count = Math.min(n, this.length);
+    const result = new Array(count);
+    for (let i = 0; i < count; i++) {
+      result[count - 1 - i] = this.recent(i);
+    }
+    return result;
+  }
+
+  clear() {
+    this.head = 0;
+    this.length = 0;
+  }
+}
+
+module.exports = RingBuffer;
@@ -0,0 +1,274 @@
+/**
+ * Scrypt Backends - Node.js Implementation
+ * Registry of interchangeable scrypt(header, header, N=1024, r=1, p=1, 32) hashers
+ * with a startup micro-benchmark that picks the fastest correct backend on this host
+ */
+
+const crypto = require('crypto');
+const { ScryptContext } = require('./ricmoo-scrypt');
+
+const SCRYPT_PARAMS = { N: 1024, r: 1, p: 1 };
+const HASH_LENGTH = 32;
+
+// Nonces interleaved through ROMix by the ricmoo-js backend. Interleaving only pays off when
+// V (128 KiB per lane) misses cache; compare lane counts with benchmarks/scrypt_lanes_bench.js
+const DEFAULT_LANES = 1;
+
+// Known-answer vectors: scrypt(header, header, 1024, 1, 1, 32)
+const KNOWN_ANSWER_VECTORS = [
+  {
+    // Litecoin genesis block header (PoW hash 0000050c34a6...b0671e00 when reversed)
+    header: '01000000000000000000000000000000000000000000000000000000000000000000000' +
+            '0d9ced4ed1130f7b7faad9be25323ffafa33232a17c3edf6cfd97bee6bafbdd97b9aa8e4e' +
+            'f0ff0f1ecd513f7c',
+    hash: '001e67b013726fd7382e9acb69165b4b6316227fb3156b5b414ba6340c050000'
+  },
+  {
+    header: '00'.repeat(80),
+    hash: '161d0876f3b93b1048cda1bdeaa7332ee210f7131b42013cb43913a6553a4b69'
+  }
+];
+
+/**
+ * Hasher over a per-job header: setMidstate(header) once per job, then hashNonceInto(nonce, out)
+ * or hashBatch(null, nonceStart, count, outWords) for a nonce range
+ * Header-copying hasher shared by the backends that have no midstate support
+ */
+class HeaderHasher {
+  constructor(hashFn, async = false) {
+    this.header = Buffer.alloc(80);
+    this.out = Buffer.alloc(HASH_LENGTH);
+    this.hashFn = hashFn;
+    this.async = async;
+  }
+
+  setMidstate(header) {
+    for (let i = 0; i < 76; i++) this.header[i] = header[i];
+  }
+
+  hashNonceInto(nonce, out) {
+    this.header.writeUInt32LE(nonce >>> 0, 76);
+    return this.hashFn(this.header, out);
+  }
+
+  /**
+   * Same contract as ScryptContext.hashBatch(), one nonce at a time.
+   * Returns a Promise for asynchronous backends.
+   */
+  hashBatch(template, nonceStart, count, outWords) {
+    if (template) this.setMidstate(template);
+    if (this.async) return this.hashBatchAsync(nonceStart, count, outWords);
+
+    for (let i = 0; i < count; i++) {
+      this.hashNonceInto((nonceStart + i) >>> 0, this.out);
+      this.copyWords(i, outWords);
+    }
+    return outWords;
+  }
+
+  async hashBatchAsync(nonceStart, count, outWords) {
+    for (let i = 0; i < count; i++) {
+      await this.hashNonceInto((nonceStart + i) >>> 0, this.out);
+      this.copyWords(i, outWords);
+    }
+    return outWords;
+  }
+
+  copyWords(index, outWords) {
+    for (let k = 0; k < 8; k++) {
+      outWords[index * 8 + k] = this.out.readUInt32LE(k * 4);
+    }
+  }
+}
+
+const BACKENDS = {
+  'ricmoo-js': {
+    description: 'Pure JavaScript ricmoo scrypt with reusable context and SHA-256 midstate',
+    async: false,
+    isAvailable: () => true,
+    createHasher: (options = {}) => new ScryptContext(SCRYPT_PARAMS.N, SCRYPT_PARAMS.r, options.lanes || DEFAULT_LANES)
+  },
+
+  'native': {
+    description: 'Node.js crypto.scryptSync (OpenSSL)',
+    async: false,
+    isAvailable: () => typeof crypto.scryptSync === 'function',
+    createHasher: () => new HeaderHasher((header, out) => {
+      const result = crypto.scryptSync(header, header, HASH_LENGTH, SCRYPT_PARAMS);
+      out.set(result);
+      return out;
+    })
+  },
+
+  'scrypt-js': {
+    description: 'scrypt-js package (asynchronous, yields to the event loop)',
+    async: true,
+    isAvailable: () => {
+      try {
+        require.resolve('scrypt-js');
+        return true;
+      } catch (error) {
+        return false;
+      }
+    },
+    createHasher: () => {
+      const scryptJs = require('scrypt-js');
+      return new HeaderHasher(async (header, out) => {
+        // Copy the header so the caller may patch the next nonce while this one is in flight
+        const input = Buffer.from(header);
+        const result = await scryptJs.scrypt(input, input, SCRYPT_PARAMS.N, SCRYPT_PARAMS.r, SCRYPT_PARAMS.p, HASH_LENGTH);
+        out.set(result);
+        return out;
+      }, true);
+    }
+  }
+};
+
+let benchmarkResults = null;
+let selection = null;
+
+/**
+ * Look up a backend definition by name
+ */
+function getBackend(name) {
+  const backend = BACKENDS[name];
+  if (!backend) {
+    throw new Error(`Unknown scrypt backend: ${name}`);
+  }
+  return backend;
+}
+
+/**
+ * Create a hasher for the named backend
+ * options.lanes sets the number of interleaved nonces for backends that support it
+ */
+function createHasher(name, options = {}) {
+  return getBackend(name).createHasher(options);
+}
+
+/**
+ * Check a backend against the known-answer vectors
+ */
+async function verifyBackend(name) {
+  const backend = getBackend(name);
+  const hasher = backend.createHasher();
+  const out = Buffer.alloc(HASH_LENGTH);
+
+  for (const vector of KNOWN_ANSWER_VECTORS) {
+    const header = Buffer.from(vector.header, 'hex');
+    hasher.setMidstate(header);
+    const result = hasher.hashNonceInto(header.readUInt32LE(76), out);
+    if (backend.async) await result;
+
+    if (out.toString('hex') !== vector.hash) {
+      return false;
+    }
+  }
+  return true;
+}
+
+/**
+ * Measure a backend's single-thread hashrate over roughly durationMs
+ */
+async function benchmarkBackend(name, durationMs) {
+  const backend = getBackend(name);
+  const hasher = backend.createHasher();
+  const out = Buffer.alloc(HASH_LENGTH);
+  hasher.setMidstate(crypto.randomBytes(80));
+
+  let hashes = 0;
+  const start = process.hrtime.bigint();
+  const deadline = start + BigInt(durationMs) * 1000000n;
+  while (process.hrtime.bigint() < deadline) {
+    const result = hasher.hashNonceInto(hashes, out);
+    if (backend.async) await result;
+    hashes++;
+  }
+  const elapsedSeconds = Number(process.hrtime.bigint() - start) / 1e9;
+  return hashes / elapsedSeconds;
+}
+
+/**
+ * Verify and benchmark every available backend
+ */
+async function runBackendBenchmarks(durationMs) {
+  const results = [];
+
+  for (const name of Object.keys(BACKENDS)) {
+    const backend = BACKENDS[name];
+    const result = { name, available: backend.isAvailable(), valid: false, hashrate: 0 };
+
+    if (result.available) {
+      try {
+        result.valid = await verifyBackend(name);
+        if (result.valid) {
+          result.hashrate = await benchmarkBackend(name, durationMs);
+        }
+      } catch (error) {
+        result.error = error.message;
+      }
+    }
+    results.push(result);
+  }
+
+  return results;
+}
+
+/**
+ * Pick the fastest backend that passes the known-answer tests, unless a valid
+ * preferred backend is requested. Benchmarks run once per process and are cached.
+ */
+async function selectBackend(options = {}) {
+  if (!benchmarkResults || options.force) {
+    const durationMs = options.durationMs || parseInt(process.env.SCRYPT_BENCHMARK_MS) || 250;
+    benchmarkResults = await runBackendBenchmarks(durationMs);
+  }
+
+  const preferred = options.preferred || process.env.SCRYPT_BACKEND;
+  const results = benchmarkResults;
+  const candidates = results.filter(result => result.valid);
+  if (candidates.length === 0) {
+    throw new Error('No scrypt backend passed the known-answer tests');
+  }
+
+  let selected = candidates.find(result => result.name === preferred);
+  if (!selected) {
+    selected = candidates.reduce((best, result) => (result.hashrate > best.hashrate ? result : best));
+  }
+
+  selection = {
+    selected: selected.name,
+    async: BACKENDS[selected.name].async,
+    preferred: preferred || null,
+    results: results.map(result => ({
+      ...result,
+      hashrate: Math.round(result.hashrate * 100) / 100
+    })),
+    selectedAt: new Date().toISOString()
+  };
+
+  if (preferred && selected.name !== preferred) {
+    console.log(`⚠️ Preferred scrypt backend '${preferred}' unavailable or failed known-answer tests`);
+  }
+  console.log(`⚙️ Scrypt backend selected: ${selection.selected} (${selected.hashrate.toFixed(1)} H/s single-thread)`);
+  return selection;
+}
+
+/**
+ * Last backend selection, or null if selectBackend() has not run yet
+ */
+function getSelection() {
+  return selection;
+}
+
+module.exports = {
+  BACKENDS,
+  DEFAULT_LANES,
+  KNOWN_ANSWER_VECTORS,
+  getBackend,
+  createHasher,
+  verifyBackend,
+  benchmarkBackend,
+  selectBackend,
+  getSelection
+};
@@ -1,29 +1,105 @@
 /**
  * System Monitor - Node.js Implementation
  * Replaces Python psutil functionality
+ * A background sampler refreshes one shared snapshot; API requests and socket
+ * pushes read the snapshot instead of probing the system themselves.
  */
 
 const si = require('systeminformation');
 const os = require('os');
 const osUtils = require('node-os-utils');
 
+// Snapshot refresh period (SYSTEM_MONITOR_INTERVAL in .env)
+const DEFAULT_SAMPLE_INTERVAL_MS = 5000;
+
+// Disk usage changes slowly and si.fsSize() spawns df, so it is refreshed every Nth sample
+const DISK_SAMPLE_EVERY = 12;
+
+// A snapshot older than this many intervals (sampler not started or stalled) is refreshed on read
+const STALE_AFTER_INTERVALS = 3;
+
 class SystemMonitor {
   constructor() {
     this.cpuUsage = osUtils.cpu;
     this.memoryUsage = osUtils.mem;
     this.driveUsage = osUtils.drive;
+
+    this.sampleIntervalMs = parseInt(process.env.SYSTEM_MONITOR_INTERVAL, 10) || DEFAULT_SAMPLE_INTERVAL_MS;
+    this.sampleTimer = null;
+    this.sampling = null; // In-flight sample() promise, shared by concurrent readers
+    this.sampleCount = 0;
+    this.snapshot = null;
+    this.lastCpuTimes = null;
+    this.lastDisk = null;
+
+    // Static CPU details, read once
+    this.staticCPUInfo = null;
+    this.cpuInfo = null;
+  }
+
+  /**
+   * Start refreshing the snapshot in the background
+   */
+  start(intervalMs = this.sampleIntervalMs) {
+    if (this.sampleTimer) return;
+
+    this.sampleIntervalMs = intervalMs;
+    this.refresh();
+    this.sampleTimer = setInterval(() => this.refresh(), intervalMs);
+    this.sampleTimer.unref();
+    console.log(`📈 System monitor sampling every ${intervalMs} ms`);
+  }
+
+  stop() {
+    if (this.sampleTimer) {
+      clearInterval(this.sampleTimer);
+      this.sampleTimer = null;
+    }
+  }
+
+  /**
+   * Take a new sample unless one is already in flight
+   */
+  refresh() {
+    if (!this.sampling) {
+      this.sampling = this.sample()
+        .then(snapshot => {
+          this.snapshot = snapshot;
+          return snapshot;
+        })
+        .finally(() => {
+          this.sampling = null;
+        });
+    }
+    return this.sampling;
   }
 
   /**
-   * Get comprehensive system statistics
+   * Latest system statistics from the shared snapshot
+   * Only a missing or stale snapshot triggers a sample, and concurrent callers share it
    */
   async getSystemStats() {
+    const maxAge = this.sampleIntervalMs * STALE_AFTER_INTERVALS;
+    if (!this.snapshot || Date.now() - this.snapshot.sampled_at > maxAge) {
+      await this.refresh();
+    }
+    return this.snapshot;
+  }
+
+  /**
+   * Collect comprehensive system statistics
+   */
+  async sample() {
     try {
+      const refreshDisk = !this.lastDisk || this.sampleCount % DISK_SAMPLE_EVERY === 0;
+      this.sampleCount++;
+
       const [cpu, memory, disk] = await Promise.all([
         this.getCPUUsage(),
         this.getMemoryUsage(),
-        this.getDiskUsage()
+        refreshDisk ? this.getDiskUsage() : this.lastDisk
       ]);
+      this.lastDisk = disk;
 
       return {
         cpu: {
@@ -53,7 +129,9 @@ class SystemMonitor {
         platform: os.platform(),
         node_version: process.version,
         hostname: os.hostname(),
-        loadavg: os.loadavg()
+        loadavg: os.loadavg(),
+        sampled_at: Date.now(),
+        sample_interval_ms: this.sampleIntervalMs
       };
     } catch (error) {
       console.error('System stats error:', error);
@@ -61,48 +139,89 @@ class SystemMonitor {
         cpu: { usage_percent: 0, count: 0 },
         memory: { total: 0, available: 0, percent: 0, used: 0 },
         disk: { total: 0, used: 0, free: 0, percent: 0 },
-        error: error.message
+        error: error.message,
+        sampled_at: Date.now(),
+        sample_interval_ms: this.sampleIntervalMs
       };
     }
   }
 
+  /**
+   * si.cpu() and the derived frequency, read once; they do not change while running
+   */
+  async getStaticCPUInfo() {
+    if (!this.staticCPUInfo) {
+      this.staticCPUInfo = si.cpu().then((cpuInfo) => {
+        const osCpus = os.cpus();
+
+        // Enhanced CPU frequency detection
+        let cpuSpeed = 0;
+        let maxSpeed = 0;
+
+        // Try to get frequency from multiple sources
+        if (cpuInfo.speed && cpuInfo.speed > 0) {
+          cpuSpeed = cpuInfo.speed;
+        } else if (cpuInfo.speedMax && cpuInfo.speedMax > 0) {
+          cpuSpeed = cpuInfo.speedMax;
+        } else if (osCpus.length > 0 && osCpus[0].speed && osCpus[0].speed > 0) {
+          // os.cpus() returns speed in MHz, convert to GHz
+          cpuSpeed = osCpus[0].speed / 1000;
+        } else {
+          // For ARM/container environments, provide estimated frequency
+          cpuSpeed = this.estimateCPUFrequency(cpuInfo);
+        }
+
+        // Get max frequency
+        if (cpuInfo.speedMax && cpuInfo.speedMax > 0) {
+          maxSpeed = cpuInfo.speedMax;
+        } else if (osCpus.length > 0 && osCpus[0].speed && osCpus[0].speed > 0) {
+          maxSpeed = osCpus[0].speed / 1000;
+        } else {
+          maxSpeed = cpuSpeed;
+        }
+
+        return { cpuInfo, cpuSpeed, maxSpeed };
+      }).catch((error) => {
+        // Retry on the next call rather than caching the failure
+        this.staticCPUInfo = null;
+        throw error;
+      });
+    }
+    return this.staticCPUInfo;
+  }
+
+  /**
+   * CPU busy percentage since the previous sample, from cumulative os.cpus() times
+   * Unlike osUtils.cpu.usage() this does not wait out a measuring interval; the
+   * first call reports the average since boot
+   */
+  sampleCPUUsage() {
+    let idle = 0;
+    let total = 0;
+    for (const cpu of os.cpus()) {
+      const times = cpu.times;
+      idle += times.idle;
+      total += times.user + times.nice + times.sys + times.idle + times.irq;
+    }
+
+    const last = this.lastCpuTimes;
+    this.lastCpuTimes = { idle, total };
+    const idleDelta = last ? idle - last.idle : idle;
+    const totalDelta = last ? total - last.total : total;
+    if (totalDelta <= 0) return this.snapshot ? this.snapshot.cpu.usage_percent : 0;
+    return Math.round((1 - idleDelta / totalDelta) * 10000) / 100;
+  }
+
   /**
    * Get CPU usage information
    */
   async getCPUUsage() {
     try {
-      const cpuInfo = await si.cpu();
-      const cpuUsage = await this.cpuUsage.usage();
+      const { cpuInfo, cpuSpeed, maxSpeed } = await this.getStaticCPUInfo();
       const osCpus = os.cpus();
       
-      // Enhanced CPU frequency detection
-      let cpuSpeed = 0;
-      let maxSpeed = 0;
-      
-      // Try to get frequency from multiple sources
-      if (cpuInfo.speed && cpuInfo.speed > 0) {
-        cpuSpeed = cpuInfo.speed;
-      } else if (cpuInfo.speedMax && cpuInfo.speedMax > 0) {
-        cpuSpeed = cpuInfo.speedMax;
-      } else if (osCpus.length > 0 && osCpus[0].speed && osCpus[0].speed > 0) {
-        // os.cpus() returns speed in MHz, convert to GHz
-        cpuSpeed = osCpus[0].speed / 1000;
-      } else {
-        // For ARM/container environments, provide estimated frequency
-        cpuSpeed = this.estimateCPUFrequency(cpuInfo);
-      }
-      
-      // Get max frequency
-      if (cpuInfo.speedMax && cpuInfo.speedMax > 0) {
-        maxSpeed = cpuInfo.speedMax;
-      } else if (osCpus.length > 0 && osCpus[0].speed && osCpus[0].speed > 0) {
-        maxSpeed = osCpus[0].speed / 1000;
-      } else {
-        maxSpeed = cpuSpeed === 'Variable (GCP ARM)' || cpuSpeed === 'Variable (Container)' || typeof cpuSpeed === 'string' ? cpuSpeed : cpuSpeed;
-      }
-      
       return {
-        usage: cpuUsage,
+        usage: this.sampleCPUUsage(),
         count: osCpus.length,
         cores: cpuInfo.physicalCores || cpuInfo.cores || osCpus.length,
         model: this.formatCPUModel(cpuInfo),
@@ -114,7 +233,7 @@ class SystemMonitor {
     } catch (error) {
       const osCpus = os.cpus();
       return {
-        usage: 0,
+        usage: this.sampleCPUUsage(),
         count: osCpus.length,
         cores: osCpus.length,
         model: 'Unknown CPU',
@@ -259,10 +378,19 @@ class SystemMonitor {
 
   /**
    * Get detailed CPU information for mining optimization
+   * Computed once; the hardware and the CPU override settings do not change at runtime.
+   * A failed read is not cached
    */
   async getCPUInfo() {
+    if (!this.cpuInfo) {
+      this.cpuInfo = this.readCPUInfo();
+    }
+    return this.cpuInfo;
+  }
+
+  async readCPUInfo() {
     try {
-      const cpuInfo = await si.cpu();
+      const { cpuInfo, cpuSpeed, maxSpeed } = await this.getStaticCPUInfo();
       const cpuCount = os.cpus().length;
       
       // Check for CPU override in environment variables
@@ -271,33 +399,6 @@ class SystemMonitor {
       
       const physicalCores = actualCores || cpuInfo.physicalCores || cpuCount;
       const logicalCores = actualCores || cpuCount;
-      const osCpus = os.cpus();
-      
-      // Enhanced CPU frequency detection (same logic as getCPUUsage)
-      let cpuSpeed = 0;
-      let maxSpeed = 0;
-      
-      // Try to get frequency from multiple sources
-      if (cpuInfo.speed && cpuInfo.speed > 0) {
-        cpuSpeed = cpuInfo.speed;
-      } else if (cpuInfo.speedMax && cpuInfo.speedMax > 0) {
-        cpuSpeed = cpuInfo.speedMax;
-      } else if (osCpus.length > 0 && osCpus[0].speed && osCpus[0].speed > 0) {
-        // os.cpus() returns speed in MHz, convert to GHz
-        cpuSpeed = osCpus[0].speed / 1000;
-      } else {
-        // For ARM/container environments, provide estimated frequency
-        cpuSpeed = this.estimateCPUFrequency(cpuInfo);
-      }
-      
-      // Get max frequency
-      if (cpuInfo.speedMax && cpuInfo.speedMax > 0) {
-        maxSpeed = cpuInfo.speedMax;
-      } else if (osCpus.length > 0 && osCpus[0].speed && osCpus[0].speed > 0) {
-        maxSpeed = osCpus[0].speed / 1000;
-      } else {
-        maxSpeed = cpuSpeed === 'Variable (GCP ARM)' || cpuSpeed === 'Variable (Container)' || typeof cpuSpeed === 'string' ? cpuSpeed : cpuSpeed;
-      }
       
       // Detect container environment
       const isKubernetes = !!process.env.KUBERNETES_SERVICE_HOST;
@@ -391,6 +492,8 @@ class SystemMonitor {
       };
     } catch (error) {
       console.error('CPU info error:', error);
+      // Serve the fallback to this call only; the next one reads the CPU again
+      this.cpuInfo = null;
       
       // Enhanced fallback with container detection and override
       const cpuCount = os.cpus().length;
@@ -5,6 +5,7 @@ Focus: Testing all newly migrated Node.js backend API endpoints after directory
 Testing: Health checks, Mining operations, Mongoose integration, Session management, Database ops, Thread scaling
 """
 
+import os
 import requests
 import json
 import time
@@ -13,9 +14,16 @@ import websocket
 import threading
 from urllib.parse import urljoin
 
-# Backend URL from frontend environment
-BACKEND_URL = "https://b8a64dbe-314e-43b8-9274-f05e86511466.preview.emergentagent.com"
+# Backend URL from frontend environment; set BACKEND_URL to test another deployment, e.g. http://localhost:8001
+BACKEND_URL = os.environ.get("BACKEND_URL", "https://b8a64dbe-314e-43b8-9274-f05e86511466.preview.emergentagent.com").rstrip("/")
 API_BASE = f"{BACKEND_URL}/api"
+
+# Pool for the pool-mining tests. STRATUM_STANDIN=1 runs a local stratum_standin.py
+# instead of a live pool (the backend under test must then run on this machine)
+POOL_ADDRESS = os.environ.get("POOL_ADDRESS", "ltc.millpools.cc")
+POOL_PORT = int(os.environ.get("POOL_PORT", "3567"))
+USE_STRATUM_STANDIN = os.environ.get("STRATUM_STANDIN") == "1"
+STRATUM_POOL = None
 WS_URL = BACKEND_URL.replace('https://', 'wss://').replace('http://', 'ws://')
 
 class BackendTester:
@@ -135,7 +143,7 @@ class BackendTester:
             return False
 
     def test_real_pool_mining_ltc_millpools(self):
-        """Test 3: Real Pool Mining Test with ltc.millpools.cc:3567"""
+        """Test 3: Real Pool Mining Test with POOL_ADDRESS:POOL_PORT (ltc.millpools.cc:3567 by default)"""
         try:
             # Configure real Litecoin pool mining
             mining_config = {
@@ -146,11 +154,11 @@ class BackendTester:
                 "pool_username": "test_user",
                 "pool_password": "test_pass",
                 "wallet_address": "LTC1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4",
-                "custom_pool_address": "ltc.millpools.cc",
-                "custom_pool_port": 3567
+                "custom_pool_address": POOL_ADDRESS,
+                "custom_pool_port": POOL_PORT
             }
             
-            print(f"🎯 Starting REAL POOL MINING TEST with ltc.millpools.cc:3567")
+            print(f"🎯 Starting REAL POOL MINING TEST with {POOL_ADDRESS}:{POOL_PORT}")
             print(f"   Pool: {mining_config['custom_pool_address']}:{mining_config['custom_pool_port']}")
             print(f"   Username: {mining_config['pool_username']}")
             print(f"   Threads: {mining_config['threads']}")
@@ -173,7 +181,7 @@ class BackendTester:
                         test_mode = status_data.get('test_mode', True)
                         
                         self.log_test(
-                            "Real Pool Mining Test - ltc.millpools.cc:3567",
+                            f"Real Pool Mining Test - {POOL_ADDRESS}:{POOL_PORT}",
                             True,
                             f"Pool mining started successfully. Mining: {is_mining}, Pool Connected: {pool_connected}, Test Mode: {test_mode}",
                             {
@@ -186,7 +194,7 @@ class BackendTester:
                         return True
                     else:
                         self.log_test(
-                            "Real Pool Mining Test - ltc.millpools.cc:3567",
+                            f"Real Pool Mining Test - {POOL_ADDRESS}:{POOL_PORT}",
                             False,
                             "Failed to get mining status after start",
                             status_response.text
@@ -194,7 +202,7 @@ class BackendTester:
                         return False
                 else:
                     self.log_test(
-                        "Real Pool Mining Test - ltc.millpools.cc:3567",
+                        f"Real Pool Mining Test - {POOL_ADDRESS}:{POOL_PORT}",
                         False,
                         f"Mining start failed: {data.get('message', 'Unknown error')}",
                         data
@@ -202,7 +210,7 @@ class BackendTester:
                     return False
             else:
                 self.log_test(
-                    "Real Pool Mining Test - ltc.millpools.cc:3567",
+                    f"Real Pool Mining Test - {POOL_ADDRESS}:{POOL_PORT}",
                     False,
                     f"Mining start request failed with status {response.status_code}",
                     response.text
@@ -210,7 +218,7 @@ class BackendTester:
                 return False
         except Exception as e:
             self.log_test(
-                "Real Pool Mining Test - ltc.millpools.cc:3567",
+                f"Real Pool Mining Test - {POOL_ADDRESS}:{POOL_PORT}",
                 False,
                 f"Real pool mining test failed: {str(e)}"
             )
@@ -246,6 +254,22 @@ class BackendTester:
                 
                 shares_found = final_shares - initial_shares
                 
+                # With the local stand-in, recompute every submitted share's scrypt hash
+                if STRATUM_POOL:
+                    from share_verifier import verify_standin
+                    report = verify_standin(STRATUM_POOL)
+                    print(f"   Share verifier: {report['valid']} valid, {report['invalid']} invalid, "
+                          f"{report['duplicate']} duplicate, {report['stale']} stale "
+                          f"({report['throughput']['hashes_per_second']} H/s)")
+                    if report['invalid'] or report['duplicate'] or report['malformed']:
+                        self.log_test(
+                            "Share Submission Verification",
+                            False,
+                            f"Share verifier found {report['invalid']} invalid, {report['duplicate']} duplicate and {report['malformed']} malformed shares",
+                            {"invalid_shares": report['invalid_shares'], "duplicate_shares": report['duplicate_shares']}
+                        )
+                        return False
+                
                 if shares_found > 0:
                     self.log_test(
                         "Share Submission Verification",
@@ -1825,6 +1849,9 @@ class BackendTester:
                 "threads": 2,
                 "intensity": 0.3
             }
+            if USE_STRATUM_STANDIN:
+                pool_config["custom_pool_address"] = POOL_ADDRESS
+                pool_config["custom_pool_port"] = POOL_PORT
             
             # Attempt to start pool mining
             response = self.session.post(f"{API_BASE}/mining/start", json=pool_config, timeout=15)
@@ -2558,7 +2585,7 @@ class BackendTester:
 def main():
     """Main test execution"""
     print("🎯 CryptoMiner Pro - ricmoo-scrypt Mining Integration Test Suite")
-    print("Focus: Real Pool Mining with ltc.millpools.cc:3567")
+    print(f"Focus: Real Pool Mining with {POOL_ADDRESS}:{POOL_PORT}")
     print("Testing: Share submission, hashrate monitoring, difficulty checking")
     print()
     
@@ -2676,10 +2703,22 @@ def run_comprehensive_backend_tests():
     
     return overall_success_rate
 
+def start_stratum_standin():
+    """Point the pool tests at a local stratum stand-in instead of a live pool"""
+    global POOL_ADDRESS, POOL_PORT, STRATUM_POOL
+    from stratum_standin import StratumStandIn
+
+    STRATUM_POOL = StratumStandIn(difficulty=0.01, notify_interval=10, clean_every=3)
+    POOL_ADDRESS, POOL_PORT = STRATUM_POOL.start_in_thread()
+    return STRATUM_POOL
+
 def main():
     """Main function to run comprehensive backend tests"""
+    standin = start_stratum_standin() if USE_STRATUM_STANDIN else None
     try:
         success_rate = run_comprehensive_backend_tests()
+        if standin:
+            print(f"\n🏊 Stratum stand-in: {json.dumps(standin.summary())}")
         
         # Exit with appropriate code
         if success_rate >= 70:
@@ -4,13 +4,14 @@ CryptoMiner Pro Backend Testing Suite - Focused Migration Testing
 Focus: Testing specific areas mentioned in review request after directory migration
 """
 
+import os
 import requests
 import json
 import time
 import sys
 
-# Backend URL from frontend environment
-BACKEND_URL = "https://b8a64dbe-314e-43b8-9274-f05e86511466.preview.emergentagent.com"
+# Backend URL from frontend environment; set BACKEND_URL to test another deployment, e.g. http://localhost:8001
+BACKEND_URL = os.environ.get("BACKEND_URL", "https://b8a64dbe-314e-43b8-9274-f05e86511466.preview.emergentagent.com").rstrip("/")
 API_BASE = f"{BACKEND_URL}/api"
 
 class FocusedTester:
@@ -5,6 +5,7 @@ Focus: Testing all newly migrated Node.js backend API endpoints after directory
 Testing: Health checks, Mining operations, Mongoose integration, Session management, Database ops, Thread scaling
 """
 
+import os
 import requests
 import json
 import time
@@ -12,8 +13,8 @@ import sys
 import uuid
 from urllib.parse import urljoin
 
-# Backend URL from frontend environment
-BACKEND_URL = "https://b8a64dbe-314e-43b8-9274-f05e86511466.preview.emergentagent.com"
+# Backend URL from frontend environment; set BACKEND_URL to test another deployment, e.g. http://localhost:8001
+BACKEND_URL = os.environ.get("BACKEND_URL", "https://b8a64dbe-314e-43b8-9274-f05e86511466.preview.emergentagent.com").rstrip("/")
 API_BASE = f"{BACKEND_URL}/api"
 
 class MigrationTester:
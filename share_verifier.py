@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+CryptoMiner Pro Share Verifier
+Independent check of the shares the Node miner submits: rebuilds each 80-byte
+Litecoin header from the recorded job, extranonce1/extranonce2, ntime and nonce,
+recomputes scrypt(N=1024, r=1, p=1) with hashlib.scrypt in a process pool and
+compares it against the share target for the difficulty the pool had sent
+that miner (or the previous one, for shares arriving just after a change).
+
+Reports valid, invalid, duplicate and stale shares plus verification throughput.
+
+Usage:
+    python3 stratum_standin.py --port 3333 --duration 120 --record shares.json
+    python3 share_verifier.py shares.json --processes 4
+
+From a test, against a stand-in that is still running or already stopped:
+    report = verify_standin(pool)
+    assert report['invalid'] == 0
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+
+# Share difficulty 1 for scrypt coins, as in backend-nodejs/mining/worker.js
+SCRYPT_DIFF1_TARGET = 0xffff << 224
+MAX_TARGET = (1 << 256) - 1
+
+# Below this many headers the process pool costs more than it saves
+MIN_PARALLEL_BATCH = 32
+
+# Invalid/stale/duplicate entries kept in the report
+MAX_LISTED = 20
+
+
+def sha256d(data):
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def target_for_difficulty(difficulty):
+    """Exact floor(diff1 / difficulty), clamped to 256 bits"""
+    if not difficulty or difficulty <= 0:
+        return MAX_TARGET
+    return min(MAX_TARGET, int(Fraction(SCRYPT_DIFF1_TARGET) / Fraction(difficulty)))
+
+
+def merkle_root(coinb1, extranonce1, extranonce2, coinb2, branches):
+    """Coinbase double SHA-256 folded with the merkle branch, in internal byte order"""
+    root = sha256d(bytes.fromhex(coinb1 + extranonce1 + extranonce2 + coinb2))
+    for branch in branches:
+        root = sha256d(root + bytes.fromhex(branch))
+    return root
+
+
+def build_header(job_params, extranonce1, extranonce2, ntime, nonce):
+    """
+    80-byte header for a mining.notify params list and a submit
+    Same layout as RealMiningWorker.createCryptocurrencyBlockHeader() in
+    backend-nodejs/mining/worker.js, which buildHeaderTemplate() uses per job:
+    version, ntime, nbits and nonce little-endian, prevhash as eight
+    byte-swapped 32-bit words
+    """
+    _, prevhash, coinb1, coinb2, branches, version, nbits = job_params[:7]
+    prev = bytes.fromhex(prevhash)
+    prev_words = b''.join(prev[i:i + 4][::-1] for i in range(0, 32, 4))
+
+    return (
+        int(version, 16).to_bytes(4, 'little') +
+        prev_words +
+        merkle_root(coinb1, extranonce1, extranonce2, coinb2, branches) +
+        int(ntime, 16).to_bytes(4, 'little') +
+        int(nbits, 16).to_bytes(4, 'little') +
+        int(nonce, 16).to_bytes(4, 'little')
+    )
+
+
+def scrypt_hash(header):
+    """Litecoin proof-of-work hash: the header is both password and salt"""
+    return hashlib.scrypt(header, salt=header, n=1024, r=1, p=1, dklen=32)
+
+
+def hash_headers(headers, processes=None):
+    """scrypt every header, spread over a process pool for large batches"""
+    processes = processes or os.cpu_count() or 1
+    if processes <= 1 or len(headers) < MIN_PARALLEL_BATCH:
+        return [scrypt_hash(header) for header in headers], 1
+
+    chunksize = max(1, len(headers) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(scrypt_hash, headers, chunksize=chunksize)), processes
+
+
+def find_stale(jobs, submit):
+    """
+    A share is stale if its job is unknown or a clean job replaced it before
+    the submit arrived; jobs carry their monotonic notify time
+    """
+    index = next((i for i, job in enumerate(jobs) if job['job_id'] == submit['job_id']), None)
+    if index is None:
+        return 'unknown job'
+    received = submit.get('monotonic')
+    if received is None:
+        return None
+    for job in jobs[index + 1:]:
+        if job['clean'] and job['created'] <= received:
+            return f"replaced by clean job {job['job_id']}"
+    return None
+
+
+def share_key(submit):
+    """Submit identity as the pool sees it, tolerant of hex case and nonce padding"""
+    return (
+        submit['extranonce1'],
+        submit['job_id'],
+        (submit['extranonce2'] or '').lower(),
+        (submit['ntime'] or '').lower(),
+        int(submit['nonce'] or '0', 16)
+    )
+
+
+def verify_submits(jobs, submits, processes=None):
+    """
+    Verify recorded submits against recorded jobs
+    jobs: [{'job_id', 'params', 'clean', 'created'}, ...] oldest first
+    submits: stratum_standin.py submit records
+    """
+    report = {
+        'submits': len(submits),
+        'valid': 0,
+        'valid_previous_difficulty': 0,
+        'invalid': 0,
+        'duplicate': 0,
+        'stale': 0,
+        'malformed': 0,
+        'pool_accepted_invalid': 0,
+        'invalid_shares': [],
+        'duplicate_shares': [],
+        'stale_shares': []
+    }
+
+    params_by_job = {job['job_id']: job['params'] for job in jobs}
+    seen = set()
+    pending = []
+
+    for submit in submits:
+        try:
+            key = share_key(submit)
+        except (KeyError, TypeError, ValueError):
+            report['malformed'] += 1
+            continue
+
+        if key in seen:
+            report['duplicate'] += 1
+            if len(report['duplicate_shares']) < MAX_LISTED:
+                report['duplicate_shares'].append(describe(submit))
+            continue
+        seen.add(key)
+
+        reason = find_stale(jobs, submit)
+        if reason:
+            report['stale'] += 1
+            if len(report['stale_shares']) < MAX_LISTED:
+                report['stale_shares'].append({**describe(submit), 'reason': reason})
+            continue
+
+        try:
+            header = build_header(params_by_job[submit['job_id']], submit['extranonce1'],
+                                  submit['extranonce2'], submit['ntime'], submit['nonce'])
+        except (TypeError, ValueError, OverflowError):
+            report['malformed'] += 1
+            continue
+        pending.append((submit, header))
+
+    started = time.perf_counter()
+    hashes, used_processes = hash_headers([header for _, header in pending], processes)
+    elapsed = time.perf_counter() - started
+
+    for (submit, _), digest in zip(pending, hashes):
+        value = int.from_bytes(digest, 'little')
+        if value <= target_for_difficulty(submit.get('difficulty')):
+            report['valid'] += 1
+            continue
+        previous = submit.get('previous_difficulty')
+        if previous and value <= target_for_difficulty(previous):
+            report['valid'] += 1
+            report['valid_previous_difficulty'] += 1
+            continue
+
+        report['invalid'] += 1
+        if submit.get('accepted'):
+            report['pool_accepted_invalid'] += 1
+        if len(report['invalid_shares']) < MAX_LISTED:
+            report['invalid_shares'].append({
+                **describe(submit),
+                'hash': digest[::-1].hex(),
+                'share_difficulty': round(SCRYPT_DIFF1_TARGET / max(value, 1), 8)
+            })
+
+    report['throughput'] = {
+        'hashes': len(hashes),
+        'seconds': round(elapsed, 4),
+        'hashes_per_second': round(len(hashes) / elapsed, 1) if elapsed > 0 else 0,
+        'processes': used_processes
+    }
+    return report
+
+
+def describe(submit):
+    return {field: submit.get(field) for field in ('session', 'worker', 'job_id', 'extranonce2', 'ntime', 'nonce', 'difficulty', 'previous_difficulty')}
+
+
+def verify_standin(pool, processes=None):
+    """Verify everything a StratumStandIn recorded"""
+    records = pool.records()
+    return verify_submits(records['jobs'], records['submits'], processes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute scrypt for shares recorded by stratum_standin.py')
+    parser.add_argument('records', help='JSON file written by stratum_standin.py --record')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    with open(args.records) as f:
+        records = json.load(f)
+
+    report = verify_submits(records['jobs'], records['submits'], args.processes)
+    print(json.dumps(report, indent=2))
+
+    throughput = report['throughput']
+    print(f"🔍 Verified {throughput['hashes']} shares in {throughput['seconds']} s "
+          f"({throughput['hashes_per_second']} H/s on {throughput['processes']} processes)")
+    print(f"✅ {report['valid']} valid ({report['valid_previous_difficulty']} at the previous difficulty), ❌ {report['invalid']} invalid, "
+          f"{report['duplicate']} duplicate, {report['stale']} stale, {report['malformed']} malformed")
+    sys.exit(1 if report['invalid'] or report['malformed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
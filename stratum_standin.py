@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+CryptoMiner Pro Stratum Pool Stand-in
+Local asyncio stratum server for offline pool-path tests and benchmarks:
+serves mining.subscribe / mining.authorize, pushes scripted mining.notify and
+mining.set_difficulty sequences at configurable rates, and records every
+mining.submit with timestamps.
+
+Usage:
+    python3 stratum_standin.py --port 3333 --notify-interval 10 --clean-every 3
+
+From a test (the server runs on its own event loop thread):
+    pool = StratumStandIn(notify_interval=5)
+    host, port = pool.start_in_thread()
+    ... point the backend at custom_pool_address=host, custom_pool_port=port ...
+    print(pool.summary())
+    pool.stop_thread()
+
+Record jobs and submits for share_verifier.py with --record shares.json.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+
+# Stratum error codes
+ERROR_JOB_NOT_FOUND = 21
+ERROR_DUPLICATE_SHARE = 22
+ERROR_UNAUTHORIZED = 24
+ERROR_NOT_SUBSCRIBED = 25
+
+# After a difficulty change, shares meeting the previous difficulty are still
+# recorded as such for this long: they may have been found before the miner saw it
+DIFFICULTY_GRACE_SECONDS = 2.0
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(1, int(round(p / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class StandInSession:
+    """One connected miner"""
+
+    def __init__(self, session_id, writer, extranonce1):
+        self.id = session_id
+        self.writer = writer
+        self.extranonce1 = extranonce1
+        self.subscribed = False
+        self.worker = None
+        self.peer = writer.get_extra_info('peername')
+
+        # Difficulty as last sent to this miner, and the one it replaced
+        self.difficulty = None
+        self.previous_difficulty = None
+        self.difficulty_changed = None
+
+    def send(self, message):
+        self.writer.write((json.dumps(message) + '\n').encode())
+
+    def send_difficulty(self, difficulty):
+        if difficulty != self.difficulty:
+            self.previous_difficulty = self.difficulty
+            self.difficulty = difficulty
+            self.difficulty_changed = time.monotonic()
+        self.send({'id': None, 'method': 'mining.set_difficulty', 'params': [difficulty]})
+
+    def share_difficulties(self, received):
+        """Difficulty a share received at this monotonic time must meet, and the previous one within the grace window"""
+        previous = None
+        if self.previous_difficulty is not None and received - self.difficulty_changed <= DIFFICULTY_GRACE_SECONDS:
+            previous = self.previous_difficulty
+        return self.difficulty, previous
+
+
+class StratumStandIn:
+    """
+    Scripted stratum pool
+
+    script: optional list of steps run once per server start, in order, e.g.
+        [{"delay": 0.5, "set_difficulty": 0.01},
+         {"delay": 2.0, "notify": True, "clean": True}]
+    Without a script, a new job is pushed every notify_interval seconds
+    (clean_jobs on every clean_every-th job) and difficulty stays fixed.
+    Submits are accepted without checking the hash; share_verifier.py can
+    check the recorded shares afterwards.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, difficulty=0.001, notify_interval=30.0,
+                 clean_every=1, script=None, extranonce2_size=4, merkle_branches=0):
+        self.host = host
+        self.port = port
+        self.difficulty = difficulty
+        self.notify_interval = notify_interval
+        self.clean_every = max(1, int(clean_every))
+        self.script = script
+        self.extranonce2_size = extranonce2_size
+        self.merkle_branches = merkle_branches
+
+        self.server = None
+        self.loop = None
+        self.thread = None
+        self.sessions = {}
+        self.next_session_id = 1
+        self.tasks = []
+
+        # Jobs and their notify times, oldest first
+        self.jobs = []
+        self.valid_jobs = set()
+        self.job_counter = 0
+
+        self.submits = []
+        self.notifies = []
+        self.seen_shares = set()
+        self.started_at = None
+
+    # ============================================================================
+    # SERVER LIFECYCLE
+    # ============================================================================
+
+    async def start(self):
+        """Start listening on the current event loop; returns (host, port)"""
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.started_at = time.time()
+
+        self.new_job(clean=True, broadcast=False)
+        if self.script:
+            self.tasks.append(asyncio.ensure_future(self.run_script()))
+        elif self.notify_interval and self.notify_interval > 0:
+            self.tasks.append(asyncio.ensure_future(self.run_notify_timer()))
+
+        print(f"🏊 Stratum stand-in listening on {self.host}:{self.port}")
+        return self.host, self.port
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+        for session in list(self.sessions.values()):
+            session.writer.close()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    def start_in_thread(self):
+        """Run the server on a background event loop thread; returns (host, port)"""
+        ready = threading.Event()
+        result = {}
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            result['address'] = loop.run_until_complete(self.start())
+            ready.set()
+            loop.run_forever()
+            loop.close()
+
+        self.thread = threading.Thread(target=run, name='stratum-standin', daemon=True)
+        self.thread.start()
+        ready.wait(10)
+        return result['address']
+
+    def stop_thread(self):
+        if not self.loop:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self.loop).result(10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(10)
+
+    def call(self, fn, *args):
+        """Run fn on the server loop from another thread, e.g. pool.call(pool.push_job, True)"""
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    # ============================================================================
+    # SCRIPTED EVENTS
+    # ============================================================================
+
+    async def run_notify_timer(self):
+        while True:
+            await asyncio.sleep(self.notify_interval)
+            self.push_job(self.job_counter % self.clean_every == 0)
+
+    async def run_script(self):
+        for step in self.script:
+            await asyncio.sleep(step.get('delay', 0))
+            if 'set_difficulty' in step:
+                self.push_difficulty(step['set_difficulty'])
+            if step.get('notify'):
+                self.push_job(step.get('clean', False))
+
+    def new_job(self, clean, broadcast=True):
+        self.job_counter += 1
+        job_id = f"{self.job_counter:08x}"
+        params = [
+            job_id,
+            os.urandom(32).hex(),
+            # Coinbase halves around extranonce1 + extranonce2, as pools send them
+            '01000000010000000000000000000000000000000000000000000000000000000000000000ffffffff20' + os.urandom(4).hex(),
+            'ffffffff0100f2052a010000001976a914' + os.urandom(20).hex() + '88ac00000000',
+            [os.urandom(32).hex() for _ in range(self.merkle_branches)],
+            '20000000',
+            '1e0ffff0',
+            f"{int(time.time()):08x}",
+            clean
+        ]
+
+        if clean:
+            self.valid_jobs.clear()
+        self.valid_jobs.add(job_id)
+        self.jobs.append({'job_id': job_id, 'params': params, 'clean': clean, 'created': time.monotonic()})
+        if broadcast:
+            self.broadcast({'id': None, 'method': 'mining.notify', 'params': params})
+            self.notifies.append({'job_id': job_id, 'clean': clean, 'time': time.time(), 'monotonic': time.monotonic()})
+        return job_id
+
+    def push_job(self, clean=False):
+        """Push a new job to every subscribed miner"""
+        return self.new_job(clean)
+
+    def push_difficulty(self, difficulty):
+        self.difficulty = difficulty
+        for session in self.sessions.values():
+            if session.subscribed:
+                session.send_difficulty(difficulty)
+
+    def broadcast(self, message):
+        line = (json.dumps(message) + '\n').encode()
+        for session in self.sessions.values():
+            if session.subscribed:
+                session.writer.write(line)
+
+    # ============================================================================
+    # MINER CONNECTIONS
+    # ============================================================================
+
+    async def handle_connection(self, reader, writer):
+        session_id = self.next_session_id
+        self.next_session_id += 1
+        session = StandInSession(session_id, writer, f"{session_id:08x}")
+        self.sessions[session_id] = session
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    continue
+                self.handle_request(session, request)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.sessions.pop(session_id, None)
+            writer.close()
+
+    def handle_request(self, session, request):
+        method = request.get('method')
+        request_id = request.get('id')
+        params = request.get('params') or []
+
+        if method == 'mining.subscribe':
+            session.subscribed = True
+            session.send({
+                'id': request_id,
+                'result': [[['mining.set_difficulty', f"sd{session.id}"], ['mining.notify', f"mn{session.id}"]],
+                           session.extranonce1, self.extranonce2_size],
+                'error': None
+            })
+        elif method == 'mining.authorize':
+            session.worker = params[0] if params else None
+            session.send({'id': request_id, 'result': True, 'error': None})
+            session.send_difficulty(self.difficulty)
+            current = dict(self.jobs[-1])
+            params = list(current['params'])
+            params[8] = True
+            session.send({'id': None, 'method': 'mining.notify', 'params': params})
+        elif method == 'mining.submit':
+            self.handle_submit(session, request_id, params)
+        else:
+            session.send({'id': request_id, 'result': None, 'error': [20, f"Unsupported method {method}", None]})
+
+    def handle_submit(self, session, request_id, params):
+        now = time.time()
+        received = time.monotonic()
+        worker, job_id, extranonce2, ntime, nonce = (list(params) + [None] * 5)[:5]
+
+        error = None
+        if not session.subscribed:
+            error = [ERROR_NOT_SUBSCRIBED, 'Not subscribed', None]
+        elif session.worker is None:
+            error = [ERROR_UNAUTHORIZED, 'Unauthorized worker', None]
+        elif job_id not in self.valid_jobs:
+            error = [ERROR_JOB_NOT_FOUND, 'Job not found', None]
+        else:
+            key = (session.extranonce1, job_id, extranonce2, ntime, nonce)
+            if key in self.seen_shares:
+                error = [ERROR_DUPLICATE_SHARE, 'Duplicate share', None]
+            self.seen_shares.add(key)
+
+        job = next((j for j in reversed(self.jobs) if j['job_id'] == job_id), None)
+        difficulty, previous_difficulty = session.share_difficulties(received)
+        if difficulty is None:
+            # Submitted before authorize: no set_difficulty was sent yet
+            difficulty = self.difficulty
+        self.submits.append({
+            'timestamp': now,
+            'monotonic': received,
+            'session': session.id,
+            'worker': worker,
+            'job_id': job_id,
+            'extranonce1': session.extranonce1,
+            'extranonce2': extranonce2,
+            'ntime': ntime,
+            'nonce': nonce,
+            'difficulty': difficulty,
+            'previous_difficulty': previous_difficulty,
+            'job_age_ms': round((received - job['created']) * 1000, 3) if job else None,
+            'accepted': error is None,
+            'error': error
+        })
+        session.send({'id': request_id, 'result': error is None, 'error': error})
+
+    # ============================================================================
+    # RESULTS
+    # ============================================================================
+
+    def get_job(self, job_id):
+        """Notify params for a recorded job id, for verifying submits"""
+        job = next((j for j in self.jobs if j['job_id'] == job_id), None)
+        return job['params'] if job else None
+
+    def records(self):
+        """Jobs and submits in the form share_verifier.py reads"""
+        return {
+            'jobs': [dict(job) for job in self.jobs],
+            'submits': [dict(submit) for submit in self.submits]
+        }
+
+    def summary(self):
+        """Submit throughput, rejects and job-switch latency"""
+        elapsed = time.time() - self.started_at if self.started_at else 0
+        accepted = sum(1 for submit in self.submits if submit['accepted'])
+
+        # Job switch: time from a pushed notify to the first submit for that job
+        first_submit = {}
+        for submit in self.submits:
+            first_submit.setdefault(submit['job_id'], submit['monotonic'])
+        switch_ms = [
+            (first_submit[notify['job_id']] - notify['monotonic']) * 1000
+            for notify in self.notifies
+            if notify['job_id'] in first_submit
+        ]
+
+        return {
+            'elapsed_seconds': round(elapsed, 3),
+            'sessions': len(self.sessions),
+            'notifies': len(self.notifies),
+            'submits': len(self.submits),
+            'accepted': accepted,
+            'rejected': len(self.submits) - accepted,
+            'stale': sum(1 for submit in self.submits if submit['error'] and submit['error'][0] == ERROR_JOB_NOT_FOUND),
+            'submits_per_second': round(len(self.submits) / elapsed, 3) if elapsed > 0 else 0,
+            'job_switch_ms': {
+                'count': len(switch_ms),
+                'p50': round(percentile(switch_ms, 50), 3),
+                'p90': round(percentile(switch_ms, 90), 3),
+                'max': round(max(switch_ms), 3),
+                'mean': round(statistics.mean(switch_ms), 3)
+            } if switch_ms else None
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stratum pool stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3333)
+    parser.add_argument('--difficulty', type=float, default=0.001)
+    parser.add_argument('--notify-interval', type=float, default=30.0, help='seconds between jobs (0 = only the first job)')
+    parser.add_argument('--clean-every', type=int, default=1, help='set clean_jobs on every Nth job')
+    parser.add_argument('--script', help='JSON file with a list of scripted steps')
+    parser.add_argument('--duration', type=float, default=0, help='stop after N seconds (0 = run until Ctrl+C)')
+    parser.add_argument('--record', help='write jobs and submits to this JSON file on exit, for share_verifier.py')
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+
+    pool = StratumStandIn(args.host, args.port, args.difficulty, args.notify_interval, args.clean_every, script)
+
+    async def run():
+        await pool.start()
+        try:
+            if args.duration > 0:
+                await asyncio.sleep(args.duration)
+            else:
+                await asyncio.Event().wait()
+        finally:
+            await pool.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+    print(json.dumps(pool.summary(), indent=2))
+
+    if args.record:
+        with open(args.record, 'w') as f:
+            json.dump(pool.records(), f)
+        print(f"📝 Recorded {len(pool.submits)} submits to {args.record}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+/**
+ * Stand-in stratum pool for tests - a local TCP server speaking just enough
+ * stratum (subscribe, authorize, set_difficulty, notify, submit) to drive the
+ * mining engine, pool manager and stratum proxy without internet access
+ */
+
+const net = require('net');
+
+/**
+ * Answers subscribe/authorize after `delayMs`, sends one job per authorized
+ * connection and accepts every submit, recording it in `submits`
+ */
+function startStandInPool(name, delayMs = 0, port = 0, options = {}) {
+    const extranonce1 = options.extranonce1 || '0000abcd';
+    const extranonce2Size = options.extranonce2Size || 4;
+
+    return new Promise((resolve) => {
+        const sockets = new Set();
+        const submits = [];
+        const server = net.createServer((socket) => {
+            sockets.add(socket);
+            socket.on('close', () => sockets.delete(socket));
+            socket.on('error', () => {});
+
+            let buffer = '';
+            socket.on('data', (data) => {
+                buffer += data.toString();
+                let newline;
+                while ((newline = buffer.indexOf('\n')) !== -1) {
+                    const request = JSON.parse(buffer.slice(0, newline));
+                    buffer = buffer.slice(newline + 1);
+                    setTimeout(() => reply(socket, request), delayMs);
+                }
+            });
+        });
+
+        function reply(socket, request) {
+            if (socket.destroyed) return;
+            const send = (message) => socket.write(JSON.stringify(message) + '\n');
+
+            if (request.method === 'mining.subscribe') {
+                send({ id: request.id, result: [[['mining.notify', `${name}-sub`]], extranonce1, extranonce2Size], error: null });
+            } else if (request.method === 'mining.authorize') {
+                send({ id: request.id, result: true, error: null });
+                send({ id: null, method: 'mining.set_difficulty', params: [0.001] });
+                send({
+                    id: null,
+                    method: 'mining.notify',
+                    params: [`${name}-job`, '00'.repeat(32), '01', '02', [], '20000000', '1e0ffff0', '5f5e1000', true]
+                });
+            } else if (request.method === 'mining.submit') {
+                submits.push(request.params);
+                send({ id: request.id, result: true, error: null });
+            }
+        }
+
+        server.listen(port, '127.0.0.1', () => {
+            resolve({
+                name,
+                host: '127.0.0.1',
+                port: server.address().port,
+                submits,
+                connections: () => sockets.size,
+                stop: () => new Promise((done) => {
+                    sockets.forEach(socket => socket.destroy());
+                    server.close(() => done());
+                })
+            });
+        });
+    });
+}
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+async function waitFor(condition, timeoutMs = 5000) {
+    const start = Date.now();
+    while (!condition()) {
+        if (Date.now() - start > timeoutMs) throw new Error('Timed out waiting for condition');
+        await sleep(20);
+    }
+}
+
+function check(condition, message) {
+    if (!condition) throw new Error(message);
+    console.log(`   ✅ ${message}`);
+}
+
+module.exports = {
+    startStandInPool,
+    sleep,
+    waitFor,
+    check
+};
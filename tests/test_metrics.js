@@ -0,0 +1,67 @@
+/**
+ * Metrics Test - Scrape /metrics over HTTP for both engine types the backend
+ * can run (MiningEngine and HighPerformanceMiningEngine)
+ */
+
+const http = require('http');
+const path = require('path');
+
+const backendDir = path.join(__dirname, '..', 'backend-nodejs');
+const { MetricsRegistry, writeEngineMetrics } = require(path.join(backendDir, 'utils', 'metrics'));
+const HighPerformanceMiningEngine = require(path.join(backendDir, 'high_performance_engine'));
+const { check } = require('./standInPool');
+
+/**
+ * Serve the registry the way server.js does and fetch one scrape
+ */
+async function scrape(engine) {
+    const registry = new MetricsRegistry();
+    registry.addCollector((writer) => writeEngineMetrics(writer, engine));
+
+    const server = http.createServer(registry.handler());
+    await new Promise(resolve => server.listen(0, '127.0.0.1', resolve));
+    try {
+        return await new Promise((resolve, reject) => {
+            http.get({ host: '127.0.0.1', port: server.address().port, path: '/metrics' }, (res) => {
+                let body = '';
+                res.on('data', (chunk) => body += chunk);
+                res.on('end', () => resolve({ status: res.statusCode, type: res.headers['content-type'], body }));
+            }).on('error', reject);
+        });
+    } finally {
+        server.close();
+    }
+}
+
+async function testMetrics() {
+    console.log('🧪 TESTING /metrics\n');
+
+    try {
+        console.log('🔍 TEST 1: HIGH-PERFORMANCE ENGINE');
+        const hpEngine = new HighPerformanceMiningEngine();
+        hpEngine.isRunning = true;
+        hpEngine.stats.hashrate = 1234.5;
+        const hp = await scrape(hpEngine);
+        check(hp.status === 200, `Scrape succeeds (HTTP ${hp.status})`);
+        check(hp.type.startsWith('text/plain; version=0.0.4'), 'Prometheus text content type');
+        check(hp.body.includes('cryptominer_mining_active 1'), 'Common gauges exported');
+        check(hp.body.includes('cryptominer_hashrate_hashes_per_second{window="current"} 1234.5'), 'Engine hashrate exported');
+        check(!hp.body.includes('share_submit_rtt_seconds'), 'MiningEngine-only families skipped');
+
+        console.log('\n🔍 TEST 2: MINING ENGINE');
+        const { MiningEngine } = require(path.join(backendDir, 'mining', 'engine'));
+        const engine = new MiningEngine({ coin: 'litecoin', mode: 'pool', threads: 1, pool_username: 'test.worker' });
+        const mining = await scrape(engine);
+        check(mining.status === 200, `Scrape succeeds (HTTP ${mining.status})`);
+        check(mining.body.includes('cryptominer_hashrate_hashes_per_second{window="15m"}'), 'EWMA windows exported');
+        check(mining.body.includes('cryptominer_share_submit_rtt_seconds_count 0'), 'Share RTT histogram exported');
+
+        console.log('\n🎉 METRICS TEST COMPLETED SUCCESSFULLY');
+        process.exit(0);
+    } catch (error) {
+        console.error('\n❌ Metrics test failed:', error.message);
+        process.exit(1);
+    }
+}
+
+testMetrics();
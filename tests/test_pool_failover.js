@@ -0,0 +1,168 @@
+/**
+ * Pool Failover Test - Verify pool ranking, failover and return to the primary
+ * against local stand-in stratum servers (no internet access or MongoDB needed)
+ */
+
+const net = require('net');
+const path = require('path');
+
+const backendDir = path.join(__dirname, '..', 'backend-nodejs');
+const { PoolManager, backoffDelay } = require(path.join(backendDir, 'mining', 'poolManager'));
+const { startStandInPool, waitFor, check } = require('./standInPool');
+
+async function testRanking() {
+    console.log('🔍 TEST 1: PROBE AND RANK BY CONNECT + SUBSCRIBE LATENCY');
+    const slow = await startStandInPool('slow', 120);
+    const fast = await startStandInPool('fast', 0);
+    const medium = await startStandInPool('medium', 40);
+
+    // Nothing listens on port 1, so this endpoint is unreachable
+    const manager = new PoolManager([slow, { host: '127.0.0.1', port: 1 }, fast, medium], { probe_timeout_ms: 1000 });
+    const ranking = await manager.probeAll();
+
+    check(ranking.map(pool => pool.port).join() === [fast.port, medium.port, slow.port, 1].join(),
+        'Pools ranked fast, medium, slow, unreachable');
+    check(ranking[3].reachable === false, 'Unreachable pool flagged');
+
+    await Promise.all([slow.stop(), fast.stop(), medium.stop()]);
+}
+
+function testBackoff() {
+    console.log('\n🔍 TEST 2: EXPONENTIAL BACKOFF WITH JITTER');
+    check(backoffDelay(1, 1000, 60000, () => 0) === 500 && backoffDelay(1, 1000, 60000, () => 1) === 1000,
+        'First retry within [0.5s, 1s]');
+    check(backoffDelay(4, 1000, 60000, () => 0) === 4000, 'Fourth retry starts at 4s');
+    check(backoffDelay(20, 1000, 60000, () => 1) === 60000, 'Backoff capped at 60s');
+}
+
+async function testEngineFailover() {
+    console.log('\n🔍 TEST 3: ENGINE FAILOVER AND RETURN TO PRIMARY');
+    const { MiningEngine } = require(path.join(backendDir, 'mining', 'engine'));
+
+    let primary = await startStandInPool('primary', 0);
+    const backup = await startStandInPool('backup', 60);
+    const primaryPort = primary.port;
+
+    const engine = new MiningEngine({ coin: 'litecoin', mode: 'pool', threads: 1, pool_username: 'test.worker' });
+    engine.getPoolCandidates = () => [
+        { host: backup.host, port: backup.port },
+        { host: primary.host, port: primary.port }
+    ];
+    engine.mining = true;
+
+    await engine.connectWithFailover();
+    await waitFor(() => engine.currentJob && engine.currentJob.job_id === 'primary-job');
+    check(engine.getStatus().pools.active === `127.0.0.1:${primaryPort}`, 'Connected to the lowest-latency pool');
+
+    // Check for the primary's recovery quickly instead of every minute
+    engine.poolManager.stopPrimaryCheck();
+    engine.poolManager.primaryCheckMs = 100;
+    engine.poolManager.startPrimaryCheck((pool) => engine.switchToPool(pool));
+
+    const failedAt = Date.now();
+    await primary.stop();
+    await waitFor(() => engine.currentJob.job_id === 'backup-job');
+    check(Date.now() - failedAt < 1000, `Failed over to backup in ${Date.now() - failedAt} ms`);
+
+    primary = await startStandInPool('primary', 0, primaryPort);
+    await waitFor(() => engine.currentJob.job_id === 'primary-job', 10000);
+    const state = engine.getStatus().pools;
+    check(state.active === `127.0.0.1:${primaryPort}` && state.failovers === 2, 'Returned to the primary once it recovered');
+
+    engine.mining = false;
+    engine.poolManager.stopPrimaryCheck();
+    if (engine.poolConnection) engine.poolConnection.destroy();
+    await Promise.all([primary.stop(), backup.stop()]);
+}
+
+async function testQueuedSharesStayWithTheirPool() {
+    console.log('\n🔍 TEST 4: QUEUED SHARES NOT REPLAYED TO ANOTHER POOL WITH THE SAME EXTRANONCE1');
+    const { MiningEngine } = require(path.join(backendDir, 'mining', 'engine'));
+
+    const first = await startStandInPool('first', 0, 0, { extranonce1: '00000001' });
+    const second = await startStandInPool('second', 200, 0, { extranonce1: '00000001' });
+
+    const engine = new MiningEngine({ coin: 'litecoin', mode: 'pool', threads: 1, pool_username: 'test.worker' });
+    engine.getPoolCandidates = () => [
+        { host: first.host, port: first.port },
+        { host: second.host, port: second.port }
+    ];
+    engine.mining = true;
+
+    await engine.connectWithFailover();
+    await waitFor(() => engine.currentJob && engine.currentJob.job_id === 'first-job');
+
+    // A share found just after the failover, before the second pool answers subscribe
+    await first.stop();
+    await waitFor(() => engine.poolConnection && engine.poolConnection.remotePort === second.port);
+    engine.onShare({ jobId: 'first-job', extranonce2: '00000000', nTime: '5f5e1000', nonce: '0000002a', hash: '00', epoch: engine.currentJob.epoch });
+    check(engine.poolWriter.getStats().depth === 1, 'Share queued until the new session is subscribed');
+
+    await waitFor(() => engine.currentJob.job_id === 'second-job');
+    check(engine.extranonce1 === '00000001', 'Second pool handed out the same extranonce1');
+    check(second.submits.length === 0, 'First pool\'s share not replayed to the second pool');
+    check(engine.poolWriter.getStats().dropped_expired === 1, 'Queued share dropped as expired');
+
+    engine.mining = false;
+    engine.poolManager.stopPrimaryCheck();
+    if (engine.poolReconnectTimer) clearTimeout(engine.poolReconnectTimer);
+    if (engine.poolConnection) engine.poolConnection.destroy();
+    await second.stop();
+}
+
+async function testAcceptThenDrop() {
+    console.log('\n🔍 TEST 5: BACKOFF GROWS FOR A POOL THAT ACCEPTS AND DROPS');
+    const { MiningEngine } = require(path.join(backendDir, 'mining', 'engine'));
+
+    // Accepts every connection and closes it straight away, before any mining.notify
+    let connections = 0;
+    const dropper = net.createServer((socket) => {
+        connections++;
+        socket.destroy();
+    });
+    await new Promise(resolve => dropper.listen(0, '127.0.0.1', resolve));
+    const port = dropper.address().port;
+
+    const engine = new MiningEngine({ coin: 'litecoin', mode: 'pool', threads: 1, pool_username: 'test.worker' });
+    engine.getPoolCandidates = () => [{ host: '127.0.0.1', port }];
+    engine.mining = true;
+
+    await engine.connectWithFailover();
+    const pool = engine.poolManager.pools[0];
+    await waitFor(() => pool.failures >= 3, 10000);
+    check(pool.failures === 3, 'Failure count kept across connect-then-drop');
+    check(pool.retryAt - Date.now() > 1000, `Backoff grew to ${pool.retryAt - Date.now()} ms`);
+    check(connections <= 4, `Only ${connections} connections while backing off`);
+
+    // A pool that sends work again is healthy: its failures are cleared
+    await new Promise(resolve => dropper.close(resolve));
+    const recovered = await startStandInPool('recovered', 0, port);
+    await waitFor(() => engine.currentJob && engine.currentJob.job_id === 'recovered-job', 10000);
+    check(pool.failures === 0 && pool.error === null, 'Failures cleared on the first mining.notify');
+
+    engine.mining = false;
+    engine.poolManager.stopPrimaryCheck();
+    if (engine.poolReconnectTimer) clearTimeout(engine.poolReconnectTimer);
+    if (engine.poolConnection) engine.poolConnection.destroy();
+    await recovered.stop();
+}
+
+async function testPoolFailover() {
+    console.log('🧪 TESTING POOL FAILOVER\n');
+
+    try {
+        await testRanking();
+        testBackoff();
+        await testEngineFailover();
+        await testQueuedSharesStayWithTheirPool();
+        await testAcceptThenDrop();
+
+        console.log('\n🎉 POOL FAILOVER TEST COMPLETED SUCCESSFULLY');
+        process.exit(0);
+    } catch (error) {
+        console.error('\n❌ Pool failover test failed:', error.message);
+        process.exit(1);
+    }
+}
+
+testPoolFailover();
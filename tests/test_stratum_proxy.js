@@ -0,0 +1,122 @@
+/**
+ * Stratum Proxy Test - Verify that several miners share one upstream pool
+ * connection, get disjoint extranonce slices and have their shares forwarded
+ */
+
+const net = require('net');
+const path = require('path');
+
+const backendDir = path.join(__dirname, '..', 'backend-nodejs');
+const { StratumProxy } = require(path.join(backendDir, 'mining', 'stratumProxy'));
+const StratumFramer = require(path.join(backendDir, 'mining', 'stratumFramer'));
+const { startStandInPool, waitFor, check } = require('./standInPool');
+
+/**
+ * Raw stratum client that records everything the proxy sends
+ */
+function connectMiner(port) {
+    return new Promise((resolve) => {
+        const messages = [];
+        const socket = net.connect(port, '127.0.0.1', () => {
+            resolve({
+                messages,
+                send: (message) => socket.write(JSON.stringify(message) + '\n'),
+                response: (id) => messages.find(message => message.id === id),
+                close: () => socket.destroy()
+            });
+        });
+        const framer = new StratumFramer((message) => messages.push(message));
+        socket.on('data', (data) => framer.push(data));
+    });
+}
+
+async function testStratumProxy() {
+    console.log('🧪 TESTING STRATUM PROXY\n');
+
+    const pool = await startStandInPool('upstream', 0, 0, { extranonce1: 'f00d0001', extranonce2Size: 4 });
+    const proxy = new StratumProxy({
+        pools: [{ host: pool.host, port: pool.port }],
+        pool_username: 'farm.proxy',
+        listen_host: '127.0.0.1',
+        listen_port: 0
+    });
+
+    try {
+        console.log('🔍 TEST 1: DOWNSTREAM SUBSCRIBE');
+        const started = await proxy.start();
+        check(started.success, `Proxy listening on ${started.listen}`);
+        await waitFor(() => proxy.getStatus().upstream.current_job === 'upstream-job');
+
+        const miners = await Promise.all([1, 2, 3].map(() => connectMiner(proxy.listenPort)));
+        miners.forEach((miner, i) => {
+            miner.send({ id: 1, method: 'mining.subscribe', params: ['test-miner'] });
+            miner.send({ id: 2, method: 'mining.authorize', params: [`rig${i + 1}`, 'x'] });
+        });
+        await waitFor(() => miners.every(miner => miner.messages.some(message => message.method === 'mining.notify')));
+
+        const extranonces = miners.map(miner => miner.response(1).result[1]);
+        check(new Set(extranonces).size === 3 && extranonces.every(e1 => e1.startsWith('f00d0001')),
+            `Disjoint extranonce1 per miner: ${extranonces.join(', ')}`);
+        check(miners.every(miner => miner.response(1).result[2] === 3), 'Miners get the remaining 3 extranonce2 bytes');
+        check(pool.connections() === 1, 'Three miners share one upstream connection');
+
+        console.log('\n🔍 TEST 2: SHARE FORWARDING');
+        miners[1].send({ id: 7, method: 'mining.submit', params: ['rig2', 'upstream-job', 'a1b2c3', '5f5e1000', '0000beef'] });
+        await waitFor(() => miners[1].response(7));
+
+        const [worker, jobId, extranonce2] = pool.submits[0];
+        check(worker === 'farm.proxy' && jobId === 'upstream-job', 'Share submitted upstream under the proxy account');
+        check(extranonce2 === extranonces[1].slice(8) + 'a1b2c3', `Extranonce2 rewritten into the pool space: ${extranonce2}`);
+        check(miners[1].response(7).result === true, 'Pool verdict routed back to the submitting miner');
+        check(proxy.getStatus().upstream_writes.sent === 3, 'Share written through the upstream write queue');
+
+        miners[0].send({ id: 8, method: 'mining.submit', params: ['rig1', 'upstream-job', 'a1b2', '5f5e1000', '0000beef'] });
+        await waitFor(() => miners[0].response(8));
+        check(miners[0].response(8).error !== null && pool.submits.length === 1, 'Malformed extranonce2 rejected locally');
+
+        console.log('\n🔍 TEST 3: SESSION SLOTS');
+        const released = extranonces[0];
+        miners[0].close();
+        await waitFor(() => proxy.getStatus().stats.sessions === 2);
+        const replacement = await connectMiner(proxy.listenPort);
+        replacement.send({ id: 1, method: 'mining.subscribe', params: [] });
+        await waitFor(() => replacement.response(1));
+        check(replacement.response(1).result[1] === released, 'Disconnected miner\'s extranonce slot is reused');
+
+        replacement.close();
+        miners.slice(1).forEach(miner => miner.close());
+        await proxy.stop();
+        await pool.stop();
+
+        console.log('\n🔍 TEST 4: UPSTREAM EXTRANONCE2 TOO SMALL TO SPLIT');
+        const smallPool = await startStandInPool('small', 0, 0, { extranonce1: 'f00d0002', extranonce2Size: 2 });
+        const smallProxy = new StratumProxy({
+            pools: [{ host: smallPool.host, port: smallPool.port }],
+            pool_username: 'farm.proxy',
+            listen_host: '127.0.0.1',
+            listen_port: 0
+        });
+        await smallProxy.start();
+        await waitFor(() => smallProxy.getStatus().upstream.extranonce2_size === 2);
+        check(smallProxy.getStatus().upstream.extranonce_error === 'upstream extranonce2_size 2 too small to split',
+            'Status reports why no miner can be served');
+
+        const refused = await connectMiner(smallProxy.listenPort);
+        refused.send({ id: 1, method: 'mining.subscribe', params: [] });
+        await waitFor(() => refused.response(1));
+        check(refused.response(1).error[1] === 'upstream extranonce2_size 2 too small to split',
+            'Subscribe refused with the reason, not "Proxy is full"');
+
+        refused.close();
+        await smallProxy.stop();
+        await smallPool.stop();
+
+        console.log('\n🎉 STRATUM PROXY TEST COMPLETED SUCCESSFULLY');
+        process.exit(0);
+    } catch (error) {
+        console.error('\n❌ Stratum proxy test failed:', error.message);
+        process.exit(1);
+    }
+}
+
+testStratumProxy();